@@ -2,17 +2,24 @@
 Functionality for comparing ratchet values between different states.
 """
 
+import operator
+import os
 import subprocess
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 
 import attr
 
 from coderatchet.utils.logger import logger
 
+from .git_integration import GitCatFileBatch
 from .ratchet import RatchetTest
-from .utils import load_ratchet_count
+from .utils import (
+    load_ratchet_counts,
+    load_ratchet_counts_from_blob,
+    ratchet_values_path,
+)
 
 
 @dataclass
@@ -31,6 +38,7 @@ def compare_ratchets(
     previous_state: str,
     current_state: str = "HEAD",
     include_commits: bool = False,
+    config_file: Optional[Union[str, Path]] = None,
 ) -> List[RatchetComparison]:
     """Compare ratchet values between two states.
 
@@ -38,6 +46,8 @@ def compare_ratchets(
         previous_state: Git reference for the previous state (commit, branch, etc.)
         current_state: Git reference for the current state
         include_commits: Whether to include commit information in the comparison
+        config_file: Optional path to configuration file. Its parsed contents
+            are reused across calls until the file changes.
 
     Returns:
         List of ratchet comparisons, sorted by severity of change
@@ -45,14 +55,13 @@ def compare_ratchets(
     # Get ratchet tests
     from .config import get_ratchet_tests
 
-    tests = get_ratchet_tests()
+    tests = get_ratchet_tests(config_file=config_file)
 
-    # Get counts for both states
-    with _checkout_state(previous_state):
-        previous_counts = _get_ratchet_counts(tests)
-
-    with _checkout_state(current_state):
-        current_counts = _get_ratchet_counts(tests)
+    # Read counts for both states straight from the object store, without
+    # touching the working tree
+    with GitCatFileBatch() as reader:
+        previous_counts = _get_ratchet_counts(tests, previous_state, reader)
+        current_counts = _get_ratchet_counts(tests, current_state, reader)
 
     # Compare counts
     comparisons = []
@@ -77,21 +86,51 @@ def compare_ratchets(
             )
         )
 
-    # Sort by severity (largest positive changes first)
-    comparisons.sort(key=lambda x: (-x.difference, x.test_name))
+    # Sort by severity (largest positive changes first), ties broken by name.
+    # sort is stable, so sorting by name first keeps ties in name order.
+    comparisons.sort(key=operator.attrgetter("test_name"))
+    comparisons.sort(key=operator.attrgetter("difference"), reverse=True)
     return comparisons
 
 
-def _get_ratchet_counts(tests: List[RatchetTest]) -> Dict[str, int]:
-    """Get current ratchet counts for all tests."""
-    counts = {}
-    for test in tests:
-        try:
-            counts[test.name] = load_ratchet_count(test.name)
-        except Exception as e:
-            logger.warning(f"Failed to load count for {test.name}: {e}")
-            counts[test.name] = 0
-    return counts
+def _get_ratchet_counts(
+    tests: List[RatchetTest],
+    ref: Optional[str] = None,
+    reader: Optional["GitCatFileBatch"] = None,
+) -> Dict[str, int]:
+    """Get ratchet counts for all tests.
+
+    Args:
+        tests: Ratchet tests to get counts for
+        ref: Git reference to read counts at. If None, reads the working tree.
+        reader: Batch reader used to fetch the ratchet values file at ``ref``
+
+    Returns:
+        Dictionary mapping test names to their counts
+    """
+    names = [test.name for test in tests]
+    if not names:
+        # Nothing to look up, so don't start a git process for it
+        return {}
+    try:
+        if ref is None:
+            return load_ratchet_counts(names)
+
+        if reader is None:
+            with GitCatFileBatch() as reader:
+                blob = reader.read(ref, _ratchet_values_blob_path())
+        else:
+            blob = reader.read(ref, _ratchet_values_blob_path())
+        return load_ratchet_counts_from_blob(names, blob)
+    except Exception as e:
+        logger.warning(f"Failed to load ratchet counts at {ref or 'working tree'}: {e}")
+        return {name: 0 for name in names}
+
+
+def _ratchet_values_blob_path() -> str:
+    """Get the ratchet values file path in a form git resolves from the cwd."""
+    relative = os.path.relpath(ratchet_values_path())
+    return "./" + Path(relative).as_posix()
 
 
 class _checkout_state:
@@ -102,41 +141,65 @@ class _checkout_state:
         self.stashed = False
 
     def __enter__(self):
-        try:
-            # Try to stash local changes
-            stash_cmd = ["git", "stash", "push", "-m", "coderatchet_temp_stash"]
-            subprocess.check_call(stash_cmd)
-            self.stashed = True
-        except subprocess.CalledProcessError:
-            # No local changes to stash
-            self.stashed = False
+        # A clean tree (the common case in CI) needs no stash round-trip
+        self.stashed = False
+        if _has_local_changes():
+            try:
+                _run_git(["stash", "push", "-m", "coderatchet_temp_stash"])
+                self.stashed = True
+            except subprocess.CalledProcessError:
+                self.stashed = False
 
         try:
-            subprocess.check_call(["git", "checkout", self.state])
+            _run_git(["-c", "advice.detachedHead=false", "checkout", self.state])
         except subprocess.CalledProcessError as e:
             logger.error(f"Failed to checkout {self.state}: {e}")
+            # __exit__ is not called when __enter__ raises, so restore here
+            if self.stashed:
+                _run_git(["stash", "pop"])
             raise
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         try:
-            subprocess.check_call(["git", "checkout", "-"])
+            _run_git(["-c", "advice.detachedHead=false", "checkout", "-"])
         except subprocess.CalledProcessError as e:
             logger.error(f"Failed to restore previous state: {e}")
             raise
 
         if self.stashed:
             try:
-                # Check if there are any stashed changes before trying to pop
-                result = subprocess.run(
-                    ["git", "stash", "list"], capture_output=True, text=True
-                )
-                if result.stdout.strip():  # Only pop if there are stashed changes
-                    subprocess.check_call(["git", "stash", "pop"])
+                # Only pop if there are stashed changes
+                if _has_stash():
+                    _run_git(["stash", "pop"])
             except subprocess.CalledProcessError as e:
                 logger.error(f"Failed to restore stashed changes: {e}")
                 raise
 
 
+def _run_git(args: List[str]) -> subprocess.CompletedProcess:
+    """Run a git command, raising CalledProcessError on failure."""
+    return subprocess.run(["git"] + args, check=True, capture_output=True)
+
+
+def _has_stash() -> bool:
+    """Check whether any stash entry exists, from the exit code alone."""
+    result = subprocess.run(
+        ["git", "rev-parse", "--verify", "--quiet", "refs/stash"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return result.returncode == 0
+
+
+def _has_local_changes() -> bool:
+    """Check for tracked changes that ``git stash push`` would save."""
+    result = subprocess.run(
+        ["git", "status", "--porcelain", "--untracked-files=no"],
+        capture_output=True,
+    )
+    return result.returncode == 0 and bool(result.stdout.strip())
+
+
 @attr.s(frozen=True)
 class _TempComparisonRatchetTest(RatchetTest):
     """For troubleshooting/validating ratchet rule changes. See RatchetTest.compare_with"""
@@ -159,29 +222,27 @@ class _TempComparisonRatchetTest(RatchetTest):
         )
 
     def collect_failures_from_lines(self, lines: List[str], filepath: str = "") -> None:
-        object.__setattr__(
-            self.base_ratchet, "_failures", tuple()
-        )  # Clear any existing failures
-        object.__setattr__(
-            self.compare_with_ratchet, "_failures", tuple()
-        )  # Clear any existing failures
+        # Clear any existing failures
+        self.base_ratchet.clear_failures()
+        self.compare_with_ratchet.clear_failures()
 
         self.base_ratchet.collect_failures_from_lines(lines, filepath)
         self.compare_with_ratchet.collect_failures_from_lines(lines, filepath)
-        object.__setattr__(self, "_failures", self.base_ratchet._failures)
+        self._failures[:] = self.base_ratchet.failures
 
     def get_total_count_from_files(self, files_to_evaluate: List[Path]) -> int:
-        object.__setattr__(
-            self.base_ratchet, "_failures", []
-        )  # Clear any existing failures
-        object.__setattr__(
-            self.compare_with_ratchet, "_failures", []
-        )  # Clear any existing failures
+        # Clear any existing failures
+        self.base_ratchet.clear_failures()
+        self.compare_with_ratchet.clear_failures()
 
         base_count = self.base_ratchet.get_total_count_from_files(files_to_evaluate)
-        compare_count = self.compare_with_ratchet.get_total_count_from_files(
-            files_to_evaluate
-        )
+        if self.compare_with_ratchet is self.base_ratchet:
+            # Comparing a ratchet with itself; one scan gives both counts
+            compare_count = base_count
+        else:
+            compare_count = self.compare_with_ratchet.get_total_count_from_files(
+                files_to_evaluate
+            )
         # Return the maximum count to ensure we catch all potential violations
         return max(base_count, compare_count)
 
@@ -202,13 +263,16 @@ def compare_ratchet_sets(
     current_dict = {r.name: r for r in current_ratchets}
     previous_dict = {r.name: r for r in previous_ratchets}
 
-    # Find added, removed, and modified ratchets
-    added = [r for name, r in current_dict.items() if name not in previous_dict]
+    # Find added and modified ratchets in one pass, probing each name once
+    added = []
+    modified = []
+    for name, current in current_dict.items():
+        previous = previous_dict.get(name)
+        if previous is None:
+            added.append(current)
+        elif current != previous:
+            modified.append((current, previous))
+
     removed = [r for name, r in previous_dict.items() if name not in current_dict]
-    modified = [
-        (current_dict[name], previous_dict[name])
-        for name in set(current_dict) & set(previous_dict)
-        if current_dict[name] != previous_dict[name]
-    ]
 
     return added, removed, modified
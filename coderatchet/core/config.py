@@ -2,25 +2,47 @@
 Configuration management for the coderatchet package.
 """
 
-import copy
+import hashlib
 import os
 import re
+import sys
 from dataclasses import dataclass, field
-from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Generic, List, Optional, Set, TypeVar, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    List,
+    Optional,
+    Pattern,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 import yaml
 
+try:
+    from yaml import CSafeDumper as _SafeDumper
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeDumper as _SafeDumper  # type: ignore[assignment]
+    from yaml import SafeLoader as _SafeLoader  # type: ignore[assignment]
+
 from coderatchet.core.errors import ConfigError
 from coderatchet.utils.logger import logger
 
 from .ratchet import RatchetTest, RegexBasedRatchetTest, TwoPassRatchetTest
 from .ratchets import FunctionLengthRatchet
-from .utils import RatchetError
+from .utils import RatchetError, _compile
 
 T = TypeVar("T")
 
+# dataclass(slots=True) needs Python 3.10+
+_SLOTS: Dict[str, bool] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
 # Move DEFAULT_CONFIG to top since it's used by multiple functions
 DEFAULT_CONFIG = {
     "ratchets": {
@@ -53,6 +75,31 @@ DEFAULT_CONFIG = {
     },
 }
 
+# Fields every ratchet entry in a config file gets, checked in order by
+# load_config: (key, type, default factory, type description, list of strings)
+_RATCHET_FIELDS: Tuple[Tuple[str, type, Callable[[], Any], str, bool], ...] = (
+    ("enabled", bool, lambda: True, "a boolean", False),
+    ("config", dict, dict, "a dictionary", False),
+    ("allowed_count", int, int, "an integer", False),
+    ("match_examples", list, list, "a list", True),
+    ("non_match_examples", list, list, "a list", True),
+    ("severity", str, lambda: "error", "a string", False),
+)
+_SEVERITIES = frozenset({"error", "warning", "info"})
+
+
+# Matches ${VAR} or $VAR references in configuration values
+_ENV_VAR_RE = re.compile(r"\$\{([^}]+)\}|\$([a-zA-Z_][a-zA-Z0-9_]*)")
+
+# Byte sequences that put a "$" into a parsed YAML string: the character
+# itself and its double-quoted escapes
+_DOLLAR_SPELLINGS = (b"$", b"\\x24", b"\\u0024", b"\\U00000024")
+
+
+def _may_reference_env(data: bytes) -> bool:
+    """Check whether raw YAML could contain an environment variable reference."""
+    return any(spelling in data for spelling in _DOLLAR_SPELLINGS)
+
 
 @dataclass
 class EnvValue(Generic[T]):
@@ -75,7 +122,7 @@ class EnvValue(Generic[T]):
         return self.default
 
 
-@dataclass
+@dataclass(frozen=True, **_SLOTS)
 class RatchetConfig:
     """Configuration for a ratchet rule.
 
@@ -93,6 +140,7 @@ class RatchetConfig:
         severity: Severity level of violations
         file_pattern: Optional pattern to match file paths
         exclude_pattern: Optional pattern to exclude file paths
+        use_re2: Whether to match the pattern with RE2 (needs the "re2" extra)
     """
 
     name: str
@@ -108,6 +156,19 @@ class RatchetConfig:
     severity: str = "error"
     file_pattern: Optional[str] = None
     exclude_pattern: Optional[str] = None
+    use_re2: bool = False
+    _compiled_pattern: Optional[Pattern] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _compiled_second_pass_pattern: Optional[Pattern] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _compiled_file_pattern: Optional[Pattern] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _compiled_exclude_pattern: Optional[Pattern] = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def __post_init__(self):
         """Validate configuration after initialization."""
@@ -119,10 +180,7 @@ class RatchetConfig:
             raise ConfigError("Ratchet name is required")
         if not self.pattern:
             raise ConfigError(f"Pattern is required for ratchet '{self.name}'")
-        try:
-            re.compile(self.pattern)
-        except re.error as e:
-            raise ConfigError(f"Invalid pattern for ratchet '{self.name}': {e}")
+        self._compile("_compiled_pattern", self.pattern, "pattern")
 
         if self.is_two_pass:
             if not self.second_pass_pattern:
@@ -131,34 +189,46 @@ class RatchetConfig:
                     f"ratchet '{self.name}'"
                 )
                 raise ConfigError(msg)
-            try:
-                re.compile(self.second_pass_pattern)
-            except re.error as e:
-                raise ConfigError(
-                    f"Invalid second pass pattern for ratchet '{self.name}': {e}"
-                )
+            self._compile(
+                "_compiled_second_pass_pattern",
+                self.second_pass_pattern,
+                "second pass pattern",
+            )
 
         if self.file_pattern:
-            try:
-                re.compile(self.file_pattern)
-            except re.error as e:
-                raise ConfigError(
-                    f"Invalid file pattern for ratchet '{self.name}': {e}"
-                )
+            self._compile("_compiled_file_pattern", self.file_pattern, "file pattern")
 
         if self.exclude_pattern:
-            try:
-                re.compile(self.exclude_pattern)
-            except re.error as e:
-                raise ConfigError(
-                    f"Invalid exclude pattern for ratchet '{self.name}': {e}"
-                )
+            self._compile(
+                "_compiled_exclude_pattern", self.exclude_pattern, "exclude pattern"
+            )
 
         if self.severity not in {"error", "warning", "info"}:
             raise ConfigError(
                 f"Invalid severity '{self.severity}' for ratchet '{self.name}'"
             )
 
+        if not isinstance(self.use_re2, bool):
+            raise ConfigError(f"'use_re2' for ratchet '{self.name}' must be a boolean")
+
+    def _compile(self, attribute: str, pattern: str, label: str) -> None:
+        """Compile a pattern and store it on the given private attribute.
+
+        Args:
+            attribute: Name of the field holding the compiled pattern
+            pattern: Regex pattern to compile
+            label: Description of the pattern used in error messages
+
+        Raises:
+            ConfigError: If the pattern is not a valid regex
+        """
+        try:
+            compiled = _compile(pattern)
+        except re.error as e:
+            raise ConfigError(f"Invalid {label} for ratchet '{self.name}': {e}")
+        # Since we're frozen, we need to use object.__setattr__
+        object.__setattr__(self, attribute, compiled)
+
 
 def save_config(config: Dict[str, Any], config_path: Path) -> None:
     """Save configuration to file.
@@ -168,10 +238,55 @@ def save_config(config: Dict[str, Any], config_path: Path) -> None:
         config_path: Path to save configuration to
     """
     with open(config_path, "w") as f:
-        yaml.dump(config, f, default_flow_style=False)
+        yaml.dump(config, f, Dumper=_SafeDumper, default_flow_style=False)
+
+
+# Parsed configurations keyed by (resolved path, fallback_to_default). Each
+# entry records the (mtime, size) stamp of every file in its "extends" chain
+# and the value of every environment variable substituted into it, so
+# editing any of those files or changing any of those variables invalidates it.
+_FileStamp = Tuple[str, int, int]
+_EnvStamp = Tuple[Tuple[str, Optional[str]], ...]
+_CacheEntry = Tuple[Tuple[_FileStamp, ...], _EnvStamp, Dict[str, Any]]
+_CONFIG_CACHE: Dict[Tuple[str, bool], _CacheEntry] = {}
+
+# Validated configurations without "extends", keyed by (sha256 of the file's
+# bytes, fallback_to_default), so identical files share one parse. Entries
+# also record the environment variables substituted into them.
+_CONTENT_CACHE: Dict[Tuple[bytes, bool], Tuple[_EnvStamp, Dict[str, Any]]] = {}
+
+# Upper bound on entries per cache; the oldest entry is dropped first
+_MAX_CACHE_ENTRIES = 128
+
+
+def _cache_store(cache: Dict[Any, Any], key: Any, entry: Any) -> None:
+    """Store a cache entry, evicting the oldest one once the cache is full."""
+    cache.pop(key, None)
+    if len(cache) >= _MAX_CACHE_ENTRIES:
+        del cache[next(iter(cache))]
+    cache[key] = entry
+
+
+def _file_stamp(path: str) -> _FileStamp:
+    """Get the (path, mtime, size) stamp used to detect file changes."""
+    stat = os.stat(path)
+    return path, stat.st_mtime_ns, stat.st_size
+
+
+def _is_fresh(stamps: Tuple[_FileStamp, ...]) -> bool:
+    """Check that none of the recorded files changed since they were read."""
+    try:
+        return all(_file_stamp(stamp[0]) == stamp for stamp in stamps)
+    except OSError:
+        return False
+
+
+def _env_is_fresh(env: _EnvStamp) -> bool:
+    """Check that no substituted environment variable changed since it was read."""
+    environ_get = os.environ.get
+    return all(environ_get(name) == value for name, value in env)
 
 
-@lru_cache(maxsize=None)
 def load_config(
     config_file: Union[str, Path],
     _visited: Optional[frozenset] = None,
@@ -194,9 +309,12 @@ def load_config(
     """
     try:
         config_path = Path(config_file)
-        if not config_path.exists():
+        try:
+            # One stat answers "does it exist" and stamps the file for the cache
+            stat = config_path.stat()
+        except (FileNotFoundError, NotADirectoryError):
             if fallback_to_default:
-                return DEFAULT_CONFIG
+                return _default_config()
             raise ConfigError(f"Configuration file not found: {config_file}")
 
         # Initialize visited paths if not provided
@@ -204,25 +322,52 @@ def load_config(
         resolved_path = str(config_path.resolve())
         if resolved_path in visited_paths:
             if fallback_to_default:
-                return DEFAULT_CONFIG
+                return _default_config()
             raise ConfigError(f"Circular dependency detected: {config_file}")
         visited_paths.add(resolved_path)
 
+        cache_key = (resolved_path, fallback_to_default)
+        own_stamp = (resolved_path, stat.st_mtime_ns, stat.st_size)
+        cached = _CONFIG_CACHE.get(cache_key)
+        # The first stamp is always this file's own, which we just took
+        if (
+            cached is not None
+            and cached[0][0] == own_stamp
+            and _is_fresh(cached[0][1:])
+            and _env_is_fresh(cached[1])
+        ):
+            return _clone_config(cached[2])
+        stamps = [own_stamp]
+        # Environment variables looked up while substituting, with their values
+        env: Dict[str, Optional[str]] = {}
+        cacheable = True
+
+        data = config_path.read_bytes()
+        content_key = (hashlib.sha256(data).digest(), fallback_to_default)
+        content_cached = _CONTENT_CACHE.get(content_key)
+        if content_cached is not None and _env_is_fresh(content_cached[0]):
+            env_stamp, validated = content_cached
+            _cache_store(
+                _CONFIG_CACHE, cache_key, (tuple(stamps), env_stamp, validated)
+            )
+            return _clone_config(validated)
+
         try:
-            with open(config_path, "r", encoding="utf-8") as f:
-                config = yaml.safe_load(f)
+            # libyaml decodes the raw bytes itself, so skip the text layer
+            config = yaml.load(data, Loader=_SafeLoader)
         except yaml.YAMLError as e:
             if fallback_to_default:
-                return DEFAULT_CONFIG
+                return _default_config()
             raise ConfigError(f"Invalid YAML in configuration file: {e}")
 
         if not isinstance(config, dict):
             if fallback_to_default:
-                return DEFAULT_CONFIG
+                return _default_config()
             raise ConfigError("Configuration must be a dictionary")
 
         # Handle inheritance first
-        if "extends" in config:
+        extends = "extends" in config
+        if extends:
             base_config_path = config_path.parent / config["extends"]
             try:
                 base_config = load_config(
@@ -232,126 +377,54 @@ def load_config(
                     fallback_to_default=fallback_to_default,  # Pass through the fallback setting
                 )
                 config = merge_configs(base_config, config)
+                # Only cache if the base was itself cached, so we know which
+                # files to watch
+                base_cached = _CONFIG_CACHE.get(
+                    (str(base_config_path.resolve()), fallback_to_default)
+                )
+                if base_cached is None:
+                    cacheable = False
+                else:
+                    stamps.extend(base_cached[0])
+                    env.update(base_cached[1])
             except (OSError, ConfigError) as e:
                 if fallback_to_default:
-                    return DEFAULT_CONFIG
+                    return _default_config()
                 raise ConfigError(
                     f"Failed to load base configuration from {base_config_path}: {e}"
                 )
 
-        # Substitute environment variables
-        config = substitute_env_vars(config)
+        # Substitute environment variables, unless the file cannot contain any
+        if _may_reference_env(data):
+            config = _substitute_env_vars(config, env)
 
         # Validate and set defaults for ratchets
         if "ratchets" not in config:
             config["ratchets"] = {}
 
         # Validate each ratchet configuration
-        for name, ratchet_config in config["ratchets"].items():
-            if not isinstance(ratchet_config, dict):
-                if fallback_to_default:
-                    config["ratchets"][name] = DEFAULT_CONFIG["ratchets"].get(name, {})
-                else:
-                    raise ConfigError(
-                        f"Ratchet configuration for '{name}' must be a dictionary"
-                    )
-
-            # Set default values
-            ratchet_config.setdefault("enabled", True)
-            ratchet_config.setdefault("config", {})
-            ratchet_config.setdefault("allowed_count", 0)
-            ratchet_config.setdefault("match_examples", [])
-            ratchet_config.setdefault("non_match_examples", [])
-            ratchet_config.setdefault("severity", "error")
-
-            # Validate types
-            if not isinstance(ratchet_config["enabled"], bool):
-                if fallback_to_default:
-                    config["ratchets"][name] = DEFAULT_CONFIG["ratchets"].get(name, {})
-                else:
-                    raise ConfigError(
-                        f"'enabled' field for ratchet '{name}' must be a boolean"
-                    )
-
-            if not isinstance(ratchet_config["config"], dict):
-                if fallback_to_default:
-                    config["ratchets"][name] = DEFAULT_CONFIG["ratchets"].get(name, {})
-                else:
-                    raise ConfigError(
-                        f"'config' field for ratchet '{name}' must be a dictionary"
-                    )
-
-            if not isinstance(ratchet_config["allowed_count"], int):
-                if fallback_to_default:
-                    config["ratchets"][name] = DEFAULT_CONFIG["ratchets"].get(name, {})
-                else:
-                    raise ConfigError(
-                        f"'allowed_count' field for ratchet '{name}' must be an integer"
-                    )
-
-            if not isinstance(ratchet_config["match_examples"], list):
-                if fallback_to_default:
-                    config["ratchets"][name] = DEFAULT_CONFIG["ratchets"].get(name, {})
-                else:
-                    raise ConfigError(
-                        f"'match_examples' field for ratchet '{name}' must be a list"
-                    )
-
-            if not all(isinstance(x, str) for x in ratchet_config["match_examples"]):
-                if fallback_to_default:
-                    config["ratchets"][name] = DEFAULT_CONFIG["ratchets"].get(name, {})
-                else:
-                    raise ConfigError(
-                        f"'match_examples' field for ratchet '{name}' must be a list of strings"
-                    )
-
-            if not isinstance(ratchet_config["non_match_examples"], list):
-                if fallback_to_default:
-                    config["ratchets"][name] = DEFAULT_CONFIG["ratchets"].get(name, {})
-                else:
-                    raise ConfigError(
-                        f"'non_match_examples' field for ratchet '{name}' must be a list"
-                    )
-
-            if not all(
-                isinstance(x, str) for x in ratchet_config["non_match_examples"]
-            ):
-                if fallback_to_default:
-                    config["ratchets"][name] = DEFAULT_CONFIG["ratchets"].get(name, {})
-                else:
-                    raise ConfigError(
-                        f"'non_match_examples' field for ratchet '{name}' must be a list of strings"
-                    )
-
-            if not isinstance(ratchet_config["severity"], str):
-                if fallback_to_default:
-                    config["ratchets"][name] = DEFAULT_CONFIG["ratchets"].get(name, {})
-                else:
-                    raise ConfigError(
-                        f"'severity' field for ratchet '{name}' must be a string"
-                    )
-
-            if ratchet_config["severity"] not in {"error", "warning", "info"}:
-                if fallback_to_default:
-                    config["ratchets"][name] = DEFAULT_CONFIG["ratchets"].get(name, {})
-                else:
-                    raise ConfigError(
-                        f"'severity' field for ratchet '{name}' must be one of: error, warning, info"
-                    )
+        ratchets = config["ratchets"]
+        for name, ratchet_config in ratchets.items():
+            error = _ratchet_config_error(name, ratchet_config)
+            if error is None:
+                continue
+            if not fallback_to_default:
+                raise ConfigError(error)
+            ratchets[name] = _clone_config(DEFAULT_CONFIG["ratchets"].get(name, {}))
 
         # Set default values for git and ci sections
         if "git" not in config:
-            config["git"] = DEFAULT_CONFIG["git"]
+            config["git"] = _clone_config(DEFAULT_CONFIG["git"])
         else:
             config["git"].setdefault(
                 "base_branch", DEFAULT_CONFIG["git"]["base_branch"]
             )
             config["git"].setdefault(
-                "ignore_patterns", DEFAULT_CONFIG["git"]["ignore_patterns"]
+                "ignore_patterns", list(DEFAULT_CONFIG["git"]["ignore_patterns"])
             )
 
         if "ci" not in config:
-            config["ci"] = DEFAULT_CONFIG["ci"]
+            config["ci"] = _clone_config(DEFAULT_CONFIG["ci"])
         else:
             config["ci"].setdefault(
                 "fail_on_violations", DEFAULT_CONFIG["ci"]["fail_on_violations"]
@@ -360,6 +433,15 @@ def load_config(
                 "report_format", DEFAULT_CONFIG["ci"]["report_format"]
             )
 
+        if cacheable:
+            validated = _clone_config(config)
+            env_stamp = tuple(env.items())
+            _cache_store(
+                _CONFIG_CACHE, cache_key, (tuple(stamps), env_stamp, validated)
+            )
+            # A config that extends another also depends on that file
+            if not extends:
+                _cache_store(_CONTENT_CACHE, content_key, (env_stamp, validated))
         return config
 
     except Exception as e:
@@ -367,10 +449,38 @@ def load_config(
             logger.warning(
                 f"Failed to load config from {config_file}, using default: {e}"
             )
-            return DEFAULT_CONFIG
+            return _default_config()
         raise ConfigError(f"Failed to load configuration file: {e}")
 
 
+def _ratchet_config_error(name: str, ratchet_config: Any) -> Optional[str]:
+    """Fill in defaults for a ratchet configuration and check its field types.
+
+    Args:
+        name: Name of the ratchet
+        ratchet_config: Ratchet configuration to validate, updated in place
+
+    Returns:
+        Message describing the first invalid field, or None if it is valid
+    """
+    if not isinstance(ratchet_config, dict):
+        return f"Ratchet configuration for '{name}' must be a dictionary"
+
+    for key, expected, default, description, strings_only in _RATCHET_FIELDS:
+        value = ratchet_config.setdefault(key, default())
+        if not isinstance(value, expected):
+            return f"'{key}' field for ratchet '{name}' must be {description}"
+        if strings_only and not all(isinstance(item, str) for item in value):
+            return f"'{key}' field for ratchet '{name}' must be a list of strings"
+
+    if ratchet_config["severity"] not in _SEVERITIES:
+        return (
+            f"'severity' field for ratchet '{name}' must be one of: "
+            "error, warning, info"
+        )
+    return None
+
+
 def merge_configs(base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
     """Merge two configurations, with override taking precedence.
 
@@ -381,48 +491,97 @@ def merge_configs(base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, A
     Returns:
         Merged configuration
     """
-    result = copy.deepcopy(base)
-
-    def deep_merge(d1: Dict[str, Any], d2: Dict[str, Any]) -> Dict[str, Any]:
-        """Recursively merge two dictionaries."""
-        for k, v in d2.items():
-            if k in d1 and isinstance(d1[k], dict) and isinstance(v, dict):
-                deep_merge(d1[k], v)
+    result: Dict[str, Any] = {}
+
+    # Build the result in one pass over both sides, walking matching nested
+    # dicts with an explicit stack rather than recursing. Base values that are
+    # overridden are never copied.
+    stack = [(result, base, override)]
+    while stack:
+        target, lower, upper = stack.pop()
+        for k, v in lower.items():
+            if k not in upper:
+                target[k] = _clone_config(v)
+            elif type(v) is dict and type(upper[k]) is dict:
+                target[k] = {}
+                stack.append((target[k], v, upper[k]))
             else:
-                d1[k] = copy.deepcopy(v)
-        return d1
+                target[k] = _clone_config(upper[k])
+        for k, v in upper.items():
+            if k not in lower:
+                target[k] = _clone_config(v)
+    return result
+
 
-    return deep_merge(result, override)
+def _default_config() -> Dict[str, Any]:
+    """Get a copy of DEFAULT_CONFIG that the caller is free to modify."""
+    return _clone_config(DEFAULT_CONFIG)
+
+
+def _clone_config(value: Any) -> Any:
+    """Copy the dicts and lists of a parsed configuration.
+
+    YAML leaves (strings, numbers, booleans, None) are immutable, so they are
+    shared rather than copied, which is far cheaper than ``copy.deepcopy``.
+    """
+    if isinstance(value, dict):
+        return {k: _clone_config(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_clone_config(v) for v in value]
+    return value
 
 
 def substitute_env_vars(config: Dict[str, Any]) -> Dict[str, Any]:
     """Substitute environment variables in configuration values.
 
+    Nested dicts and lists are updated in place.
+
     Args:
         config: Configuration dictionary
 
     Returns:
         Configuration with environment variables substituted
     """
+    return _substitute_env_vars(config, {})
 
-    def substitute_value(value: Any) -> Any:
-        """Substitute environment variables in a value."""
-        if isinstance(value, str):
-            # Match ${VAR} or $VAR format
-            pattern = r"\$\{([^}]+)\}|\$([a-zA-Z_][a-zA-Z0-9_]*)"
 
-            def replace(match):
-                var_name = match.group(1) or match.group(2)
-                return os.environ.get(var_name, match.group(0))
+def _substitute_env_vars(config: Any, used: Dict[str, Optional[str]]) -> Any:
+    """Substitute environment variables, recording the ones looked up.
 
-            return re.sub(pattern, replace, value)
-        elif isinstance(value, dict):
-            return {k: substitute_value(v) for k, v in value.items()}
-        elif isinstance(value, list):
-            return [substitute_value(item) for item in value]
-        return value
+    Args:
+        config: Configuration dictionary, list or string
+        used: Updated with the name and current value (None if unset) of
+            every variable the configuration references
 
-    return substitute_value(config)
+    Returns:
+        Configuration with environment variables substituted
+    """
+    environ_get = os.environ.get
+
+    def replace(match: re.Match) -> str:
+        """Look up the variable named by a ``${VAR}`` or ``$VAR`` match."""
+        name = match.group(1) or match.group(2)
+        value = environ_get(name)
+        used[name] = value
+        return match.group(0) if value is None else value
+
+    if isinstance(config, str):
+        return _ENV_VAR_RE.sub(replace, config) if "$" in config else config
+
+    stack = [config] if isinstance(config, (dict, list)) else []
+    while stack:
+        container = stack.pop()
+        items = (
+            container.items() if isinstance(container, dict) else enumerate(container)
+        )
+        for key, value in items:
+            if isinstance(value, str):
+                # Most values contain no variables; skip the regex scan for them
+                if "$" in value:
+                    container[key] = _ENV_VAR_RE.sub(replace, value)
+            elif isinstance(value, (dict, list)):
+                stack.append(value)
+    return config
 
 
 def create_ratchet_tests(
@@ -452,14 +611,9 @@ def create_ratchet_tests(
                 "exclude_test_files": False,
             }
 
-            # Add file pattern if specified
+            # Add file pattern if specified (already compiled by validation)
             if config.file_pattern:
-                try:
-                    test_args["include_file_regex"] = re.compile(config.file_pattern)
-                except re.error as e:
-                    raise ConfigError(
-                        f"Invalid file pattern for ratchet '{config.name}': {e}"
-                    )
+                test_args["include_file_regex"] = config._compiled_file_pattern
 
             # Create appropriate test type
             if config.is_two_pass:
@@ -468,8 +622,9 @@ def create_ratchet_tests(
                 test = RegexBasedRatchetTest(
                     name=config.name,
                     pattern=config.pattern,
-                    match_examples=config.match_examples,
-                    non_match_examples=config.non_match_examples,
+                    match_examples=tuple(config.match_examples),
+                    non_match_examples=tuple(config.non_match_examples),
+                    use_re2=config.use_re2,
                     **test_args,
                 )
 
@@ -497,7 +652,10 @@ class RatchetConfigManager:
         save_config(self.config, self.config_path)
 
     def get_ratchets(self) -> List[RatchetTest]:
-        """Get configured ratchet tests."""
+        """Get configured ratchet tests.
+
+        Ratchets keep the failures they collect, so every call builds new ones.
+        """
         from ..examples.basic_usage.basic_ratchets import get_basic_ratchets
         from ..examples.basic_usage.custom_ratchets import get_custom_ratchets
 
@@ -509,11 +667,12 @@ class RatchetConfigManager:
 
         # Add custom ratchets if enabled
         if self.config["ratchets"]["custom"]["enabled"]:
+            custom_config = self.config["ratchets"]["custom"].get("config", {})
             custom_ratchets = get_custom_ratchets()
             for ratchet in custom_ratchets:
                 # Apply custom configuration
-                if ratchet.name in self.config["ratchets"]["custom"]["config"]:
-                    config = self.config["ratchets"]["custom"]["config"][ratchet.name]
+                if ratchet.name in custom_config:
+                    config = custom_config[ratchet.name]
                     if isinstance(ratchet, FunctionLengthRatchet):
                         # Create a new instance with the custom max_lines
                         ratchet = FunctionLengthRatchet(
@@ -530,8 +689,13 @@ class RatchetConfigManager:
         return ratchets
 
 
+# Sections of the "ratchets" config that configure built-in ratchet groups
+# rather than define regex ratchets of their own
+_SKIP_RATCHETS = frozenset({"basic", "custom"})
+
+
 def load_ratchet_configs(
-    config_file: Optional[Union[str, Path]] = None
+    config_file: Optional[Union[str, Path]] = None,
 ) -> List[RatchetConfig]:
     """Load ratchet configurations from a YAML file.
 
@@ -548,49 +712,62 @@ def load_ratchet_configs(
     raw_config = load_config(config_file) if config_file else DEFAULT_CONFIG
 
     # Extract ratchet configurations
-    ratchet_configs = []
-    for name, config in raw_config.get("ratchets", {}).items():
-        if not isinstance(config, dict):
-            continue
-
-        if not config.get("enabled", True):
-            continue
-
-        # Skip the "basic" and "custom" ratchets since they are handled separately
-        if name in ["basic", "custom"]:
-            continue
-
-        ratchet_config = RatchetConfig(
-            name=name,
-            pattern=config.get("pattern", ""),
-            match_examples=config.get("match_examples", []),
-            non_match_examples=config.get("non_match_examples", []),
-            description=config.get("description"),
-            is_two_pass=config.get("is_two_pass", False),
-            second_pass_pattern=config.get("second_pass_pattern"),
-            second_pass_examples=config.get("second_pass_examples"),
-            second_pass_non_examples=config.get("second_pass_non_examples"),
-            enabled=config.get("enabled", True),
-            severity=config.get("severity", "error"),
-            file_pattern=config.get("file_pattern"),
-            exclude_pattern=config.get("exclude_pattern"),
-        )
-        ratchet_configs.append(ratchet_config)
-
-    return ratchet_configs
+    return [
+        RatchetConfig(name=name, **_ratchet_config_kwargs(config))
+        for name, config in raw_config.get("ratchets", {}).items()
+        if _is_active_ratchet(name, config)
+    ]
+
+
+def _is_active_ratchet(name: str, config: Any) -> bool:
+    """Check whether a raw ratchet entry should become a RatchetConfig."""
+    # Skip the "basic" and "custom" ratchets since they are handled separately
+    if name in _SKIP_RATCHETS or not isinstance(config, dict):
+        return False
+    if not config.get("enabled", True):
+        return False
+    if not config.get("pattern"):
+        logger.warning(f"Skipping ratchet '{name}': no pattern configured")
+        return False
+    return True
+
+
+def _ratchet_config_kwargs(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a raw ratchet entry to RatchetConfig keyword arguments."""
+    get = config.get
+    return {
+        "pattern": get("pattern"),
+        "match_examples": get("match_examples", []),
+        "non_match_examples": get("non_match_examples", []),
+        "description": get("description"),
+        "is_two_pass": get("is_two_pass", False),
+        "second_pass_pattern": get("second_pass_pattern"),
+        "second_pass_examples": get("second_pass_examples"),
+        "second_pass_non_examples": get("second_pass_non_examples"),
+        "enabled": get("enabled", True),
+        "severity": get("severity", "error"),
+        "file_pattern": get("file_pattern"),
+        "exclude_pattern": get("exclude_pattern"),
+        "use_re2": get("use_re2", False),
+    }
 
 
 def get_ratchet_tests(
     return_set: bool = False,
+    config_file: Optional[Union[str, Path]] = None,
 ) -> Union[List[RatchetTest], Set[RatchetTest]]:
     """Get all ratchet tests to check.
 
+    Tests keep the failures they collect, so every call builds fresh ones.
+    The parsed configuration file and compiled patterns they are built from
+    are cached, so this stays cheap.
+
     Args:
         return_set: If True, returns a set of tests instead of a list
+        config_file: Optional path to configuration file. If None, uses default config.
 
     Returns:
         List or Set of ratchet tests created from loaded configurations.
     """
-    configs = load_ratchet_configs()
-    tests = create_ratchet_tests(configs)
+    tests = create_ratchet_tests(load_ratchet_configs(config_file))
     return set(tests) if return_set else tests
@@ -1,9 +1,56 @@
 """Git integration functionality."""
 
+import configparser
+import itertools
+import os
+import re
 import subprocess
+import sys
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Union
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    overload,
+)
+
+from .utils import _optional_import
+
+# Optional, installed with the "git" extra
+pygit2 = _optional_import("pygit2")
+
+_FULL_SHA_RE = re.compile(r"[0-9a-f]{40}")
+# Shell metacharacters rejected in git arguments, see _validate_args
+_FORBIDDEN_CHARS_RE = re.compile(r"[;|&><`${}\[\]]")
+# Quoting, escapes and inline comments that only git config parses faithfully
+_GIT_CONFIG_SYNTAX_RE = re.compile(r'["\\;#]')
+
+# dataclass(slots=True) needs Python 3.10+
+_SLOTS: Dict[str, bool] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+# Identity add_and_commit falls back to where none is configured
+_DEFAULT_IDENTITY = {"user.name": "Test User", "user.email": "test@example.com"}
+
+# Most git processes get_repo_summary and get_files_blame run at once
+_MAX_PARALLEL_GIT = 8
+
+# Bounds for GitIntegration's decoded blob cache
+_MAX_BLOB_CACHE_ENTRIES = 4096
+_MAX_BLOB_CACHE_BYTES = 64 * 1024 * 1024
 
 
 class GitError(Exception):
@@ -12,6 +59,387 @@ class GitError(Exception):
     pass
 
 
+class GitCatFileError(Exception):
+    """Raised when the ``git cat-file --batch`` process fails."""
+
+    pass
+
+
+class GitCatFileBatch:
+    """Reads blobs at arbitrary revisions through one ``git cat-file --batch``.
+
+    The process is started lazily on the first read and kept alive until
+    ``close`` is called, so any number of lookups cost a single fork/exec.
+    """
+
+    _command = ["git", "cat-file", "--batch"]
+
+    def __init__(self, cwd: Optional[Union[str, Path]] = None):
+        self.cwd = cwd
+        self._proc: Optional[subprocess.Popen] = None
+        # Requests and responses share one pipe, so exchanges must not overlap
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "GitCatFileBatch":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _ensure_started(self) -> subprocess.Popen:
+        if self._proc is None:
+            try:
+                self._proc = subprocess.Popen(
+                    self._command,
+                    cwd=self.cwd,
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                )
+            except OSError as e:
+                raise GitCatFileError(f"Failed to start git cat-file: {e}")
+        return self._proc
+
+    def read(self, ref: str, path: str) -> Optional[bytes]:
+        """Read the contents of ``path`` at ``ref``.
+
+        Args:
+            ref: Git reference (commit, branch, tag, etc.)
+            path: Path of the file within the repository
+
+        Returns:
+            File contents, or None if the object does not exist
+
+        Raises:
+            GitCatFileError: If the git process fails or returns malformed output
+        """
+        return self.read_many([(ref, path)])[0]
+
+    def read_many(self, requests: List[Tuple[str, str]]) -> List[Optional[bytes]]:
+        """Read several ``(ref, path)`` pairs in one pipelined exchange.
+
+        All requests are streamed to git from a writer thread while the
+        responses are parsed here, so git's object decoding overlaps with our
+        parsing and a large batch cannot deadlock on full pipe buffers.
+
+        Args:
+            requests: ``(ref, path)`` pairs to read
+
+        Returns:
+            File contents in request order, with None for missing objects
+
+        Raises:
+            GitCatFileError: If the git process fails or returns malformed output
+        """
+        return self.read_objects([f"{ref}:{path}" for ref, path in requests])
+
+    def read_object(self, name: str) -> Optional[bytes]:
+        """Read an object by name, e.g. its hash.
+
+        Args:
+            name: Object name understood by ``git cat-file``
+
+        Returns:
+            Object contents, or None if the object does not exist
+
+        Raises:
+            GitCatFileError: If the git process fails or returns malformed output
+        """
+        return self.read_objects([name])[0]
+
+    def read_objects(self, names: List[str]) -> list:
+        """Read several objects by name in one pipelined exchange.
+
+        Args:
+            names: Object names understood by ``git cat-file``, e.g. hashes,
+                refs or ``<rev>:<path>`` specs
+
+        Returns:
+            One response per name in order, with None for missing objects
+
+        Raises:
+            GitCatFileError: If the git process fails or returns malformed output
+        """
+        if not names:
+            return []
+
+        payload = "".join(f"{name}\n" for name in names).encode()
+        write_errors: List[OSError] = []
+
+        with self._lock:
+            proc = self._ensure_started()
+
+            def write_requests() -> None:
+                try:
+                    proc.stdin.write(payload)
+                    proc.stdin.flush()
+                except OSError as e:
+                    write_errors.append(e)
+
+            writer = threading.Thread(target=write_requests, daemon=True)
+            writer.start()
+            try:
+                contents = [self._read_response(proc) for _ in names]
+            finally:
+                writer.join()
+
+        if write_errors:
+            raise GitCatFileError(f"Failed to write to git cat-file: {write_errors[0]}")
+        return contents
+
+    def _read_response(self, proc: subprocess.Popen) -> Optional[bytes]:
+        header = proc.stdout.readline()
+        if not header:
+            raise GitCatFileError("git cat-file exited unexpectedly")
+
+        # "<object> missing" / "<object> ambiguous" or "<sha> <type> <size>"
+        parts = header.split()
+        if parts[-1] in (b"missing", b"ambiguous"):
+            return None
+        if len(parts) != 3:
+            raise GitCatFileError(f"Malformed git cat-file header: {header!r}")
+
+        size = int(parts[2])
+        content = proc.stdout.read(size)
+        proc.stdout.read(1)  # Trailing newline after the object contents
+        if len(content) != size:
+            raise GitCatFileError("Truncated git cat-file output")
+        return content
+
+    def close(self) -> None:
+        """Terminate the underlying git process."""
+        if self._proc is None:
+            return
+        proc, self._proc = self._proc, None
+        try:
+            proc.stdin.close()
+        except OSError:
+            pass
+        proc.wait()
+        proc.stdout.close()
+
+
+class GitCatFileCheck(GitCatFileBatch):
+    """Looks up object names through one ``git cat-file --batch-check``.
+
+    Same protocol as ``GitCatFileBatch`` without transferring contents:
+    ``read`` and ``read_many`` return object hashes instead of contents.
+    """
+
+    _command = ["git", "cat-file", "--batch-check"]
+
+    def resolve(self, names: List[str]) -> List[Optional[str]]:
+        """Resolve revisions to object hashes, like ``git rev-parse``.
+
+        Args:
+            names: Revisions such as branch names or ``HEAD~1``
+
+        Returns:
+            Object hashes in order, with None for unknown names
+
+        Raises:
+            GitCatFileError: If the git process fails or returns malformed output
+        """
+        return self.read_objects(names)
+
+    def _read_response(self, proc: subprocess.Popen) -> Optional[str]:
+        header = proc.stdout.readline()
+        if not header:
+            raise GitCatFileError("git cat-file exited unexpectedly")
+
+        parts = header.split()
+        if parts[-1] in (b"missing", b"ambiguous"):
+            return None
+        if len(parts) != 3:
+            raise GitCatFileError(f"Malformed git cat-file header: {header!r}")
+        return parts[0].decode()
+
+
+@dataclass(frozen=True)
+class _StatusSnapshot:
+    """Branch and index state parsed from one ``git status --porcelain=v2``.
+
+    Paths are relative to the top level of the working tree.
+    """
+
+    branch: Optional[str]
+    conflicts: Tuple[str, ...]
+    changed: Tuple[str, ...]
+
+    @property
+    def detached(self) -> bool:
+        """Whether HEAD points at a commit rather than a branch."""
+        return self.branch is None
+
+
+@dataclass(**_SLOTS)
+class CommitMeta:
+    """Blame metadata shared by every line attributed to one commit."""
+
+    author: str
+
+
+# (line_number, commit_hash, line_content)
+BlameLine = Tuple[int, str, str]
+
+
+class BlameLines(Sequence[BlameLine]):
+    """Blamed lines of a file, decoded only when they are read.
+
+    Items are (line_number, commit_hash, line_content) tuples in line order.
+    Contents are kept as the bytes git produced until an item is accessed,
+    as most callers look at only a few lines of a file.
+    """
+
+    __slots__ = ("_line_numbers", "_commits", "_contents")
+
+    def __init__(self) -> None:
+        self._line_numbers: List[int] = []
+        self._commits: List[str] = []
+        self._contents: List[bytes] = []
+
+    def _append(self, line_number: int, commit_hash: str, content: bytes) -> None:
+        self._line_numbers.append(line_number)
+        self._commits.append(commit_hash)
+        self._contents.append(content)
+
+    def __len__(self) -> int:
+        return len(self._contents)
+
+    @overload
+    def __getitem__(self, index: int) -> BlameLine: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[BlameLine]: ...
+
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union[BlameLine, List[BlameLine]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return (
+            self._line_numbers[index],
+            self._commits[index],
+            self._contents[index].decode(errors="replace"),
+        )
+
+    def __repr__(self) -> str:
+        return f"BlameLines({len(self)} lines)"
+
+
+@dataclass(**_SLOTS)
+class BlameResult:
+    """Blame for a file with each commit's metadata stored once.
+
+    Attributes:
+        commits: Metadata by commit hash
+        lines: (line_number, commit_hash, line_content) tuples in line order
+    """
+
+    commits: Dict[str, CommitMeta]
+    lines: BlameLines
+
+
+@dataclass
+class RepoSummary:
+    """Repository facts gathered together by ``get_repo_summary``.
+
+    Attributes:
+        remotes: Remote names
+        branches: Local branch names
+        tags: Tag names
+        config: Requested config values, None for unset keys
+    """
+
+    remotes: List[str]
+    branches: List[str]
+    tags: List[str]
+    config: Dict[str, Optional[str]]
+
+
+def _open_libgit2(repo_path: Path) -> Optional[Any]:
+    """Open the repository in-process with libgit2, if pygit2 is installed.
+
+    Args:
+        repo_path: Path inside the repository
+
+    Returns:
+        pygit2 repository, or None if pygit2 is missing or cannot open it
+    """
+    if pygit2 is None:
+        return None
+    try:
+        git_dir = pygit2.discover_repository(str(repo_path))
+        return pygit2.Repository(git_dir) if git_dir else None
+    except (pygit2.GitError, KeyError, ValueError):
+        return None
+
+
+def _git_env() -> Dict[str, str]:
+    """Build the environment for a git process from the current one.
+
+    Git runs in the C locale so the messages matched in
+    ``GitIntegration._command_error`` do not depend on the user's language,
+    and without optional locks so queries like status don't contend for
+    index.lock with other git processes.
+
+    Returns:
+        A copy of ``os.environ`` with the overrides applied
+    """
+    return {**os.environ, "LC_ALL": "C", "GIT_OPTIONAL_LOCKS": "0"}
+
+
+def _file_stamp(path: Path) -> tuple:
+    """Return a cheap fingerprint that changes whenever a file is rewritten.
+
+    Git updates files like ``HEAD`` and ``config`` by renaming a lock file
+    over them, so the inode changes even when size and mtime do not.
+
+    Args:
+        path: File to fingerprint
+
+    Returns:
+        (inode, mtime, size), or an empty tuple if the file does not exist
+    """
+    try:
+        stat = path.stat()
+    except OSError:
+        return ()
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def _commit_subject(message: str) -> str:
+    """Return a commit's subject the way ``git log --format=%s`` prints it.
+
+    Args:
+        message: Full commit message
+
+    Returns:
+        The first paragraph of the message joined into one line
+    """
+    paragraph = re.split(r"\n[ \t]*\n", message.lstrip("\n"), maxsplit=1)[0]
+    return " ".join(line.rstrip() for line in paragraph.splitlines())
+
+
+def _decode_blob(content: bytes) -> Union[str, bytes]:
+    """Decode a blob read from ``git cat-file`` the way ``git show`` text is read.
+
+    Args:
+        content: Raw blob contents
+
+    Returns:
+        Text with universal newlines, or the raw bytes for binary content
+    """
+    # Same heuristic git uses to detect binary files
+    if b"\0" in content[:8000]:
+        return content
+    try:
+        text = content.decode("utf-8")
+    except UnicodeDecodeError:
+        return content
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
 class GitIntegration:
     """Git integration for CodeRatchet."""
 
@@ -33,11 +461,24 @@ class GitIntegration:
         if not repo_path.exists():
             raise GitError(f"Directory does not exist: {repo_path}")
 
-        # Check if it's a git repository
+        # Converted once rather than by subprocess on every git invocation
+        self._repo_path_str = str(repo_path)
+
+        # Check if it's a git repository, fetching the repository layout in the
+        # same call so later lookups don't need a process of their own. Only
+        # options that also work without a work tree are asked for, so bare
+        # repositories and .git directories are accepted
         try:
             result = subprocess.run(
-                ["git", "rev-parse", "--is-inside-work-tree"],
-                cwd=repo_path,
+                [
+                    "git",
+                    "rev-parse",
+                    "--is-inside-work-tree",
+                    "--absolute-git-dir",
+                    "--show-prefix",
+                ],
+                cwd=self._repo_path_str,
+                env=_git_env(),
                 capture_output=True,
                 text=True,
                 check=False,
@@ -48,6 +489,127 @@ class GitIntegration:
             raise GitError(f"Not a git repository: {repo_path}")
 
         self.repo_path = repo_path
+        # One value per line; the prefix line is empty at the top level
+        lines = result.stdout.split("\n")
+        layout = len(lines) > 2
+        in_work_tree = layout and lines[0] == "true"
+        # Looked up on first use by get_repo_root
+        self._toplevel: Optional[Path] = None
+        self._git_dir: Optional[Path] = Path(lines[1]) if layout else None
+        self._prefix: Optional[str] = lines[2] if in_work_tree else None
+        # Hot read-only queries skip forking git when libgit2 is available
+        self._libgit2 = _open_libgit2(repo_path)
+        # Nesting depth of batch() and the status snapshot it shares
+        self._batch_depth = 0
+        self._batch_status: Optional[_StatusSnapshot] = None
+        # Started on the first historical file read, see _cat_file
+        self._cat_file_batch: Optional[GitCatFileBatch] = None
+        self._cat_file_check_batch: Optional[GitCatFileCheck] = None
+        # Decoded blob contents by object hash, least recently used first.
+        # Unchanged files share a blob across commits, so this hits far more
+        # often than a (commit, path) key would
+        self._blob_cache: "OrderedDict[str, Union[str, bytes]]" = OrderedDict()
+        self._blob_cache_size = 0
+        # Merge bases keyed by the sorted pair of commit hashes; commits are
+        # immutable, so entries never go stale
+        self._merge_base_cache: Dict[Tuple[str, str], str] = {}
+        # Files changed by each commit, keyed by full commit hash
+        self._commit_files_cache: Dict[str, Tuple[Path, ...]] = {}
+        # Detached HEAD answer with the HEAD file stamp it was read at
+        # (see _file_stamp)
+        self._head_cache: Optional[Tuple[tuple, bool]] = None
+        # Parsed .gitmodules with the file stamp it was read at
+        self._gitmodules_cache: Optional[Tuple[tuple, configparser.ConfigParser]] = None
+
+    @contextmanager
+    def batch(self) -> Iterator["GitIntegration"]:
+        """Group several operations that assume the HEAD state does not change.
+
+        Within a batch the branch, detached HEAD and merge conflict queries
+        (including the detached HEAD check guarding most methods) are all
+        answered from a single ``git status`` snapshot, taken on first use.
+        Nested batches share the outer snapshot.
+
+        Yields:
+            This GitIntegration instance
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self._batch_status = None
+
+    def __enter__(self) -> "GitIntegration":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self) -> None:
+        """Terminate the ``git cat-file`` helper process, if one was started."""
+        if self._cat_file_batch is not None:
+            batch, self._cat_file_batch = self._cat_file_batch, None
+            batch.close()
+        if self._cat_file_check_batch is not None:
+            check, self._cat_file_check_batch = self._cat_file_check_batch, None
+            check.close()
+
+    def _cat_file(self) -> GitCatFileBatch:
+        """Return the long-lived ``git cat-file --batch`` reader for this repo."""
+        if self._cat_file_batch is None:
+            batch = GitCatFileBatch(cwd=self._repo_path_str)
+            # Make sure the helper does not outlive an unclosed instance
+            weakref.finalize(self, batch.close)
+            self._cat_file_batch = batch
+        return self._cat_file_batch
+
+    def _cat_file_check(self) -> GitCatFileCheck:
+        """Return the long-lived ``git cat-file --batch-check`` for this repo."""
+        if self._cat_file_check_batch is None:
+            check = GitCatFileCheck(cwd=self._repo_path_str)
+            weakref.finalize(self, check.close)
+            self._cat_file_check_batch = check
+        return self._cat_file_check_batch
+
+    def _cached_blob(self, oid: str) -> Optional[Union[str, bytes]]:
+        content = self._blob_cache.get(oid)
+        if content is not None:
+            self._blob_cache.move_to_end(oid)
+        return content
+
+    def _cache_blob(self, oid: str, content: Union[str, bytes]) -> None:
+        size = len(content)
+        if size > _MAX_BLOB_CACHE_BYTES:
+            return
+        self._blob_cache[oid] = content
+        self._blob_cache_size += size
+        while (
+            len(self._blob_cache) > _MAX_BLOB_CACHE_ENTRIES
+            or self._blob_cache_size > _MAX_BLOB_CACHE_BYTES
+        ):
+            _, evicted = self._blob_cache.popitem(last=False)
+            self._blob_cache_size -= len(evicted)
+
+    @staticmethod
+    def _validate_args(cmd: List[str]) -> None:
+        """Reject command arguments that could be used for command injection.
+
+        Args:
+            cmd: List of command arguments
+
+        Raises:
+            GitError: If an argument is not a string or has forbidden characters
+        """
+        for arg in cmd:
+            if not isinstance(arg, str):
+                raise GitError(f"Invalid command argument type: {type(arg)}")
+            # Allow Git format specifiers (%H, %s, etc.) and other Git-specific characters
+            if _FORBIDDEN_CHARS_RE.search(arg):
+                # Only block if it's not a Git format specifier
+                if not arg.startswith(("--format=", "--pretty=")):
+                    raise GitError(f"Invalid characters in command argument: {arg}")
 
     def _run_git_command(
         self, cmd: List[str], check: bool = True
@@ -59,44 +621,149 @@ class GitIntegration:
             check: Whether to check the return code
 
         Returns:
-            CompletedProcess object
+            CompletedProcess object. Commands that print a single value end
+            it with exactly one newline, which is all callers need to strip.
 
         Raises:
             GitError: If command fails and check is True
         """
         # Validate command arguments to prevent command injection
-        for arg in cmd:
-            if not isinstance(arg, str):
-                raise GitError(f"Invalid command argument type: {type(arg)}")
-            # Allow Git format specifiers (%H, %s, etc.) and other Git-specific characters
-            if any(
-                c in arg
-                for c in [";", "|", "&", ">", "<", "`", "$", "{", "}", "[", "]"]
-            ):
-                # Only block if it's not a Git format specifier
-                if not (arg.startswith("--format=") or arg.startswith("--pretty=")):
-                    raise GitError(f"Invalid characters in command argument: {arg}")
+        self._validate_args(cmd)
 
         try:
             return subprocess.run(
                 ["git"] + cmd,
-                cwd=self.repo_path,
+                cwd=self._repo_path_str,
+                env=_git_env(),
                 capture_output=True,
                 text=True,
                 check=check,
             )
         except subprocess.CalledProcessError as e:
-            if e.returncode == 128:
-                if "not a git repository" in (e.stderr or "").lower():
-                    raise GitError("Not a git repository")
-                elif "bad revision" in (e.stderr or "").lower():
-                    raise GitError("Invalid git revision")
-                elif "detached HEAD" in (e.stderr or "").lower():
-                    raise GitError("Git repository is in detached HEAD state")
-            raise GitError(f"Git command failed: {e.stderr if e.stderr else str(e)}")
+            raise self._command_error(e.returncode, e.stderr if e.stderr else str(e))
         except Exception as e:
             raise GitError(f"Unexpected error running git command: {e}")
 
+    @staticmethod
+    def _command_error(returncode: int, stderr: str) -> GitError:
+        """Translate a failed git command into a GitError.
+
+        Args:
+            returncode: Exit status of the git command
+            stderr: Error output of the git command
+
+        Returns:
+            GitError describing the failure
+        """
+        if returncode == 128:
+            if "not a git repository" in stderr.lower():
+                return GitError("Not a git repository")
+            elif "bad revision" in stderr.lower():
+                return GitError("Invalid git revision")
+            elif "detached HEAD" in stderr.lower():
+                return GitError("Git repository is in detached HEAD state")
+        return GitError(f"Git command failed: {stderr}")
+
+    def _stream_git(
+        self, cmd: List[str], text: bool = True
+    ) -> Iterator[Union[str, bytes]]:
+        """Run a git command and yield its output line by line as it is produced.
+
+        Unlike ``_run_git_command`` the output is never held in memory as a
+        whole, and parsing overlaps with git still producing it.
+
+        Args:
+            cmd: List of command arguments
+            text: Decode the output; with False lines are yielded as bytes so
+                callers can skip decoding the parts they don't use
+
+        Yields:
+            Output lines without their trailing newline
+
+        Raises:
+            GitError: If the command fails
+        """
+        self._validate_args(cmd)
+        # Error output goes to a file rather than a second pipe: git blocks
+        # once a pipe fills up, and nothing reads stderr while stdout is
+        # being consumed
+        with tempfile.TemporaryFile() as stderr_file:
+            try:
+                proc = subprocess.Popen(
+                    ["git"] + cmd,
+                    cwd=self._repo_path_str,
+                    env=_git_env(),
+                    stdout=subprocess.PIPE,
+                    stderr=stderr_file,
+                    text=text,
+                )
+            except OSError as e:
+                raise GitError(f"Unexpected error running git command: {e}")
+
+            newline = "\n" if text else b"\n"
+            finished = False
+            with proc:
+                try:
+                    for line in proc.stdout:
+                        yield line.rstrip(newline)
+                    finished = True
+                finally:
+                    # Stopped early: don't wait on a git still writing to the
+                    # pipe
+                    if not finished:
+                        proc.kill()
+            if proc.returncode != 0:
+                stderr_file.seek(0)
+                stderr = stderr_file.read().decode(errors="replace")
+                raise self._command_error(proc.returncode, stderr)
+
+    def _run_quiet(self, cmd: List[str]) -> None:
+        """Run a command in the repository, discarding its standard output.
+
+        Only the error output is captured, since callers report it on failure.
+
+        Args:
+            cmd: Full command line, including the executable
+
+        Raises:
+            subprocess.CalledProcessError: If the command fails
+        """
+        subprocess.run(
+            cmd,
+            cwd=self._repo_path_str,
+            env=_git_env(),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+            check=True,
+        )
+
+    def _run_merged(self, cmd: List[str]) -> str:
+        """Run a command in the repository and return its combined output.
+
+        Error output is interleaved with standard output, as a terminal
+        would show it.
+
+        Args:
+            cmd: Full command line, including the executable
+
+        Returns:
+            Decoded standard and error output
+
+        Raises:
+            subprocess.CalledProcessError: If the command fails; its output
+                attribute holds the decoded combined output
+        """
+        return subprocess.run(
+            cmd,
+            cwd=self._repo_path_str,
+            env=_git_env(),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            check=True,
+        ).stdout
+
     def _get_git_output_lines(self, cmd: List[str], check: bool = True) -> List[str]:
         """Helper method to run git command and return non-empty output lines.
 
@@ -126,9 +793,8 @@ class GitIntegration:
         Raises:
             GitError: If command fails and check is True
         """
-        return [
-            self.repo_path / line for line in self._get_git_output_lines(cmd, check)
-        ]
+        lines = self._get_git_output_lines(cmd, check)
+        return list(map(self.repo_path.joinpath, lines))
 
     def is_git_repo(self) -> bool:
         """Check if repository is a Git repository.
@@ -147,8 +813,19 @@ class GitIntegration:
         Returns:
             True if in detached HEAD state, False otherwise
         """
+        if self._batch_depth:
+            return self._status().detached
+        if self._libgit2 is not None:
+            return self._libgit2.head_is_detached
+
+        stamp = _file_stamp(self._git_dir / "HEAD") if self._git_dir else ()
+        if stamp and self._head_cache is not None and self._head_cache[0] == stamp:
+            return self._head_cache[1]
         result = self._run_git_command(["symbolic-ref", "-q", "HEAD"], check=False)
-        return result.returncode == 1
+        detached = result.returncode == 1
+        if stamp:
+            self._head_cache = (stamp, detached)
+        return detached
 
     def get_current_branch(self) -> str:
         """Get current Git branch name.
@@ -159,10 +836,69 @@ class GitIntegration:
         Raises:
             GitError: If in detached HEAD state
         """
-        if self.is_detached_head():
+        if self._batch_depth:
+            branch = self._status().branch
+            if branch is None:
+                raise GitError("Git repository is in detached HEAD state")
+            return branch
+
+        if self._libgit2 is not None:
+            if self._libgit2.head_is_detached:
+                raise GitError("Git repository is in detached HEAD state")
+            # HEAD is symbolic here, so its target is the branch ref name
+            target = self._libgit2.lookup_reference("HEAD").target
+            return (
+                target[len("refs/heads/") :]
+                if target.startswith("refs/heads/")
+                else target
+            )
+
+        result = self._run_git_command(
+            ["symbolic-ref", "-q", "--short", "HEAD"], check=False
+        )
+        if result.returncode == 1:
             raise GitError("Git repository is in detached HEAD state")
-        result = self._run_git_command(["rev-parse", "--abbrev-ref", "HEAD"])
-        return result.stdout.strip()
+        if result.returncode != 0:
+            raise GitError(f"Git command failed: {result.stderr}")
+        return result.stdout.rstrip("\n")
+
+    def _status(self) -> _StatusSnapshot:
+        """Return the batch's status snapshot, or a fresh one outside a batch.
+
+        Returns:
+            Parsed ``git status`` output
+        """
+        if not self._batch_depth:
+            return self._status_v2()
+        if self._batch_status is None:
+            self._batch_status = self._status_v2()
+        return self._batch_status
+
+    def _status_v2(self) -> _StatusSnapshot:
+        """Read branch, conflicts and changed files with one ``git status``.
+
+        Returns:
+            Parsed ``git status --porcelain=v2`` output
+        """
+        result = self._run_git_command(
+            ["status", "--porcelain=v2", "--branch", "--untracked-files=no", "-z"]
+        )
+        branch = None
+        conflicts = []
+        changed = []
+        entries = iter(result.stdout.split("\0"))
+        for entry in entries:
+            if entry.startswith("# branch.head "):
+                head = entry[len("# branch.head ") :]
+                branch = None if head == "(detached)" else head
+            elif entry.startswith("1 "):
+                changed.append(entry.split(" ", 8)[8])
+            elif entry.startswith("2 "):
+                changed.append(entry.split(" ", 9)[9])
+                next(entries, None)  # The original path of the rename or copy
+            elif entry.startswith("u "):
+                conflicts.append(entry.split(" ", 10)[10])
+        return _StatusSnapshot(branch, tuple(conflicts), tuple(changed))
 
     def get_changed_files(self, base_branch: Optional[str] = None) -> List[Path]:
         """Get list of files changed compared to base branch.
@@ -176,25 +912,29 @@ class GitIntegration:
         Raises:
             GitError: If there are merge conflicts or repository is in detached HEAD state
         """
-        if self.is_detached_head():
+        status = self._status()
+        if status.detached:
             raise GitError("Repository is in detached HEAD state")
 
-        if self.has_merge_conflicts():
+        if status.conflicts:
             raise GitError("Repository has merge conflicts")
 
-        # Get tracked changes
-        cmd = ["diff", "--name-only"]
+        # Get tracked changes; against HEAD, git status has already listed them
         if base_branch:
-            cmd.extend([base_branch + "...HEAD"])
+            tracked_changes = self._get_git_output_lines(
+                ["diff", "--name-only", base_branch + "...HEAD"], check=False
+            )
         else:
-            cmd.append("HEAD")
-
-        tracked_changes = self._get_git_paths(cmd, check=False)
+            tracked_changes = list(status.changed)
 
         # Get untracked files
-        untracked = self._get_git_paths(["ls-files", "--others", "--exclude-standard"])
+        untracked = self._get_git_output_lines(
+            ["ls-files", "--others", "--exclude-standard"]
+        )
 
-        return list(set(tracked_changes + untracked))
+        # Deduplicate the plain strings so each Path is only built once
+        changed = dict.fromkeys(tracked_changes + untracked)
+        return list(map(self.repo_path.joinpath, changed))
 
     def get_file_history(
         self, filepath: Union[str, Path]
@@ -211,18 +951,91 @@ class GitIntegration:
         if not filepath.is_absolute():
             filepath = self.repo_path / filepath
 
-        result = self._run_git_command(
-            ["log", "--format=%H|%aI|%s", "--follow", "--", str(filepath)]
-        )
-
         history = []
-        for line in result.stdout.splitlines():
+        for line in self._stream_git(
+            ["log", "--format=%H|%aI|%s", "--follow", "--", str(filepath)]
+        ):
             if not line.strip():
                 continue
             commit_hash, date_str, message = line.strip().split("|", 2)
             history.append((commit_hash, datetime.fromisoformat(date_str), message))
         return history
 
+    def get_files_history(
+        self, filepaths: Iterable[Union[str, Path]]
+    ) -> Dict[Path, List[Tuple[str, datetime, str]]]:
+        """Get commit history for several files with a single ``git log``.
+
+        The log is streamed and partitioned by file name, so N files cost one
+        history walk instead of N. Unlike ``get_file_history`` renames are not
+        followed, since ``--follow`` only supports a single path.
+
+        Args:
+            filepaths: Paths to the files
+
+        Returns:
+            Dictionary mapping each given path to a list of tuples
+            (commit_hash, commit_date, commit_message), newest first
+
+        Raises:
+            GitError: If a file is outside the repository or git fails
+        """
+        paths = [Path(filepath) for filepath in filepaths]
+        history: Dict[Path, List[Tuple[str, datetime, str]]] = {
+            path: [] for path in paths
+        }
+        if not paths:
+            return history
+
+        # git log prints names relative to the top level, not to repo_path
+        prefix = self._prefix
+        if prefix is None:
+            prefix = self._run_git_command(["rev-parse", "--show-prefix"]).stdout
+            prefix = prefix.rstrip("\n")
+        by_name: Dict[str, List[Path]] = {}
+        pathspecs = []
+        for path in history:
+            relative = self._relative_path(path)
+            by_name.setdefault(prefix + relative.as_posix(), []).append(path)
+            pathspecs.append(str(relative))
+
+        # Commit lines are NUL-prefixed so they can never be mistaken for names
+        cmd = ["-c", "core.quotePath=false", "log", "--name-only"]
+        cmd += ["--format=%x00%H|%aI|%s", "--"] + pathspecs
+
+        commit = None
+        for line in self._stream_git(cmd):
+            if line.startswith("\0"):
+                commit_hash, date_str, message = line[1:].split("|", 2)
+                commit = (commit_hash, datetime.fromisoformat(date_str), message)
+            elif line and commit is not None:
+                for path in by_name.get(line, ()):
+                    history[path].append(commit)
+        return history
+
+    def _relative_path(self, filepath: Path) -> Path:
+        """Return ``filepath`` relative to the repository path.
+
+        Args:
+            filepath: Absolute path, or path relative to the repository
+
+        Returns:
+            Path relative to the repository path
+
+        Raises:
+            GitError: If the file is not in the repository
+        """
+        if not filepath.is_absolute():
+            return filepath
+        try:
+            return filepath.relative_to(self.repo_path)
+        except ValueError:
+            pass
+        try:
+            return filepath.resolve().relative_to(self.repo_path.resolve())
+        except ValueError:
+            raise GitError(f"File {filepath} is not in repository {self.repo_path}")
+
     def get_file_content_at_commit(
         self, filepath: Union[str, Path], commit_hash: str
     ) -> Union[str, bytes]:
@@ -245,8 +1058,47 @@ class GitIntegration:
             except ValueError:
                 raise GitError(f"File {filepath} is not in repository {self.repo_path}")
 
-        result = self._run_git_command(["show", f"{commit_hash}:{filepath}"])
-        return result.stdout if isinstance(result.stdout, str) else result.stdout
+        spec = f"{commit_hash}:{filepath}"
+        self._validate_args([spec])
+        if "\n" in spec:
+            # Newlines delimit requests in the cat-file batch protocol
+            raise GitError(f"Invalid characters in command argument: {spec}")
+
+        # Resolve the path to its blob first: a file that did not change
+        # between commits keeps its blob, so repeated reads across history
+        # are served from the cache without transferring the content again
+        if self._libgit2 is not None and pygit2 is not None:
+            try:
+                blob = self._libgit2.revparse_single(spec)
+            except (KeyError, ValueError, pygit2.GitError):
+                blob = None
+            if isinstance(blob, pygit2.Blob):
+                oid = str(blob.id)
+                decoded = self._cached_blob(oid)
+                if decoded is None:
+                    decoded = _decode_blob(blob.data)
+                    self._cache_blob(oid, decoded)
+                return decoded
+        else:
+            try:
+                oid = self._cat_file_check().read(commit_hash, str(filepath))
+                if oid is not None:
+                    decoded = self._cached_blob(oid)
+                    if decoded is not None:
+                        return decoded
+                    content = self._cat_file().read_object(oid)
+                    if content is not None:
+                        decoded = _decode_blob(content)
+                        self._cache_blob(oid, decoded)
+                        return decoded
+            except GitCatFileError as e:
+                self.close()
+                raise GitError(f"Git command failed: {e}")
+
+        # Let git show report why the object is missing (bad revision,
+        # path not in commit, ...) with its usual error message
+        result = self._run_git_command(["show", spec])
+        return result.stdout
 
     def get_commit_info(self, commit_hash: str) -> Optional[Tuple[datetime, str]]:
         """Get commit information.
@@ -284,6 +1136,12 @@ class GitIntegration:
         Returns:
             True if repository has merge conflicts, False otherwise
         """
+        if self._batch_depth:
+            return bool(self._status().conflicts)
+        if self._libgit2 is not None:
+            index = self._libgit2.index
+            index.read(False)  # Only reloads if the index changed on disk
+            return index.conflicts is not None
         return bool(
             self._get_git_output_lines(["diff", "--name-only", "--diff-filter=U"])
         )
@@ -294,6 +1152,8 @@ class GitIntegration:
         Returns:
             List of file paths with merge conflicts
         """
+        if self._batch_depth:
+            return list(map(self.repo_path.joinpath, self._status().conflicts))
         return self._get_git_paths(["diff", "--name-only", "--diff-filter=U"])
 
     def add_submodule(self, url: str, path: str) -> None:
@@ -306,47 +1166,34 @@ class GitIntegration:
         if self.is_detached_head():
             raise GitError("Git repository is in detached HEAD state")
         try:
-            # First try to clone the repository to verify it exists
-            subprocess.check_output(
-                ["git", "clone", "--depth", "1", url, path],
-                stderr=subprocess.STDOUT,
-                cwd=self.repo_path,
-            )
+            # Clone first to verify the repository exists. This is not a
+            # second download: submodule add adopts the existing clone at
+            # path. Cloning directly also keeps local paths working, which
+            # submodule add refuses (protocol.file.allow) in recent git.
+            self._run_quiet(["git", "clone", "--depth", "1", url, path])
 
             # Then add it as a submodule
-            subprocess.check_output(
-                ["git", "submodule", "add", "-f", url, path],
-                stderr=subprocess.STDOUT,
-                cwd=self.repo_path,
-            )
+            self._run_quiet(["git", "submodule", "add", "-f", url, path])
         except subprocess.CalledProcessError as e:
-            raise GitError(f"Failed to add submodule: {e.output.decode()}")
+            raise GitError(f"Failed to add submodule: {e.stderr}")
 
     def init_submodules(self) -> None:
         """Initialize Git submodules."""
         if self.is_detached_head():
             raise GitError("Git repository is in detached HEAD state")
         try:
-            subprocess.check_output(
-                ["git", "submodule", "init"],
-                stderr=subprocess.STDOUT,
-                cwd=self.repo_path,
-            )
+            self._run_quiet(["git", "submodule", "init"])
         except subprocess.CalledProcessError as e:
-            raise GitError(f"Failed to initialize submodules: {e.output.decode()}")
+            raise GitError(f"Failed to initialize submodules: {e.stderr}")
 
     def update_submodules(self) -> None:
         """Update Git submodules."""
         if self.is_detached_head():
             raise GitError("Git repository is in detached HEAD state")
         try:
-            subprocess.check_output(
-                ["git", "submodule", "update", "--init", "--recursive"],
-                stderr=subprocess.STDOUT,
-                cwd=self.repo_path,
-            )
+            self._run_quiet(["git", "submodule", "update", "--init", "--recursive"])
         except subprocess.CalledProcessError as e:
-            raise GitError(f"Failed to update submodules: {e.output.decode()}")
+            raise GitError(f"Failed to update submodules: {e.stderr}")
 
     def remove_submodule(self, path: str) -> None:
         """Remove a Git submodule.
@@ -358,27 +1205,15 @@ class GitIntegration:
             raise GitError("Git repository is in detached HEAD state")
         try:
             # Remove the submodule from .git/config
-            subprocess.check_output(
-                ["git", "submodule", "deinit", "-f", path],
-                stderr=subprocess.STDOUT,
-                cwd=self.repo_path,
-            )
+            self._run_quiet(["git", "submodule", "deinit", "-f", path])
 
             # Remove the submodule from .git/modules
-            subprocess.check_output(
-                ["rm", "-rf", f".git/modules/{path}"],
-                stderr=subprocess.STDOUT,
-                cwd=self.repo_path,
-            )
+            self._run_quiet(["rm", "-rf", f".git/modules/{path}"])
 
             # Remove the submodule from the working tree
-            subprocess.check_output(
-                ["git", "rm", "-f", path],
-                stderr=subprocess.STDOUT,
-                cwd=self.repo_path,
-            )
+            self._run_quiet(["git", "rm", "-f", path])
         except subprocess.CalledProcessError as e:
-            raise GitError(f"Failed to remove submodule: {e.output.decode()}")
+            raise GitError(f"Failed to remove submodule: {e.stderr}")
 
     def get_submodule_status(self, path: str) -> Tuple[str, str]:
         """Get status of a Git submodule.
@@ -392,15 +1227,7 @@ class GitIntegration:
         if self.is_detached_head():
             raise GitError("Git repository is in detached HEAD state")
         try:
-            output = (
-                subprocess.check_output(
-                    ["git", "submodule", "status", path],
-                    stderr=subprocess.STDOUT,
-                    cwd=self.repo_path,
-                )
-                .decode()
-                .strip()
-            )
+            output = self._run_merged(["git", "submodule", "status", path]).strip()
             if not output:
                 raise GitError(f"Submodule not found: {path}")
             # The first character is the status indicator
@@ -429,20 +1256,16 @@ class GitIntegration:
             print(f"Raw output: '{output}'")
             return commit_hash, status
         except subprocess.CalledProcessError as e:
-            raise GitError(f"Failed to get submodule status: {e.output.decode()}")
+            raise GitError(f"Failed to get submodule status: {e.output}")
 
     def sync_submodules(self) -> None:
         """Sync Git submodules."""
         if self.is_detached_head():
             raise GitError("Git repository is in detached HEAD state")
         try:
-            subprocess.check_output(
-                ["git", "submodule", "sync", "--recursive"],
-                stderr=subprocess.STDOUT,
-                cwd=self.repo_path,
-            )
+            self._run_quiet(["git", "submodule", "sync", "--recursive"])
         except subprocess.CalledProcessError as e:
-            raise GitError(f"Failed to sync submodules: {e.output.decode()}")
+            raise GitError(f"Failed to sync submodules: {e.stderr}")
 
     def foreach_submodule(self, command: str) -> Dict[str, str]:
         """Run a command in each submodule.
@@ -450,33 +1273,166 @@ class GitIntegration:
         Args:
             command: Command to run
 
-        Returns:
-            Dictionary mapping submodule paths to command output
+        Returns:
+            Dictionary mapping submodule paths to command output
+        """
+        if self.is_detached_head():
+            raise GitError("Git repository is in detached HEAD state")
+        try:
+            output = self._run_merged(["git", "submodule", "foreach", command])
+        except subprocess.CalledProcessError as e:
+            raise GitError(f"Failed to run command in submodules: {e.output}")
+
+        # Each section starts on a line of its own with "Entering '<path>'"
+        sections = ("\n" + output).split("\nEntering '")[1:]
+        if sections and sections[-1].endswith("\n"):
+            sections[-1] = sections[-1][:-1]
+        results = {}
+        for section in sections:
+            header, _, body = section.partition("\n")
+            if header[:-1]:
+                results[header[:-1]] = body
+        return results
+
+    def _gitmodules(self) -> configparser.ConfigParser:
+        """Return the parsed ``.gitmodules``, re-reading it only after it changes.
+
+        Returns:
+            Parser holding one ``submodule "<name>"`` section per submodule
+
+        Raises:
+            GitError: If the file cannot be parsed
+        """
+        gitmodules = self.repo_path / ".gitmodules"
+        stamp = _file_stamp(gitmodules)
+        if self._gitmodules_cache is None or self._gitmodules_cache[0] != stamp:
+            parser = configparser.ConfigParser(
+                interpolation=None, strict=False, allow_no_value=True
+            )
+            if stamp:
+                try:
+                    parser.read_string(gitmodules.read_text(encoding="utf-8"))
+                except (configparser.Error, UnicodeDecodeError) as e:
+                    raise GitError(f"Failed to parse .gitmodules: {e}")
+            self._gitmodules_cache = (stamp, parser)
+        return self._gitmodules_cache[1]
+
+    def _get_submodule_setting(self, path: str, key: str, description: str) -> str:
+        """Read one ``.gitmodules`` setting without running git.
+
+        Args:
+            path: Path to the submodule
+            key: Setting name
+            description: Name of the setting used in error messages
+
+        Returns:
+            Setting value
+
+        Raises:
+            GitError: If the setting is not configured
+        """
+        section = f'submodule "{path}"'
+        settings = self._gitmodules()
+        if not settings.has_option(section, key):
+            raise GitError(f"Failed to get submodule {description}: {key} not set")
+
+        value = settings.get(section, key)
+        if value is None:
+            # A bare key is git's shorthand for true
+            return "true"
+        if _GIT_CONFIG_SYNTAX_RE.search(value):
+            try:
+                return self._run_merged(
+                    ["git", "config", "-f", ".gitmodules", f"submodule.{path}.{key}"]
+                )[:-1]
+            except subprocess.CalledProcessError as e:
+                raise GitError(f"Failed to get submodule {description}: {e.output}")
+        return value
+
+    def get_all_submodule_config(self, path: str) -> Dict[str, str]:
+        """Get every ``.gitmodules`` setting of a Git submodule in one call.
+
+        Args:
+            path: Path to the submodule
+
+        Returns:
+            Dictionary mapping setting names, lower-cased as git reports them,
+            to their values
+
+        Raises:
+            GitError: If the submodule is not configured or the command fails
+        """
+        if self.is_detached_head():
+            raise GitError("Git repository is in detached HEAD state")
+        section = f'submodule "{path}"'
+        settings = self._gitmodules()
+        if not settings.has_section(section):
+            raise GitError(f"Submodule not found: {path}")
+        return {
+            key: self._get_submodule_setting(path, key, key)
+            for key in settings.options(section)
+        }
+
+    def update_submodule(
+        self,
+        path: str,
+        *,
+        url: Optional[str] = None,
+        branch: Optional[str] = None,
+        new_path: Optional[str] = None,
+        ignore: Optional[str] = None,
+        update: Optional[str] = None,
+        shallow: Optional[bool] = None,
+        recursive: Optional[bool] = None,
+    ) -> None:
+        """Change several ``.gitmodules`` settings of a submodule at once.
+
+        Settings left as None are not touched. The submodule is synced once
+        after all settings are written, rather than once per setting.
+
+        Args:
+            path: Path to the submodule
+            url: New remote URL
+            branch: Branch name
+            new_path: New path
+            ignore: Ignore setting
+            update: Update setting
+            shallow: True to enable shallow clone
+            recursive: True to enable recursive clone
+
+        Raises:
+            GitError: If in detached HEAD state or a git command fails
         """
         if self.is_detached_head():
             raise GitError("Git repository is in detached HEAD state")
+        changes = [
+            ("url", url, "remote URL"),
+            ("branch", branch, "branch"),
+            ("path", new_path, "path"),
+            ("ignore", ignore, "ignore setting"),
+            ("update", update, "update setting"),
+            ("shallow", shallow, "shallow setting"),
+            ("recursive", recursive, "recursive setting"),
+        ]
+        changes = [change for change in changes if change[1] is not None]
+        if not changes:
+            return
+
+        # git config writes each key without disturbing the file's layout
+        for key, value, description in changes:
+            name = f"submodule.{path}.{key}"
+            if isinstance(value, bool):
+                value = str(value).lower()
+            try:
+                self._run_quiet(["git", "config", "-f", ".gitmodules", name, value])
+            except subprocess.CalledProcessError as e:
+                raise GitError(f"Failed to set submodule {description}: {e.stderr}")
+
         try:
-            output = subprocess.check_output(
-                ["git", "submodule", "foreach", command],
-                stderr=subprocess.STDOUT,
-                cwd=self.repo_path,
-            ).decode()
-            results = {}
-            current_submodule = None
-            current_output = []
-            for line in output.splitlines():
-                if line.startswith("Entering '"):
-                    if current_submodule:
-                        results[current_submodule] = "\n".join(current_output)
-                    current_submodule = line[10:-1]
-                    current_output = []
-                else:
-                    current_output.append(line)
-            if current_submodule:
-                results[current_submodule] = "\n".join(current_output)
-            return results
+            self._run_quiet(["git", "submodule", "sync", path])
         except subprocess.CalledProcessError as e:
-            raise GitError(f"Failed to run command in submodules: {e.output.decode()}")
+            descriptions = ", ".join(change[2] for change in changes)
+            raise GitError(f"Failed to set submodule {descriptions}: {e.stderr}")
 
     def get_submodule_remote_url(self, path: str) -> str:
         """Get remote URL of a Git submodule.
@@ -489,19 +1445,7 @@ class GitIntegration:
         """
         if self.is_detached_head():
             raise GitError("Git repository is in detached HEAD state")
-        try:
-            output = (
-                subprocess.check_output(
-                    ["git", "config", "-f", ".gitmodules", f"submodule.{path}.url"],
-                    stderr=subprocess.STDOUT,
-                    cwd=self.repo_path,
-                )
-                .decode()
-                .strip()
-            )
-            return output
-        except subprocess.CalledProcessError as e:
-            raise GitError(f"Failed to get submodule remote URL: {e.output.decode()}")
+        return self._get_submodule_setting(path, "url", "remote URL")
 
     def set_submodule_remote_url(self, path: str, url: str) -> None:
         """Set remote URL of a Git submodule.
@@ -510,21 +1454,7 @@ class GitIntegration:
             path: Path to the submodule
             url: New remote URL
         """
-        if self.is_detached_head():
-            raise GitError("Git repository is in detached HEAD state")
-        try:
-            subprocess.check_output(
-                ["git", "config", "-f", ".gitmodules", f"submodule.{path}.url", url],
-                stderr=subprocess.STDOUT,
-                cwd=self.repo_path,
-            )
-            subprocess.check_output(
-                ["git", "submodule", "sync", path],
-                stderr=subprocess.STDOUT,
-                cwd=self.repo_path,
-            )
-        except subprocess.CalledProcessError as e:
-            raise GitError(f"Failed to set submodule remote URL: {e.output.decode()}")
+        self.update_submodule(path, url=url)
 
     def get_submodule_branch(self, path: str) -> str:
         """Get branch of a Git submodule.
@@ -537,19 +1467,7 @@ class GitIntegration:
         """
         if self.is_detached_head():
             raise GitError("Git repository is in detached HEAD state")
-        try:
-            output = (
-                subprocess.check_output(
-                    ["git", "config", "-f", ".gitmodules", f"submodule.{path}.branch"],
-                    stderr=subprocess.STDOUT,
-                    cwd=self.repo_path,
-                )
-                .decode()
-                .strip()
-            )
-            return output
-        except subprocess.CalledProcessError as e:
-            raise GitError(f"Failed to get submodule branch: {e.output.decode()}")
+        return self._get_submodule_setting(path, "branch", "branch")
 
     def set_submodule_branch(self, path: str, branch: str) -> None:
         """Set branch of a Git submodule.
@@ -558,28 +1476,7 @@ class GitIntegration:
             path: Path to the submodule
             branch: Branch name
         """
-        if self.is_detached_head():
-            raise GitError("Git repository is in detached HEAD state")
-        try:
-            subprocess.check_output(
-                [
-                    "git",
-                    "config",
-                    "-f",
-                    ".gitmodules",
-                    f"submodule.{path}.branch",
-                    branch,
-                ],
-                stderr=subprocess.STDOUT,
-                cwd=self.repo_path,
-            )
-            subprocess.check_output(
-                ["git", "submodule", "sync", path],
-                stderr=subprocess.STDOUT,
-                cwd=self.repo_path,
-            )
-        except subprocess.CalledProcessError as e:
-            raise GitError(f"Failed to set submodule branch: {e.output.decode()}")
+        self.update_submodule(path, branch=branch)
 
     def get_submodule_path(self, path: str) -> str:
         """Get path of a Git submodule.
@@ -592,19 +1489,8 @@ class GitIntegration:
         """
         if self.is_detached_head():
             raise GitError("Git repository is in detached HEAD state")
-        try:
-            output = (
-                subprocess.check_output(
-                    ["git", "config", "-f", ".gitmodules", f"submodule.{path}.path"],
-                    stderr=subprocess.STDOUT,
-                    cwd=self.repo_path,
-                )
-                .decode()
-                .strip()
-            )
-            return str(Path(self.repo_path) / output)
-        except subprocess.CalledProcessError as e:
-            raise GitError(f"Failed to get submodule path: {e.output.decode()}")
+        output = self._get_submodule_setting(path, "path", "path")
+        return str(Path(self.repo_path) / output)
 
     def set_submodule_path(self, path: str, new_path: str) -> None:
         """Set path of a Git submodule.
@@ -613,28 +1499,7 @@ class GitIntegration:
             path: Current path to the submodule
             new_path: New path
         """
-        if self.is_detached_head():
-            raise GitError("Git repository is in detached HEAD state")
-        try:
-            subprocess.check_output(
-                [
-                    "git",
-                    "config",
-                    "-f",
-                    ".gitmodules",
-                    f"submodule.{path}.path",
-                    new_path,
-                ],
-                stderr=subprocess.STDOUT,
-                cwd=self.repo_path,
-            )
-            subprocess.check_output(
-                ["git", "submodule", "sync", path],
-                stderr=subprocess.STDOUT,
-                cwd=self.repo_path,
-            )
-        except subprocess.CalledProcessError as e:
-            raise GitError(f"Failed to set submodule path: {e.output.decode()}")
+        self.update_submodule(path, new_path=new_path)
 
     def get_submodule_ignore(self, path: str) -> str:
         """Get ignore setting of a Git submodule.
@@ -647,21 +1512,7 @@ class GitIntegration:
         """
         if self.is_detached_head():
             raise GitError("Git repository is in detached HEAD state")
-        try:
-            output = (
-                subprocess.check_output(
-                    ["git", "config", "-f", ".gitmodules", f"submodule.{path}.ignore"],
-                    stderr=subprocess.STDOUT,
-                    cwd=self.repo_path,
-                )
-                .decode()
-                .strip()
-            )
-            return output
-        except subprocess.CalledProcessError as e:
-            raise GitError(
-                f"Failed to get submodule ignore setting: {e.output.decode()}"
-            )
+        return self._get_submodule_setting(path, "ignore", "ignore setting")
 
     def set_submodule_ignore(self, path: str, ignore: str) -> None:
         """Set ignore setting of a Git submodule.
@@ -670,30 +1521,7 @@ class GitIntegration:
             path: Path to the submodule
             ignore: Ignore setting
         """
-        if self.is_detached_head():
-            raise GitError("Git repository is in detached HEAD state")
-        try:
-            subprocess.check_output(
-                [
-                    "git",
-                    "config",
-                    "-f",
-                    ".gitmodules",
-                    f"submodule.{path}.ignore",
-                    ignore,
-                ],
-                stderr=subprocess.STDOUT,
-                cwd=self.repo_path,
-            )
-            subprocess.check_output(
-                ["git", "submodule", "sync", path],
-                stderr=subprocess.STDOUT,
-                cwd=self.repo_path,
-            )
-        except subprocess.CalledProcessError as e:
-            raise GitError(
-                f"Failed to set submodule ignore setting: {e.output.decode()}"
-            )
+        self.update_submodule(path, ignore=ignore)
 
     def get_submodule_update(self, path: str) -> str:
         """Get update setting of a Git submodule.
@@ -706,21 +1534,7 @@ class GitIntegration:
         """
         if self.is_detached_head():
             raise GitError("Git repository is in detached HEAD state")
-        try:
-            output = (
-                subprocess.check_output(
-                    ["git", "config", "-f", ".gitmodules", f"submodule.{path}.update"],
-                    stderr=subprocess.STDOUT,
-                    cwd=self.repo_path,
-                )
-                .decode()
-                .strip()
-            )
-            return output
-        except subprocess.CalledProcessError as e:
-            raise GitError(
-                f"Failed to get submodule update setting: {e.output.decode()}"
-            )
+        return self._get_submodule_setting(path, "update", "update setting")
 
     def set_submodule_update(self, path: str, update: str) -> None:
         """Set update setting of a Git submodule.
@@ -729,30 +1543,7 @@ class GitIntegration:
             path: Path to the submodule
             update: Update setting
         """
-        if self.is_detached_head():
-            raise GitError("Git repository is in detached HEAD state")
-        try:
-            subprocess.check_output(
-                [
-                    "git",
-                    "config",
-                    "-f",
-                    ".gitmodules",
-                    f"submodule.{path}.update",
-                    update,
-                ],
-                stderr=subprocess.STDOUT,
-                cwd=self.repo_path,
-            )
-            subprocess.check_output(
-                ["git", "submodule", "sync", path],
-                stderr=subprocess.STDOUT,
-                cwd=self.repo_path,
-            )
-        except subprocess.CalledProcessError as e:
-            raise GitError(
-                f"Failed to set submodule update setting: {e.output.decode()}"
-            )
+        self.update_submodule(path, update=update)
 
     def get_submodule_shallow(self, path: str) -> bool:
         """Get shallow clone setting of a Git submodule.
@@ -765,21 +1556,8 @@ class GitIntegration:
         """
         if self.is_detached_head():
             raise GitError("Git repository is in detached HEAD state")
-        try:
-            output = (
-                subprocess.check_output(
-                    ["git", "config", "-f", ".gitmodules", f"submodule.{path}.shallow"],
-                    stderr=subprocess.STDOUT,
-                    cwd=self.repo_path,
-                )
-                .decode()
-                .strip()
-            )
-            return output.lower() == "true"
-        except subprocess.CalledProcessError as e:
-            raise GitError(
-                f"Failed to get submodule shallow setting: {e.output.decode()}"
-            )
+        output = self._get_submodule_setting(path, "shallow", "shallow setting")
+        return output.lower() == "true"
 
     def set_submodule_shallow(self, path: str, shallow: bool) -> None:
         """Set shallow clone setting of a Git submodule.
@@ -788,30 +1566,7 @@ class GitIntegration:
             path: Path to the submodule
             shallow: True to enable shallow clone
         """
-        if self.is_detached_head():
-            raise GitError("Git repository is in detached HEAD state")
-        try:
-            subprocess.check_output(
-                [
-                    "git",
-                    "config",
-                    "-f",
-                    ".gitmodules",
-                    f"submodule.{path}.shallow",
-                    str(shallow).lower(),
-                ],
-                stderr=subprocess.STDOUT,
-                cwd=self.repo_path,
-            )
-            subprocess.check_output(
-                ["git", "submodule", "sync", path],
-                stderr=subprocess.STDOUT,
-                cwd=self.repo_path,
-            )
-        except subprocess.CalledProcessError as e:
-            raise GitError(
-                f"Failed to set submodule shallow setting: {e.output.decode()}"
-            )
+        self.update_submodule(path, shallow=shallow)
 
     def get_submodule_recursive(self, path: str) -> bool:
         """Get recursive clone setting of a Git submodule.
@@ -824,27 +1579,8 @@ class GitIntegration:
         """
         if self.is_detached_head():
             raise GitError("Git repository is in detached HEAD state")
-        try:
-            output = (
-                subprocess.check_output(
-                    [
-                        "git",
-                        "config",
-                        "-f",
-                        ".gitmodules",
-                        f"submodule.{path}.recursive",
-                    ],
-                    stderr=subprocess.STDOUT,
-                    cwd=self.repo_path,
-                )
-                .decode()
-                .strip()
-            )
-            return output.lower() == "true"
-        except subprocess.CalledProcessError as e:
-            raise GitError(
-                f"Failed to get submodule recursive setting: {e.output.decode()}"
-            )
+        output = self._get_submodule_setting(path, "recursive", "recursive setting")
+        return output.lower() == "true"
 
     def set_submodule_recursive(self, path: str, recursive: bool) -> None:
         """Set recursive clone setting of a Git submodule.
@@ -853,30 +1589,7 @@ class GitIntegration:
             path: Path to the submodule
             recursive: True to enable recursive clone
         """
-        if self.is_detached_head():
-            raise GitError("Git repository is in detached HEAD state")
-        try:
-            subprocess.check_output(
-                [
-                    "git",
-                    "config",
-                    "-f",
-                    ".gitmodules",
-                    f"submodule.{path}.recursive",
-                    str(recursive).lower(),
-                ],
-                stderr=subprocess.STDOUT,
-                cwd=self.repo_path,
-            )
-            subprocess.check_output(
-                ["git", "submodule", "sync", path],
-                stderr=subprocess.STDOUT,
-                cwd=self.repo_path,
-            )
-        except subprocess.CalledProcessError as e:
-            raise GitError(
-                f"Failed to set submodule recursive setting: {e.output.decode()}"
-            )
+        self.update_submodule(path, recursive=recursive)
 
     def get_submodule_fetchRecurseSubmodules(self, path: str) -> bool:
         """Get the fetchRecurseSubmodules setting for a submodule.
@@ -931,6 +1644,8 @@ class GitIntegration:
         Returns:
             List of remote names
         """
+        if self._libgit2 is not None:
+            return list(self._libgit2.remotes.names())
         return self._get_git_output_lines(["remote"])
 
     def get_branches(self) -> List[str]:
@@ -939,6 +1654,9 @@ class GitIntegration:
         Returns:
             List of branch names
         """
+        if self._libgit2 is not None:
+            # git lists branches sorted by name
+            return sorted(self._libgit2.branches.local)
         return self._get_git_output_lines(
             ["branch", "--list", "--format=%(refname:short)"]
         )
@@ -953,8 +1671,64 @@ class GitIntegration:
         Returns:
             Merge base commit hash
         """
-        result = self._run_git_command(["merge-base", commit1, commit2])
-        return result.stdout.strip()
+        refs = [commit1, commit2]
+        if self._libgit2 is not None:
+            merge_base = self._libgit2_merge_base(refs)
+            if merge_base is not None:
+                return merge_base
+            # Unknown refs or unrelated histories: let git report the error
+
+        names = [ref for ref in refs if not _FULL_SHA_RE.fullmatch(ref)]
+        if names:
+            # Branch names move, so cache on the commits they point to now.
+            # They are resolved over the long-lived cat-file pipe; unknown
+            # names go to rev-parse for its error message
+            self._validate_args(names)
+            resolved = None
+            if not any("\n" in name for name in names):
+                try:
+                    resolved = self._cat_file_check().resolve(names)
+                except GitCatFileError:
+                    self.close()
+            if resolved is None or None in resolved:
+                resolved = self._get_git_output_lines(["rev-parse"] + names)
+            resolved = iter(resolved)
+            refs = [ref if ref not in names else next(resolved) for ref in refs]
+
+        key = (min(refs), max(refs))
+        merge_base = self._merge_base_cache.get(key)
+        if merge_base is None:
+            result = self._run_git_command(["merge-base"] + refs)
+            merge_base = self._merge_base_cache[key] = result.stdout.rstrip("\n")
+        return merge_base
+
+    def _libgit2_merge_base(self, refs: List[str]) -> Optional[str]:
+        """Compute a merge base in-process, sharing the merge base cache.
+
+        Args:
+            refs: The two commit references
+
+        Returns:
+            Merge base commit hash, or None if it cannot be determined
+        """
+        if self._libgit2 is None or pygit2 is None:
+            return None
+        try:
+            commits = [
+                str(self._libgit2.revparse_single(ref).peel(pygit2.Commit).id)
+                for ref in refs
+            ]
+        except (KeyError, ValueError, pygit2.GitError):
+            return None
+
+        key = (min(commits), max(commits))
+        merge_base = self._merge_base_cache.get(key)
+        if merge_base is None:
+            oid = self._libgit2.merge_base(*commits)
+            if oid is None:
+                return None
+            merge_base = self._merge_base_cache[key] = str(oid)
+        return merge_base
 
     def get_commit_files(self, commit_hash: str) -> List[Path]:
         """Get list of files changed in a commit.
@@ -965,7 +1739,15 @@ class GitIntegration:
         Returns:
             List of changed file paths
         """
-        return self._get_git_paths(["show", "--pretty=", "--name-only", commit_hash])
+        # A commit's changes never change, but what a branch name points to
+        # does, so only full hashes are cached
+        cacheable = _FULL_SHA_RE.fullmatch(commit_hash) is not None
+        if cacheable and commit_hash in self._commit_files_cache:
+            return list(self._commit_files_cache[commit_hash])
+        files = self._get_git_paths(["show", "--pretty=", "--name-only", commit_hash])
+        if cacheable:
+            self._commit_files_cache[commit_hash] = tuple(files)
+        return files
 
     def get_file_blame(
         self, filepath: Union[str, Path]
@@ -978,6 +1760,73 @@ class GitIntegration:
         Returns:
             List of (commit_hash, author, line_number, line_content) tuples
         """
+        return [
+            (commit_hash, author, line_number, content.decode(errors="replace"))
+            for commit_hash, author, line_number, content in self._iter_blame(filepath)
+        ]
+
+    def get_files_blame(
+        self, filepaths: Iterable[Union[str, Path]]
+    ) -> Dict[Path, List[Tuple[str, str, int, str]]]:
+        """Get blame information for several files at once.
+
+        git blame takes one file per run, so the runs are spread over a few
+        threads; each one mostly waits on its git process.
+
+        Args:
+            filepaths: Paths to files
+
+        Returns:
+            Blame tuples as returned by ``get_file_blame``, keyed by path
+
+        Raises:
+            GitError: If blaming any of the files fails
+        """
+        paths = list(dict.fromkeys(map(Path, filepaths)))
+        if not paths:
+            return {}
+        workers = min(len(paths), os.cpu_count() or 1, _MAX_PARALLEL_GIT)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(self.get_file_blame, paths)
+            return dict(zip(paths, results))
+
+    def get_file_blame_grouped(self, filepath: Union[str, Path]) -> BlameResult:
+        """Get blame information for a file without repeating commit metadata.
+
+        Files are usually blamed to far fewer commits than they have lines, so
+        this holds one author per commit instead of one per line. Line
+        contents are decoded as they are read from the result.
+
+        Args:
+            filepath: Path to file
+
+        Returns:
+            Commit metadata by hash and (line_number, commit_hash, content)
+            tuples
+        """
+        commits: Dict[str, CommitMeta] = {}
+        lines = BlameLines()
+        for commit_hash, author, line_number, content in self._iter_blame(filepath):
+            if commit_hash not in commits:
+                commits[commit_hash] = CommitMeta(author=author)
+            lines._append(line_number, commit_hash, content)
+        return BlameResult(commits=commits, lines=lines)
+
+    def _iter_blame(
+        self, filepath: Union[str, Path]
+    ) -> Iterator[Tuple[str, str, int, bytes]]:
+        """Yield blame records for a file as git produces them.
+
+        Args:
+            filepath: Path to file
+
+        Yields:
+            (commit_hash, author, line_number, line_content) tuples in line
+            order, with the content still undecoded
+
+        Raises:
+            GitError: If the file is outside the repository or blame fails
+        """
         filepath = Path(filepath)
         if filepath.is_absolute():
             try:
@@ -985,48 +1834,38 @@ class GitIntegration:
             except ValueError:
                 raise GitError(f"File {filepath} is not in repository {self.repo_path}")
 
-        # Use a simpler format that's easier to parse
-        result = self._run_git_command(
-            [
-                "blame",
-                "--line-porcelain",  # Output in a more structured format
-                str(filepath),
-            ]
-        )
-
-        blame_info = []
-        lines = result.stdout.splitlines()
-        i = 0
-        while i < len(lines):
-            line = lines[i]
-            if not line.strip():
-                i += 1
-                continue
-
-            # Each section starts with the commit hash and line info
-            if line[0].isalnum():
-                parts = line.split()
-                if len(parts) >= 3:
-                    commit_hash = parts[0]
-                    line_number = int(parts[2])
-
-                    # Skip to author line
-                    while i < len(lines) and not lines[i].startswith("author "):
-                        i += 1
-                    if i < len(lines):
-                        author = lines[i][7:]  # Remove 'author ' prefix
-
-                        # Skip to content line
-                        while i < len(lines) and not lines[i].startswith("\t"):
-                            i += 1
-                        if i < len(lines):
-                            content = lines[i][1:]  # Remove tab prefix
-                            blame_info.append(
-                                (commit_hash, author, line_number, content)
-                            )
-            i += 1
-
-        return sorted(blame_info, key=lambda x: x[2])  # Sort by line number
+        # --line-porcelain repeats the commit's metadata before every line, so
+        # a record is: "<sha> <orig line> <final line> [<count>]", "key value"
+        # lines, then the line itself prefixed with a tab. Records come in
+        # final line order. The output is parsed as it streams in, as bytes,
+        # decoding only the fields that are kept. Metadata is decoded once per
+        # commit: later records of a known commit go straight to their content
+        commits: Dict[bytes, Tuple[str, str]] = {}
+        header = None
+        commit = None
+        author = ""
+        # Looked up once rather than for every line of output
+        startswith = bytes.startswith
+        intern = sys.intern
+        to_int = int
+        for line in self._stream_git(
+            ["blame", "--line-porcelain", str(filepath)], text=False
+        ):
+            if header is None:
+                header = line.split(b" ", 3)
+                commit = commits.get(header[0])
+            elif startswith(line, b"\t"):
+                if commit is None:
+                    # Interned: each hash recurs on every line of its commits
+                    commit = (intern(header[0].decode()), author)
+                    commits[header[0]] = commit
+                content = line[1:]
+                if content.endswith(b"\r"):
+                    content = content[:-1]
+                yield commit[0], commit[1], to_int(header[2]), content
+                header = None
+            elif commit is None and startswith(line, b"author "):
+                author = line[7:].decode(errors="replace")
 
     def get_stash_list(self) -> List[Tuple[str, str]]:
         """Get list of stashes.
@@ -1034,18 +1873,18 @@ class GitIntegration:
         Returns:
             List of (stash_hash, stash_message) tuples
         """
-        result = self._run_git_command(["stash", "list", "--format=%H %s"])
         stashes = []
-        for line in result.stdout.splitlines():
-            if not line.strip():
+        for line in self._stream_git(["stash", "list", "--format=%H%x00%s"]):
+            stash_hash, sep, message = line.partition("\x00")
+            if not sep:
                 continue
-            parts = line.split(" ", 1)
-            if len(parts) == 2:
-                stash_hash, message = parts
-                # Remove branch prefix from message if present
-                if message.startswith("On "):
-                    message = message.split(": ", 1)[1]
-                stashes.append((stash_hash, message))
+            # Remove the "On <branch>: " prefix of stashes saved with a message;
+            # branch names cannot contain ": "
+            if message.startswith("On "):
+                _, sep, rest = message.partition(": ")
+                if sep:
+                    message = rest
+            stashes.append((stash_hash, message))
         return stashes
 
     def get_tag_list(self) -> List[str]:
@@ -1054,6 +1893,13 @@ class GitIntegration:
         Returns:
             List of tag names
         """
+        if self._libgit2 is not None:
+            prefix = "refs/tags/"
+            return sorted(
+                ref[len(prefix) :]
+                for ref in self._libgit2.references
+                if ref.startswith(prefix)
+            )
         return self._get_git_output_lines(["tag", "--list"])
 
     def get_config_value(self, key: str) -> Optional[str]:
@@ -1065,8 +1911,52 @@ class GitIntegration:
         Returns:
             Config value or None if not found
         """
+        if self._libgit2 is not None and pygit2 is not None:
+            try:
+                return self._libgit2.config[key]
+            except KeyError:
+                return None
+            except (ValueError, pygit2.GitError):
+                pass  # Multi-valued or malformed keys: defer to git
+
         result = self._run_git_command(["config", "--get", key], check=False)
-        return result.stdout.strip() if result.returncode == 0 else None
+        return result.stdout.rstrip("\n") if result.returncode == 0 else None
+
+    def get_repo_summary(self, config_keys: Iterable[str] = ()) -> RepoSummary:
+        """Gather remotes, branches, tags and config values in one call.
+
+        The queries are independent, so without pygit2 their git processes
+        run concurrently and the call takes about as long as the slowest one.
+
+        Args:
+            config_keys: Config keys to read
+
+        Returns:
+            The collected repository facts
+
+        Raises:
+            GitError: If any of the queries fails
+        """
+        config_keys = list(config_keys)
+        queries = [self.get_remotes, self.get_branches, self.get_tag_list]
+        queries += [lambda key=key: self.get_config_value(key) for key in config_keys]
+
+        if self._libgit2 is not None:
+            # In-process lookups are cheaper than a thread hand-off
+            results = [query() for query in queries]
+        else:
+            workers = min(len(queries), _MAX_PARALLEL_GIT)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(query) for query in queries]
+                results = [future.result() for future in futures]
+
+        remotes, branches, tags, *values = results
+        return RepoSummary(
+            remotes=remotes,
+            branches=branches,
+            tags=tags,
+            config=dict(zip(config_keys, values)),
+        )
 
     def set_config_value(self, key: str, value: str) -> None:
         """Set Git config value.
@@ -1084,7 +1974,7 @@ class GitIntegration:
             Path to hooks directory
         """
         result = self._run_git_command(["rev-parse", "--git-path", "hooks"])
-        return Path(result.stdout.strip())
+        return Path(result.stdout.rstrip("\n"))
 
     def get_repo_root(self) -> Path:
         """Get repository root path.
@@ -1092,8 +1982,10 @@ class GitIntegration:
         Returns:
             Repository root path
         """
-        result = self._run_git_command(["rev-parse", "--show-toplevel"])
-        return Path(result.stdout.strip())
+        if self._toplevel is None:
+            result = self._run_git_command(["rev-parse", "--show-toplevel"])
+            self._toplevel = Path(result.stdout.rstrip("\n"))
+        return self._toplevel
 
     def get_git_history(
         self, limit: Optional[int] = None
@@ -1109,26 +2001,70 @@ class GitIntegration:
         Raises:
             GitError: If there is an error getting the Git history
         """
+        return list(self.iter_git_history(limit))
+
+    def iter_git_history(
+        self, limit: Optional[int] = None
+    ) -> Iterator[Tuple[str, datetime, str]]:
+        """Iterate over Git commit history, newest first, as it is read.
+
+        Only the commits that are consumed get parsed; git is stopped when the
+        iterator is closed or garbage collected early.
+
+        Args:
+            limit: Maximum number of commits to yield. If None, yields all commits.
+
+        Returns:
+            Iterator of (commit_hash, commit_date, commit_message) tuples
+
+        Raises:
+            GitError: If HEAD is detached, or while iterating if git log fails
+        """
         if self.is_detached_head():
             raise GitError("Git repository is in detached HEAD state")
 
-        cmd = ["log", "--format=%H %at %s"]
+        if self._libgit2 is not None and pygit2 is not None:
+            try:
+                head = self._libgit2.head.target
+            except pygit2.GitError:
+                pass  # Unborn branch: let git log report it
+            else:
+                commits = self._libgit2.walk(head, pygit2.GIT_SORT_TIME)
+                return (
+                    (
+                        str(commit.id),
+                        datetime.fromtimestamp(commit.author.time),
+                        _commit_subject(commit.message),
+                    )
+                    for commit in itertools.islice(commits, limit)
+                )
+
+        # NUL separated, so subjects keep their exact whitespace
+        cmd = ["log", "--format=%H%x00%at%x00%s"]
         if limit is not None:
             cmd.append(f"-n{limit}")
+        return self._parse_history(self._stream_git(cmd))
 
-        result = self._run_git_command(cmd)
+    @staticmethod
+    def _parse_history(lines: Iterable[str]) -> Iterator[Tuple[str, datetime, str]]:
+        """Parse ``%H%x00%at%x00%s`` log lines into history tuples.
 
-        history = []
-        for line in result.stdout.splitlines():
+        Args:
+            lines: Log output lines
+
+        Yields:
+            (commit_hash, commit_date, commit_message) tuples
+
+        Raises:
+            GitError: If a line is malformed
+        """
+        for line in lines:
             try:
-                commit_hash, timestamp, *message_parts = line.split()
+                commit_hash, timestamp, commit_message = line.split("\x00", 2)
                 commit_date = datetime.fromtimestamp(int(timestamp))
-                commit_message = " ".join(message_parts)
-                history.append((commit_hash, commit_date, commit_message))
-            except (ValueError, IndexError) as e:
+            except ValueError as e:
                 raise GitError(f"Invalid git log output: {e}")
-
-        return history
+            yield commit_hash, commit_date, commit_message
 
 
 def init_git_repo(repo_path: Path) -> None:
@@ -1150,11 +2086,66 @@ def init_git_repo(repo_path: Path) -> None:
         raise GitError(f"Unexpected error initializing Git repository: {e}")
 
 
+def add_worktree(repo_path: Path, name: str, ref: str = "HEAD") -> Path:
+    """Check out ``ref`` in a new worktree next to the repository.
+
+    Each worktree has its own index and HEAD, so callers working in parallel
+    on one repository don't contend for its index lock. Parallel callers must
+    each use a distinct worktree.
+
+    Args:
+        repo_path: Path to repository
+        name: Worktree name, unique among the repository's worktrees
+        ref: Commit to check out, detached
+
+    Returns:
+        Path to the worktree, ``<parent of repo_path>/wt-<name>``
+
+    Raises:
+        GitError: If the worktree cannot be created
+    """
+    worktree = Path(repo_path).resolve().parent / f"wt-{name}"
+    try:
+        subprocess.run(
+            ["git", "worktree", "add", "--detach", str(worktree), ref],
+            cwd=repo_path,
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+    except subprocess.CalledProcessError as e:
+        raise GitError(f"Failed to add worktree: {e.stderr}")
+    return worktree
+
+
+def remove_worktree(repo_path: Path, worktree: Path) -> None:
+    """Delete a worktree created by ``add_worktree``, discarding its changes.
+
+    Args:
+        repo_path: Path to repository
+        worktree: Path to the worktree
+
+    Raises:
+        GitError: If the worktree cannot be removed
+    """
+    try:
+        subprocess.run(
+            ["git", "worktree", "remove", "--force", str(worktree)],
+            cwd=repo_path,
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+    except subprocess.CalledProcessError as e:
+        raise GitError(f"Failed to remove worktree: {e.stderr}")
+
+
 def add_and_commit(repo_path: Path, message: str) -> None:
     """Add all changes and create a commit.
 
     Args:
-        repo_path: Path to repository
+        repo_path: Path to repository, or to one of its worktrees (see
+            ``add_worktree``) to commit there
         message: Commit message
 
     Raises:
@@ -1170,39 +2161,38 @@ def add_and_commit(repo_path: Path, message: str) -> None:
             text=True,
         )
 
-        # Configure Git user if not set
-        try:
-            subprocess.run(
-                ["git", "config", "user.name"],
-                cwd=repo_path,
-                check=True,
-                capture_output=True,
-                text=True,
-            )
-        except subprocess.CalledProcessError:
-            subprocess.run(
-                ["git", "config", "user.name", "Test User"],
+        # Commit with the configured identity. useConfigOnly stops git from
+        # inventing one from the host name, so an unconfigured repository
+        # fails here and is retried with the default identity below
+        commit = ["commit", "-m", message]
+        result = subprocess.run(
+            ["git", "-c", "user.useConfigOnly=true"] + commit,
+            cwd=repo_path,
+            env={**os.environ, "LC_ALL": "C"},
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0 and "auto-detection is disabled" in result.stderr:
+            configured = subprocess.run(
+                ["git", "config", "--get-regexp", r"^user\.(name|email)$"],
                 cwd=repo_path,
-                check=True,
                 capture_output=True,
                 text=True,
-            )
-            subprocess.run(
-                ["git", "config", "user.email", "test@example.com"],
+            ).stdout
+            configured_keys = {
+                line.split(" ", 1)[0] for line in configured.splitlines()
+            }
+            overrides = []
+            for key, value in _DEFAULT_IDENTITY.items():
+                if key not in configured_keys:
+                    overrides += ["-c", f"{key}={value}"]
+            result = subprocess.run(
+                ["git"] + overrides + commit,
                 cwd=repo_path,
-                check=True,
                 capture_output=True,
                 text=True,
             )
-
-        # Create commit
-        subprocess.run(
-            ["git", "commit", "-m", message],
-            cwd=repo_path,
-            check=True,
-            capture_output=True,
-            text=True,
-        )
+        result.check_returncode()
     except subprocess.CalledProcessError as e:
         raise GitError(f"Failed to create commit: {e.stderr}")
     except Exception as e:
@@ -2,9 +2,25 @@
 Core ratchet test classes and functionality.
 """
 
+import ast
+import functools
+import mmap
+import os
 import re
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from operator import add
 from pathlib import Path
-from typing import Callable, List, Optional, Pattern, Tuple, TypeVar, Union
+from typing import (
+    Callable,
+    List,
+    Optional,
+    Pattern,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 import attr
 
@@ -12,10 +28,117 @@ from coderatchet.core.errors import ConfigError
 from coderatchet.core.test_failure import TestFailure
 from coderatchet.utils.logger import logger
 
-from .utils import RatchetError, load_ratchet_count
+from .utils import RatchetError, _compile, compile_ratchet_regex, load_ratchet_count
 
 _NEVER_MATCHING_REGEX: re.Pattern = re.compile("(?!)")
+# Python files that are not test modules, for tests with exclude_test_files
+_EXCLUDE_TEST_FILES_REGEX: re.Pattern = re.compile(r"^(?!.*test_.*\.py$).*\.py$")
+# Files at least this large are scanned through a memory map
+_MMAP_THRESHOLD = 64 * 1024
 T = TypeVar("T", bound="RatchetTest")
+# Constructs that can see past the end of a line or the start of the file, so
+# they may match differently when a line is searched within the whole file
+_NOT_LINE_LOCAL_PATTERN = re.compile(r"\\[AZ]|\(\?[=!<(]")
+
+
+def _line_starts(lines: Sequence[str]) -> List[int]:
+    """Get the offset of each line in the lines joined with newlines.
+
+    Args:
+        lines: Lines of a file
+
+    Returns:
+        Start offset of every line, followed by one past the end of the text
+    """
+    return list(map(add, accumulate(map(len, lines), initial=0), range(len(lines) + 1)))
+
+
+def _matching_line_indices(
+    regex: Pattern,
+    lines: Sequence[str],
+    strip: bool = False,
+    context: Optional["FileContext"] = None,
+) -> List[int]:
+    """Find the indices of the lines a regex matches.
+
+    Searching each line separately costs a Python-level call per line. When
+    the pattern only looks within a line, the lines are instead joined and
+    searched in one multiline pass that skips straight from hit to hit. Each
+    hit is then confirmed on its own line with the original regex, so the
+    result is exactly what a per-line search gives.
+
+    Args:
+        regex: Compiled pattern to search for
+        lines: Lines to search
+        strip: Whether to search each line with trailing whitespace removed
+        context: File context ``lines`` came from, whose joined text and line
+            offsets are reused instead of being rebuilt for every pattern
+
+    Returns:
+        Indices into ``lines`` of the matching lines, in order
+    """
+    search = regex.search
+    if (
+        not isinstance(regex, re.Pattern)
+        or not isinstance(regex.pattern, str)
+        or _NOT_LINE_LOCAL_PATTERN.search(regex.pattern)
+        # "$" can match after stripping where it could not before
+        or (strip and "$" in regex.pattern)
+    ):
+        if strip:
+            return [i for i, line in enumerate(lines) if search(line.rstrip())]
+        return [i for i, line in enumerate(lines) if search(line)]
+
+    content = "\n".join(lines) if context is None else context.joined_lines
+    buffer_search = _compile(regex.pattern, regex.flags | re.MULTILINE).search
+    match = buffer_search(content)
+    if match is None:
+        return []
+
+    starts = _line_starts(lines) if context is None else context.line_starts
+    last_line = len(lines) - 1
+    indices = []
+    while match is not None:
+        first = bisect_right(starts, match.start()) - 1
+        last = min(
+            bisect_right(starts, max(match.end() - 1, match.start())) - 1, last_line
+        )
+        for i in range(first, last + 1):
+            line = lines[i]
+            if search(line.rstrip() if strip else line):
+                indices.append(i)
+        if last == last_line:
+            break
+        match = buffer_search(content, starts[last + 1])
+    return indices
+
+
+@functools.lru_cache(maxsize=4096)
+def _include_file(
+    include_file_regex: Optional[Pattern], filepath_str: str, exclude_test_files: bool
+) -> bool:
+    """Decide whether a test checks a file.
+
+    The decision depends only on the arguments, so it is cached and shared by
+    every test with the same settings instead of re-running the include regex
+    for each (test, file) pair.
+
+    Args:
+        include_file_regex: Pattern the path must match, if any
+        filepath_str: Path to the file
+        exclude_test_files: Whether test files are skipped
+
+    Returns:
+        True if the file should be included
+    """
+    if exclude_test_files and "test_" in filepath_str:
+        logger.debug("Excluding {} due to test_ pattern", filepath_str)
+        return False
+    if include_file_regex:
+        matches = bool(include_file_regex.search(filepath_str))
+        logger.debug("File {} matches include pattern: {}", filepath_str, matches)
+        return matches
+    return True
 
 
 @attr.s(frozen=True, auto_attribs=True)
@@ -31,7 +154,7 @@ class RatchetTest:
         default=None, hash=False, kw_only=True
     )
     description: str = attr.ib(default="", kw_only=True)
-    _failures: Tuple[TestFailure, ...] = attr.ib(factory=tuple, init=False, hash=False)
+    _failures: List[TestFailure] = attr.ib(factory=list, init=False, hash=False)
 
     @allowed_count.default
     def _get_allowed_count(self) -> int:
@@ -46,11 +169,7 @@ class RatchetTest:
     def __attrs_post_init__(self):
         """Initialize mutable state."""
         if self.exclude_test_files:
-            object.__setattr__(
-                self,
-                "include_file_regex",
-                re.compile(r"^(?!.*test_.*\.py$).*\.py$"),
-            )
+            object.__setattr__(self, "include_file_regex", _EXCLUDE_TEST_FILES_REGEX)
 
     def collect_failures_from_lines(self, lines: List[str], filepath: str) -> None:
         """Collect failures from lines of code.
@@ -64,21 +183,19 @@ class RatchetTest:
             return
 
         failures = []
-        for i, line in enumerate(lines, 1):
-            line = line.rstrip()
-            match = self.regex.search(line)
-            if match:
-                logger.debug(f"Found match in {filepath}:{i}: {line}")
-                failures.append(
-                    TestFailure(
-                        test_name=self.name,
-                        filepath=filepath,
-                        line_number=i,
-                        line_contents=line,
-                    )
+        for i in _matching_line_indices(self.regex, lines, strip=True):
+            line = lines[i].rstrip()
+            logger.debug(f"Found match in {filepath}:{i + 1}: {line}")
+            failures.append(
+                TestFailure(
+                    test_name=self.name,
+                    filepath=filepath,
+                    line_number=i + 1,
+                    line_contents=line,
                 )
+            )
         # Append new failures to existing ones
-        object.__setattr__(self, "_failures", self._failures + tuple(failures))
+        self._failures.extend(failures)
 
     def get_total_count_from_files(self, files: List[Path]) -> int:
         """Get total count of violations from files."""
@@ -113,24 +230,38 @@ class RatchetTest:
 
     def add_failure(self, failure: TestFailure) -> None:
         """Add a failure to the list of failures."""
-        object.__setattr__(self, "_failures", self._failures + (failure,))
+        self._failures.append(failure)
 
     def clear_failures(self) -> None:
         """Clear the list of failures."""
-        object.__setattr__(self, "_failures", tuple())
-
-    def should_include_file(self, filepath: Path) -> bool:
-        """Determine if a file should be included in the test."""
-        filepath_str = str(filepath)
-        logger.debug(f"Checking file inclusion for {filepath_str}")
-        if self.exclude_test_files and "test_" in filepath_str:
-            logger.debug(f"Excluding {filepath_str} due to test_ pattern")
-            return False
-        if self.include_file_regex:
-            matches = bool(self.include_file_regex.search(filepath_str))
-            logger.debug(f"File {filepath_str} matches include pattern: {matches}")
-            return matches
-        return True
+        self._failures.clear()
+
+    def should_include_file(self, filepath: Union[str, Path]) -> bool:
+        """Check if a file should be included in the test.
+
+        Args:
+            filepath: Path to the file to check
+
+        Returns:
+            True if the file should be included, False otherwise
+        """
+        return _include_file(
+            self.include_file_regex, str(filepath), self.exclude_test_files
+        )
+
+    def collect_failures_from_context(
+        self, ctx: "FileContext", filepath: str
+    ) -> List[TestFailure]:
+        """Collect failures from a file that is shared with other tests.
+
+        Args:
+            ctx: Parsed contents of the file
+            filepath: Path to the file being checked
+
+        Returns:
+            List of test failures found
+        """
+        return collect_failures_from_lines(filepath, ctx.lines, self, context=ctx)
 
     def collect_failures_from_file(self, filepath: Path) -> None:
         """Collect failures from a file."""
@@ -165,13 +296,16 @@ class RegexBasedRatchetTest(RatchetTest):
     match_examples: Tuple[str, ...] = attr.ib(factory=tuple)
     non_match_examples: Tuple[str, ...] = attr.ib(factory=tuple)
     include_file_regex: Optional[Pattern] = attr.ib(factory=lambda: None, hash=False)
+    # Match with RE2 (the "re2" extra) instead of re, for backtracking-prone
+    # patterns; RE2's \w, \b, \s and \d are ASCII-only
+    use_re2: bool = attr.ib(default=False, kw_only=True)
 
     def __attrs_post_init__(self):
         """Initialize the regex pattern and validate after instance creation."""
         super().__attrs_post_init__()
         try:
             # Validate the pattern immediately
-            regex = re.compile(self.pattern)
+            regex = compile_ratchet_regex(self.pattern, use_re2=self.use_re2)
             # Validate examples
             for example in self.match_examples:
                 if not regex.search(example):
@@ -206,19 +340,19 @@ class RegexBasedRatchetTest(RatchetTest):
             return
 
         failures = []
-        for i, line in enumerate(lines, start=1):
-            if self.regex.search(line):
-                logger.debug(f"Found match in {filepath}:{i}: {line}")
-                failures.append(
-                    TestFailure(
-                        test_name=self.name,
-                        filepath=str(filepath),
-                        line_number=i,
-                        line_contents=line,
-                    )
+        for i in _matching_line_indices(self.regex, lines):
+            line = lines[i]
+            logger.debug(f"Found match in {filepath}:{i + 1}: {line}")
+            failures.append(
+                TestFailure(
+                    test_name=self.name,
+                    filepath=str(filepath),
+                    line_number=i + 1,
+                    line_contents=line,
                 )
+            )
         # Append new failures to existing ones
-        object.__setattr__(self, "_failures", self._failures + tuple(failures))
+        self._failures.extend(failures)
 
     def collect_failures_from_file(self, filepath: Path) -> None:
         """Collect failures from a file.
@@ -233,29 +367,9 @@ class RegexBasedRatchetTest(RatchetTest):
         except (IOError, UnicodeDecodeError) as e:
             raise RatchetError(f"Failed to read {filepath}: {str(e)}")
 
-    def should_include_file(self, filepath: Union[str, Path]) -> bool:
-        """Check if a file should be included in the test.
-
-        Args:
-            filepath: Path to the file to check
-
-        Returns:
-            True if the file should be included, False otherwise
-        """
-        logger.debug(f"Checking file inclusion for {filepath}")
-        filepath_str = str(filepath)
-        if self.exclude_test_files and "test_" in filepath_str:
-            logger.debug(f"Excluding {filepath_str} due to test_ pattern")
-            return False
-        if self.include_file_regex:
-            matches = bool(self.include_file_regex.search(filepath_str))
-            logger.debug(f"File {filepath_str} matches include pattern: {matches}")
-            return matches
-        return True
-
     def clear_failures(self) -> None:
         """Clear the list of failures."""
-        object.__setattr__(self, "_failures", tuple())
+        self._failures.clear()
 
     @property
     def failures(self) -> List[TestFailure]:
@@ -292,7 +406,7 @@ class TwoLineRatchetTest(RatchetTest):
     def regex(self) -> Pattern:
         """Get the compiled regex pattern."""
         if self._regex is None:
-            object.__setattr__(self, "_regex", re.compile(self.pattern))
+            object.__setattr__(self, "_regex", _compile(self.pattern))
         return self._regex
 
     @property
@@ -302,7 +416,7 @@ class TwoLineRatchetTest(RatchetTest):
             pattern = (
                 self.last_line_pattern if self.last_line_pattern is not None else ".*"
             )
-            object.__setattr__(self, "_last_line_regex", re.compile(pattern))
+            object.__setattr__(self, "_last_line_regex", _compile(pattern))
         return self._last_line_regex
 
     def collect_failures_from_lines(self, lines: List[str], filepath: str) -> None:
@@ -310,28 +424,24 @@ class TwoLineRatchetTest(RatchetTest):
         if self.include_file_regex and not self.include_file_regex.search(filepath):
             return
 
-        # Reset state
-        last_line = None
-        last_line_number = None
+        # Only lines after a first-line hit need the second pattern, so find
+        # those hits in one pass over the file rather than walking every pair
         failures = []
-
-        for i, line in enumerate(lines, 1):
-            line = line.rstrip()
-            if last_line is not None:
-                if self.regex.search(last_line) and self.last_line_regex.search(line):
-                    failures.append(
-                        TestFailure(
-                            test_name=self.name,
-                            filepath=filepath,
-                            line_number=last_line_number,
-                            line_contents=f"{last_line}\n{line}",
-                        )
+        last_line_search = self.last_line_regex.search
+        for i in _matching_line_indices(self.regex, lines[:-1], strip=True):
+            line = lines[i + 1].rstrip()
+            if last_line_search(line):
+                failures.append(
+                    TestFailure(
+                        test_name=self.name,
+                        filepath=filepath,
+                        line_number=i + 1,
+                        line_contents=f"{lines[i].rstrip()}\n{line}",
                     )
-            last_line = line
-            last_line_number = i
+                )
 
         # Set failures once at the end
-        object.__setattr__(self, "_failures", tuple(failures))
+        self._failures[:] = failures
 
     def get_total_count_from_files(self, files: List[Path]) -> int:
         """Get total count of violations from files."""
@@ -352,7 +462,9 @@ class FullFileRatchetTest(RegexBasedRatchetTest):
         """Initialize the regex pattern and validate after instance creation."""
         try:
             # Validate the pattern immediately
-            regex = re.compile(self.pattern, self.regex_flags)
+            regex = compile_ratchet_regex(
+                self.pattern, self.regex_flags, use_re2=self.use_re2
+            )
             # Validate examples
             for example in self.match_examples:
                 if not regex.search(example):
@@ -394,7 +506,7 @@ class FullFileRatchetTest(RegexBasedRatchetTest):
                     line_contents=content,
                 ),
             )
-            object.__setattr__(self, "_failures", tuple(failures))
+            self._failures[:] = failures
 
 
 def to_second_pass(failure):
@@ -415,14 +527,13 @@ class TwoPassRatchetTest(RatchetTest):
     ] = attr.ib(default=None)
     first_pass_failure_filepath_for_testing: Optional[str] = attr.ib(default=None)
     _second_pass_regex: Optional[Pattern] = attr.ib(init=False, default=None)
-    _failures: Tuple[TestFailure, ...] = attr.ib(init=False, factory=tuple)
 
     def __attrs_post_init__(self):
         """Initialize after instance creation."""
         # Since we're frozen, we need to use object.__setattr__
         try:
             object.__setattr__(
-                self, "_second_pass_regex", re.compile(self.second_pass_pattern)
+                self, "_second_pass_regex", _compile(self.second_pass_pattern)
             )
         except re.error as e:
             raise RatchetError(f"Invalid second pass pattern: {e}")
@@ -477,31 +588,27 @@ class TwoPassRatchetTest(RatchetTest):
         self.first_pass.collect_failures_from_lines(lines, filepath)
         first_pass_failures = self.first_pass.failures
 
-        # Second pass: check each line for second pass pattern
+        # Second pass: every line at or after a first pass failure that matches
+        # the second pattern. Those lines are found once for the whole file and
+        # each failure only adds the hits before the earliest one seen so far.
+        hits = _matching_line_indices(self._second_pass_regex, lines)
         failures = []
-        seen_failures = set()  # Track unique failures by line number and content
+        covered = len(hits)  # Hits from here on have already been reported
         for failure in first_pass_failures:
-            # Check all lines after the first pass match for the second pattern
-            # failure.line_number is 1-based, so we need to subtract 1 for the slice
-            for i, line in enumerate(
-                lines[failure.line_number - 1 :], failure.line_number
-            ):
-                if self._second_pass_regex.search(line):
-                    # Create a unique key for this failure
-                    failure_key = (i, line.strip())
-                    if failure_key not in seen_failures:
-                        seen_failures.add(failure_key)
-                        failures.append(
-                            TestFailure(
-                                test_name=self.name,
-                                filepath=filepath,
-                                line_number=i,
-                                line_contents=line,
-                            )
-                        )
+            start = bisect_left(hits, failure.line_number - 1, 0, covered)
+            for i in hits[start:covered]:
+                failures.append(
+                    TestFailure(
+                        test_name=self.name,
+                        filepath=filepath,
+                        line_number=i + 1,
+                        line_contents=lines[i],
+                    )
+                )
+            covered = min(covered, start)
 
         # Since we're frozen, we need to use object.__setattr__
-        object.__setattr__(self, "_failures", tuple(failures))
+        self._failures[:] = failures
 
     @classmethod
     def from_config(cls, config) -> "TwoPassRatchetTest":
@@ -525,8 +632,8 @@ class TwoPassRatchetTest(RatchetTest):
         first_pass = RegexBasedRatchetTest(
             name=f"{config.name}_first_pass",
             pattern=config.pattern,
-            match_examples=config.match_examples,
-            non_match_examples=config.non_match_examples,
+            match_examples=tuple(config.match_examples),
+            non_match_examples=tuple(config.non_match_examples),
         )
 
         # Create two-pass test
@@ -534,11 +641,189 @@ class TwoPassRatchetTest(RatchetTest):
             name=config.name,
             first_pass=first_pass,
             second_pass_pattern=config.second_pass_pattern,
-            match_examples=config.second_pass_examples or tuple(),
-            non_match_examples=config.second_pass_non_examples or tuple(),
+            match_examples=tuple(config.second_pass_examples or ()),
+            non_match_examples=tuple(config.second_pass_non_examples or ()),
         )
 
 
+@attr.s(frozen=True, auto_attribs=True)
+class FileContext:
+    """The contents of one file, prepared once for every test that checks it.
+
+    The source text, syntax tree and line offsets are built on first use, so
+    tests that only look at lines never pay for them, and tests that need
+    them share a single copy.
+    """
+
+    lines: Tuple[str, ...] = attr.ib(converter=tuple)
+    _content: Optional[str] = attr.ib(default=None, kw_only=True)
+    _ast: Optional[ast.AST] = attr.ib(init=False, default=None)
+    _ast_parsed: bool = attr.ib(init=False, default=False)
+    _joined_lines: Optional[str] = attr.ib(init=False, default=None, eq=False)
+    _line_starts: Optional[List[int]] = attr.ib(init=False, default=None, eq=False)
+
+    @classmethod
+    def from_text(cls, content: str) -> "FileContext":
+        """Create a context from the full text of a file.
+
+        Args:
+            content: Text of the file
+
+        Returns:
+            FileContext for the text
+        """
+        return cls(content.splitlines(), content=content)
+
+    @property
+    def content(self) -> str:
+        """Get the source text of the file."""
+        if self._content is None:
+            object.__setattr__(self, "_content", "\n".join(self.lines))
+        return self._content
+
+    @property
+    def ast(self) -> Optional[ast.AST]:
+        """Get the parsed syntax tree, or None if the file is not valid Python."""
+        if not self._ast_parsed:
+            try:
+                tree = ast.parse(self.content)
+            except SyntaxError:
+                tree = None
+            object.__setattr__(self, "_ast", tree)
+            object.__setattr__(self, "_ast_parsed", True)
+        return self._ast
+
+    @property
+    def joined_lines(self) -> str:
+        """Get the lines joined with newlines, for multiline searches."""
+        if self._joined_lines is None:
+            object.__setattr__(self, "_joined_lines", "\n".join(self.lines))
+        return self._joined_lines
+
+    @property
+    def line_starts(self) -> List[int]:
+        """Get the offset of each line in ``joined_lines``, plus its length.
+
+        Every test that maps a match back to a line number bisects this one
+        list, so it is only computed once per file.
+        """
+        if self._line_starts is None:
+            object.__setattr__(self, "_line_starts", _line_starts(self.lines))
+        return self._line_starts
+
+
+@attr.s(frozen=True, auto_attribs=True)
+class CompositeRegexRatchet:
+    """Scan lines once for several regex ratchets at a time.
+
+    The patterns of all plain regex tests are joined into a single alternation
+    ``(?:...)|(?:...)|...`` so that each line goes through the regex engine
+    once instead of once per test. Lines the combined pattern rejects cannot
+    match any of those tests and are skipped outright; on a hit each test is
+    checked on that line alone, since a line may break several ratchets at
+    once. The groups are deliberately non-capturing: named groups stop the
+    engine from building the literal prefix set it uses to skip ahead, which
+    makes the combined scan slower than running the tests one by one.
+
+    Other test types, patterns compiled with RE2 and patterns that cannot be
+    embedded safely are run on their own. That covers any pattern with a
+    capturing group, since joining renumbers the groups that backreferences
+    and conditionals like ``(?(1)...)`` refer to, and leading inline flags,
+    which would apply to the whole alternation.
+    """
+
+    tests: Tuple[RatchetTest, ...] = attr.ib(converter=tuple)
+    _combined: Optional[Pattern] = attr.ib(init=False, default=None)
+    _combined_indices: Tuple[int, ...] = attr.ib(init=False, factory=tuple)
+
+    def __attrs_post_init__(self):
+        """Build the combined pattern from the tests that allow it."""
+        indices = tuple(i for i, t in enumerate(self.tests) if _is_combinable(t))
+        if len(indices) < 2:
+            return
+        try:
+            combined = re.compile(
+                "|".join(f"(?:{self.tests[i].pattern})" for i in indices)
+            )
+        except re.error as e:
+            logger.debug(f"Falling back to per-test regex scan: {e}")
+            return
+        object.__setattr__(self, "_combined", combined)
+        object.__setattr__(self, "_combined_indices", indices)
+
+    def collect_failures_from_lines(
+        self, lines: List[str], file_path: str
+    ) -> List[TestFailure]:
+        """Collect failures for every test from a list of lines.
+
+        Args:
+            lines: List of lines to check
+            file_path: Path to the file being checked
+
+        Returns:
+            List of test failures, grouped by test in the order of ``tests``
+        """
+        return self.collect_failures_from_context(FileContext(lines), file_path)
+
+    def collect_failures_from_context(
+        self, ctx: FileContext, file_path: str
+    ) -> List[TestFailure]:
+        """Collect failures for every test from a shared file context.
+
+        Args:
+            ctx: Parsed contents of the file
+            file_path: Path to the file being checked
+
+        Returns:
+            List of test failures, grouped by test in the order of ``tests``
+        """
+        tests = self.tests
+        lines = ctx.lines
+        batch = [
+            i for i in self._combined_indices if tests[i].should_include_file(file_path)
+        ]
+        if len(batch) < 2:
+            batch = []
+        found: List[List[TestFailure]] = [[] for _ in tests]
+
+        if batch:
+            for index in _matching_line_indices(self._combined, lines, context=ctx):
+                line = lines[index]
+                for i in batch:
+                    test = tests[i]
+                    if test.regex.search(line):
+                        found[i].append(
+                            TestFailure(
+                                test_name=test.name,
+                                filepath=file_path,
+                                line_number=index + 1,
+                                line_contents=line.rstrip(),
+                            )
+                        )
+
+        batched = set(batch)
+        failures = []
+        for i, test in enumerate(tests):
+            if i not in batched:
+                found[i] = test.collect_failures_from_context(ctx, file_path)
+            failures.extend(found[i])
+        return failures
+
+
+# Leading inline flags, which would spread to every pattern in the alternation
+_UNSAFE_TO_COMBINE = re.compile(r"^\(\?[aiLmsux]+\)")
+
+
+def _is_combinable(test: RatchetTest) -> bool:
+    """Check whether a test's pattern can be embedded in a combined regex."""
+    if type(test) is not RegexBasedRatchetTest:
+        return False
+    if not isinstance(test.regex, re.Pattern):
+        return False  # RE2-backed; embedding it would bring back backtracking
+    return not (test.regex.groups or _UNSAFE_TO_COMBINE.search(test.pattern))
+
+
+@functools.lru_cache(maxsize=4096)
 def should_include_file(file_path: str, exclude_test_files: bool = True) -> bool:
     """Check if a file should be included in the analysis.
 
@@ -574,27 +859,156 @@ def collect_failures_from_file(
     Returns:
         List of failures found in the file
     """
+    file_path = str(filepath)
     try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            content = f.read()
+        # Only check files that should be included
+        included = [
+            test
+            for test in tests
+            if should_include_file(file_path, test.exclude_test_files)
+        ]
+        if included and os.path.getsize(filepath) >= _MMAP_THRESHOLD:
+            failures = _collect_failures_from_mmap(filepath, included)
+            if failures is not None:
+                return failures
 
-        failures = []
-        for test in tests:
-            # Only check files that should be included
-            if not should_include_file(str(filepath), test.exclude_test_files):
-                continue
-
-            failures.extend(
-                collect_failures_from_lines(str(filepath), content.splitlines(), test)
-            )
-        return failures
+        with open(filepath, "r", encoding="utf-8") as f:
+            ctx = FileContext.from_text(f.read())
+        return CompositeRegexRatchet(included).collect_failures_from_context(
+            ctx, file_path
+        )
     except (IOError, UnicodeDecodeError) as e:
         logger.warning(f"Failed to read {filepath}: {e}")
         raise RatchetError(f"Failed to read {filepath}: {e}")
 
 
+# Bytes that would make a bytes-level scan disagree with the per-line str one:
+# extra line separators for str.splitlines() and \x1c-\x1f, which str regexes
+# treat as whitespace. Non-ASCII content is ruled out separately.
+_NOT_BYTES_SAFE_CHARS = b"\r\x0b\x0c\x1c\x1d\x1e\x1f"
+_ASCII_CHECK_CHUNK = 1024 * 1024
+
+
+def _bytes_regex(test: RatchetTest) -> Optional[Pattern]:
+    """Translate a test's regex into a multiline bytes regex.
+
+    Args:
+        test: Ratchet test whose pattern to translate
+
+    Returns:
+        Compiled bytes pattern, or None if the translation could change
+        which lines match
+    """
+    regex = getattr(test, "regex", None)
+    if not isinstance(regex, re.Pattern) or not isinstance(regex.pattern, str):
+        return None
+    if not regex.pattern.isascii() or _NOT_LINE_LOCAL_PATTERN.search(regex.pattern):
+        return None
+    try:
+        return re.compile(
+            regex.pattern.encode("ascii"),
+            (regex.flags & ~re.UNICODE) | re.MULTILINE,
+        )
+    except re.error:
+        return None
+
+
+def _is_plain_ascii(mm: mmap.mmap) -> bool:
+    """Check that a mapped file is ASCII with only ``\\n`` line breaks."""
+    if any(mm.find(bytes((c,))) != -1 for c in _NOT_BYTES_SAFE_CHARS):
+        return False
+    return all(
+        mm[i : i + _ASCII_CHECK_CHUNK].isascii()
+        for i in range(0, len(mm), _ASCII_CHECK_CHUNK)
+    )
+
+
+def _collect_failures_from_mmap(
+    filepath: Path, tests: List[RatchetTest]
+) -> Optional[List[TestFailure]]:
+    """Collect failures from a large file without splitting all of it.
+
+    The file is memory-mapped and each test's pattern is searched over the
+    raw bytes, which lets the regex engine skip ahead between hits. Only the
+    lines around a hit are decoded and checked with the test's own regex, so
+    most of the file never becomes Python strings. This is exact only for
+    plain ASCII files with ``\\n`` line endings and for patterns that stay
+    within a line, so anything else returns None and is left to the regular
+    line-by-line scan.
+
+    Args:
+        filepath: Path to the file
+        tests: Ratchet tests to run, already filtered for this file
+
+    Returns:
+        List of failures, or None if the file needs the regular scan
+    """
+    file_path = str(filepath)
+    tests = [test for test in tests if test.should_include_file(file_path)]
+    patterns = [_bytes_regex(test) for test in tests]
+    if any(pattern is None for pattern in patterns):
+        return None
+
+    with open(filepath, "rb") as f, mmap.mmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mm:
+        if hasattr(mm, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+            mm.madvise(mmap.MADV_SEQUENTIAL)
+        if not _is_plain_ascii(mm):
+            return None
+
+        # Line spans around each hit, as (start, end) byte offsets per test
+        size = len(mm)
+        # Where the last line ends; a final newline does not start a new line
+        last_end = size - 1 if mm[-1:] == b"\n" else size
+        spans_by_test = []
+        for pattern in patterns:
+            spans = []
+            pos = 0
+            while pos <= size:
+                match = pattern.search(mm, pos)
+                if match is None:
+                    break
+                start = mm.rfind(b"\n", 0, match.start()) + 1
+                if start >= size:
+                    break  # Empty match after the final newline, not a line
+                end = mm.find(b"\n", match.end())
+                if end == -1:
+                    end = last_end
+                spans.append((start, end))
+                pos = end + 1
+            spans_by_test.append(spans)
+
+        # Decode each span once and number its lines in a single sweep
+        blocks = {}
+        lineno, counted = 1, 0
+        for start, end in sorted(set().union(*spans_by_test)):
+            lineno += mm[counted:start].count(b"\n")
+            counted = start
+            blocks[start, end] = (lineno, mm[start:end].decode("ascii").split("\n"))
+
+    failures = []
+    for test, spans in zip(tests, spans_by_test):
+        for span in spans:
+            first, lines = blocks[span]
+            for i, line in enumerate(lines, start=first):
+                if test.regex.search(line):
+                    failures.append(
+                        TestFailure(
+                            test_name=test.name,
+                            filepath=file_path,
+                            line_number=i,
+                            line_contents=line.rstrip(),
+                        )
+                    )
+    return failures
+
+
 def collect_failures_from_lines(
-    file_path: str, lines: List[str], test: RatchetTest
+    file_path: str,
+    lines: List[str],
+    test: RatchetTest,
+    context: Optional[FileContext] = None,
 ) -> List[TestFailure]:
     """Collect failures from a list of lines.
 
@@ -602,6 +1016,7 @@ def collect_failures_from_lines(
         file_path: Path to the file being checked
         lines: List of lines to check
         test: Ratchet test to run
+        context: File context the lines came from, if any
 
     Returns:
         List of test failures found
@@ -609,18 +1024,15 @@ def collect_failures_from_lines(
     if not test.should_include_file(file_path):
         return []
 
-    failures = []
-    for i, line in enumerate(lines, start=1):
-        if test.regex.search(line):
-            failures.append(
-                TestFailure(
-                    test_name=test.name,
-                    filepath=file_path,
-                    line_number=i,
-                    line_contents=line.rstrip(),
-                )
-            )
-    return failures
+    return [
+        TestFailure(
+            test_name=test.name,
+            filepath=file_path,
+            line_number=i + 1,
+            line_contents=lines[i].rstrip(),
+        )
+        for i in _matching_line_indices(test.regex, lines, context=context)
+    ]
 
 
 def run_ratchets_on_file(
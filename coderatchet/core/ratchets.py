@@ -1,11 +1,55 @@
 """Built-in ratchet implementations."""
 
 import ast
-from typing import List, Optional
+from collections import deque
+from typing import List, Optional, Tuple
 
 import attr
 
-from .ratchet import RatchetTest, TestFailure
+from .ratchet import FileContext, RatchetTest, TestFailure
+
+_FUNCTION_NODES = (ast.FunctionDef, ast.AsyncFunctionDef)
+
+
+def _function_spans(source: str) -> Tuple[Tuple[str, int, int], ...]:
+    """Find the name and line range of every function in some source.
+
+    Args:
+        source: Python source code
+
+    Returns:
+        Tuples of (name, first line, last line), in ast.walk order
+
+    Raises:
+        SyntaxError: If the source cannot be parsed
+    """
+    return _function_spans_in_tree(ast.parse(source))
+
+
+def _function_spans_in_tree(tree: ast.AST) -> Tuple[Tuple[str, int, int], ...]:
+    """Find the name and line range of every function in a syntax tree.
+
+    Functions are statements, so expression subtrees, which make up most of
+    the tree, are never entered. The walk is breadth-first, like ast.walk.
+
+    Args:
+        tree: Parsed Python module
+
+    Returns:
+        Tuples of (name, first line, last line), in ast.walk order
+    """
+    spans = []
+    queue = deque([tree])
+    while queue:
+        for child in ast.iter_child_nodes(queue.popleft()):
+            if isinstance(child, ast.expr):
+                continue
+            if isinstance(child, _FUNCTION_NODES):
+                spans.append(
+                    (child.name, child.lineno, child.end_lineno or child.lineno)
+                )
+            queue.append(child)
+    return tuple(spans)
 
 
 @attr.s(frozen=True, auto_attribs=True)
@@ -70,32 +114,48 @@ class FunctionLengthRatchet(RatchetTest):
         Returns:
             List of test failures
         """
-        failures = []
         try:
-            tree = ast.parse("\n".join(lines))
-            for node in ast.walk(tree):
-                if isinstance(node, ast.FunctionDef):
-                    # Get the line range of the function
-                    start_line = node.lineno
-                    end_line = node.end_lineno or start_line
-                    function_length = end_line - start_line + 1
-
-                    if function_length > self.max_lines:
-                        msg = (
-                            f"Function '{node.name}' is {function_length} lines long, "
-                            f"exceeding the maximum of {self.max_lines} lines"
-                        )
-                        failures.append(
-                            TestFailure(
-                                test_name=self.name,
-                                filepath=filepath,
-                                line_number=start_line,
-                                line_contents=msg,
-                            )
-                        )
+            spans = _function_spans("\n".join(lines))
         except SyntaxError:
             # If there's a syntax error, we can't parse the file
             # This is not a ratchet failure, so we return an empty list
-            pass
+            return []
+        return self._failures_for_spans(spans, filepath)
 
+    def collect_failures_from_context(
+        self, ctx: FileContext, filepath: str
+    ) -> List[TestFailure]:
+        """Collect failures from the syntax tree shared by all tests of a file.
+
+        Args:
+            ctx: Parsed contents of the file
+            filepath: Path to the file being checked
+
+        Returns:
+            List of test failures
+        """
+        if not self.should_include_file(filepath) or ctx.ast is None:
+            return []
+        return self._failures_for_spans(_function_spans_in_tree(ctx.ast), filepath)
+
+    def _failures_for_spans(
+        self, spans: Tuple[Tuple[str, int, int], ...], filepath: str
+    ) -> List[TestFailure]:
+        """Turn function spans longer than the limit into failures."""
+        failures = []
+        for name, start_line, end_line in spans:
+            function_length = end_line - start_line + 1
+            if function_length > self.max_lines:
+                msg = (
+                    f"Function '{name}' is {function_length} lines long, "
+                    f"exceeding the maximum of {self.max_lines} lines"
+                )
+                failures.append(
+                    TestFailure(
+                        test_name=self.name,
+                        filepath=filepath,
+                        line_number=start_line,
+                        line_contents=msg,
+                    )
+                )
         return failures
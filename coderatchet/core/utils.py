@@ -2,6 +2,8 @@
 Utility functions and classes for CodeRatchet.
 """
 
+import functools
+import importlib
 import json
 import os
 import os.path
@@ -9,11 +11,43 @@ import re
 from dataclasses import dataclass
 from fnmatch import fnmatch
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Union
+from types import ModuleType
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Protocol,
+    Set,
+    Union,
+    cast,
+)
 
 from coderatchet.utils.logger import logger
 
 
+def _optional_import(name: str) -> Optional[ModuleType]:
+    """Import an optional dependency, or return None if it is not installed."""
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+# Optional, installed with the "re2" extra
+re2 = _optional_import("re2")
+
+_RE2_INLINE_FLAGS = {re.IGNORECASE: "i", re.MULTILINE: "m", re.DOTALL: "s"}
+
+
+@functools.lru_cache(maxsize=4096)
+def _compile(pattern: str, flags: int = 0) -> re.Pattern:
+    """Compile a regex once per process, shared by every module using it."""
+    return re.compile(pattern, flags)
+
+
 class RatchetError(Exception):
     """Base exception for ratchet-related errors."""
 
@@ -26,7 +60,6 @@ class PatternManager:
     def __init__(self):
         """Initialize the pattern manager."""
         self._pattern_cache = {}
-        self._cache_generation = 0
 
     def join_patterns(self, patterns: List[str], escape: bool = True) -> re.Pattern:
         """Join regex patterns with OR operator.
@@ -39,25 +72,28 @@ class PatternManager:
             Compiled regex pattern
         """
         if not patterns:
-            return re.compile("(?!)")  # Never matches
+            return _compile("(?!)")  # Never matches
 
         if len(patterns) == 1:
             pattern = patterns[0]
-            return re.compile(f"(?:{pattern})")
+            return _compile(f"(?:{pattern})")
 
-        return re.compile("|".join(f"(?:{p})" for p in patterns))
+        return _compile("|".join(f"(?:{p})" for p in patterns))
 
-    def get_pattern(self, pattern: str, escape: bool = True) -> re.Pattern:
+    def get_pattern(
+        self, pattern: str, escape: bool = True, flags: int = 0
+    ) -> re.Pattern:
         """Get a compiled pattern.
 
         Args:
             pattern: The pattern to compile
             escape: Whether to escape the pattern (default: True)
+            flags: Regex flags to compile the pattern with (default: 0)
 
         Returns:
             The compiled pattern
         """
-        cache_key = (pattern, escape, self._cache_generation)
+        cache_key = (pattern, escape, flags)
 
         if cache_key not in self._pattern_cache:
             if escape:
@@ -66,10 +102,7 @@ class PatternManager:
                 parts = [re.escape(part) for part in parts]
                 pattern = "|".join(parts)
             optimized = self.optimize_pattern(pattern)
-            self._pattern_cache[cache_key] = re.compile(
-                optimized,
-                re.ASCII if self._cache_generation % 2 else 0,
-            )
+            self._pattern_cache[cache_key] = _compile(optimized, flags)
         return self._pattern_cache[cache_key]
 
     def optimize_pattern(self, pattern: str) -> str:
@@ -92,8 +125,7 @@ class PatternManager:
 
     def clear_cache(self) -> None:
         """Clear the pattern cache."""
-        self._pattern_cache = {}
-        self._cache_generation += 1
+        self._pattern_cache.clear()
 
 
 # Create a global pattern manager instance
@@ -367,6 +399,45 @@ def load_ratchet_count(test_name: str) -> int:
     return get_ratchet_values().get(test_name, 0)
 
 
+def load_ratchet_counts(test_names: Iterable[str]) -> Dict[str, int]:
+    """Load the allowed counts for several ratchet tests with a single file read.
+
+    Args:
+        test_names: Names of the ratchet tests
+
+    Returns:
+        Dictionary mapping each test name to its allowed violation count
+    """
+    values = get_ratchet_values()
+    return {name: values.get(name, 0) for name in test_names}
+
+
+def load_ratchet_counts_from_blob(
+    test_names: Iterable[str], blob: Optional[bytes]
+) -> Dict[str, int]:
+    """Load the allowed counts for several ratchet tests from raw file content.
+
+    Args:
+        test_names: Names of the ratchet tests
+        blob: Contents of a ratchet values file, or None if the file does not exist
+
+    Returns:
+        Dictionary mapping each test name to its allowed violation count
+    """
+    values = _parse_ratchet_values(blob)
+    return {name: values.get(name, 0) for name in test_names}
+
+
+def _parse_ratchet_values(blob: Optional[bytes]) -> Dict[str, int]:
+    """Parse ratchet values file content, treating missing or bad content as empty."""
+    if not blob:
+        return {}
+    try:
+        return json.loads(blob)
+    except json.JSONDecodeError:
+        return {}
+
+
 def write_ratchet_counts(counts_by_ratchet: Dict[str, int]) -> None:
     """Write the ratchet counts to the values file.
 
@@ -442,3 +513,64 @@ def join_regex_patterns(patterns: List[str], escape: bool = True) -> re.Pattern:
     if not patterns:
         return re.compile("(?!)")  # Never matches
     return re.compile(_regex_join_with_or(patterns, escape))
+
+
+class RatchetRegex(Protocol):
+    """The interface ratchets use from a compiled ``re`` or RE2 pattern."""
+
+    @property
+    def pattern(self) -> str:
+        """Get the source pattern."""
+        ...
+
+    def search(self, string: str, pos: int = ..., endpos: int = ...) -> Any:
+        """Find the first match in ``string``."""
+        ...
+
+    def finditer(self, string: str, pos: int = ..., endpos: int = ...) -> Iterator[Any]:
+        """Iterate over the matches in ``string``."""
+        ...
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_ratchet_regex(
+    pattern: str, flags: int = 0, use_re2: bool = False
+) -> RatchetRegex:
+    """Compile a ratchet pattern with Python's ``re`` or, on request, RE2.
+
+    RE2 matches in linear time, so it protects patterns prone to catastrophic
+    backtracking, such as ``(a+)+b``. It is only used when a ratchet asks for
+    it: RE2's ``\\w``, ``\\b``, ``\\s`` and ``\\d`` only match ASCII, so the same
+    pattern can count non-ASCII lines differently.
+
+    Args:
+        pattern: Regex pattern to compile
+        flags: ``re`` flags; with RE2 only IGNORECASE, MULTILINE and DOTALL
+            are supported
+        use_re2: Whether to compile the pattern with RE2
+
+    Returns:
+        Compiled pattern exposing ``search``/``finditer``
+
+    Raises:
+        re.error: If the pattern is not valid for the chosen engine
+        RatchetError: If RE2 is requested but the "re2" extra is not installed
+    """
+    regex = _compile(pattern, flags)
+    if not use_re2:
+        return regex
+    if re2 is None:
+        raise RatchetError(
+            "RE2 was requested for a ratchet, but the 're2' extra is not "
+            "installed (pip install coderatchet[re2])"
+        )
+    if flags & ~(re.IGNORECASE | re.MULTILINE | re.DOTALL | re.UNICODE):
+        raise re.error(f"Flags {flags!r} are not supported by RE2")
+    inline = "".join(c for flag, c in _RE2_INLINE_FLAGS.items() if flags & flag)
+    options = re2.Options()
+    options.log_errors = False
+    try:
+        compiled = re2.compile(f"(?{inline}){pattern}" if inline else pattern, options)
+    except re2.error as e:
+        raise re.error(f"Pattern '{pattern}' is not supported by RE2: {e}")
+    return cast(RatchetRegex, compiled)
@@ -5,6 +5,7 @@ import os
 import pytest
 import yaml
 
+from coderatchet.core.test_failure import TestFailure
 from coderatchet.examples.advanced.configuration import RatchetConfigManager
 
 
@@ -154,3 +155,31 @@ def test_config_file_permissions(tmp_path):
             config.save_config()
     finally:
         os.chmod(config_path, 0o644)  # Restore permissions
+
+
+def test_config_get_ratchets_fresh_each_call(tmp_path):
+    """Test that each call builds new ratchets from the current settings."""
+    config = RatchetConfigManager(str(tmp_path / "missing.yaml"))
+
+    first = config.get_ratchets()
+    first[0].add_failure(
+        TestFailure(
+            test_name=first[0].name,
+            filepath="module.py",
+            line_number=1,
+            line_contents="x = 1",
+        )
+    )
+    second = config.get_ratchets()
+    assert [r.name for r in second] == [r.name for r in first]
+    assert all(r.failures == [] for r in second)
+    assert len(first[0].failures) == 1  # Earlier results are left alone
+
+    config.config["ratchets"]["custom"]["config"]["function_length"]["max_lines"] = 5
+    third = config.get_ratchets()
+    func_length_ratchet = next(r for r in third if r.name == "function_length")
+    assert func_length_ratchet.max_lines == 5
+
+    # The custom "config" section is optional
+    del config.config["ratchets"]["custom"]["config"]
+    assert [r.name for r in config.get_ratchets()] == [r.name for r in first]
@@ -3,10 +3,12 @@
 import os
 import subprocess
 from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
-from coderatchet.core.git_integration import GitError, GitIntegration
+from coderatchet.core.git_integration import GitError, GitIntegration, _open_libgit2
 
 
 def test_git_repo_initialization(tmp_path):
@@ -34,6 +36,25 @@ def test_git_repo_initialization(tmp_path):
     assert git.repo_path == tmp_path
 
 
+def test_git_repo_without_work_tree(tmp_path):
+    """Test that bare repositories and .git directories are accepted."""
+    bare = tmp_path / "bare.git"
+    subprocess.run(["git", "init", "--bare", str(bare)], check=True)
+    git = GitIntegration(bare)
+    assert git.repo_path == bare
+    assert git._git_dir == bare.resolve()
+
+    repo = tmp_path / "repo"
+    subprocess.run(["git", "init", str(repo)], check=True)
+    assert GitIntegration(repo / ".git").repo_path == repo / ".git"
+
+    subdir = repo / "pkg"
+    subdir.mkdir()
+    git = GitIntegration(subdir)
+    assert git.get_repo_root() == repo.resolve()
+    assert git._prefix == "pkg/"
+
+
 def test_git_branch_operations(tmp_path):
     """Test Git branch operations."""
     # Initialize repository
@@ -114,6 +135,177 @@ def test_git_file_operations(tmp_path):
     assert commit_message == "Initial commit"
 
 
+def test_file_content_across_history(tmp_path):
+    """Test reading a file at every commit through one cat-file process."""
+    subprocess.run(["git", "init"], cwd=tmp_path, check=True)
+    subprocess.run(
+        ["git", "config", "user.name", "Test User"], cwd=tmp_path, check=True
+    )
+    subprocess.run(
+        ["git", "config", "user.email", "test@example.com"], cwd=tmp_path, check=True
+    )
+
+    test_file = tmp_path / "test.py"
+    for i in range(3):
+        test_file.write_text(f"print({i})\n")
+        subprocess.run(["git", "add", "test.py"], cwd=tmp_path, check=True)
+        subprocess.run(["git", "commit", "-m", f"Commit {i}"], cwd=tmp_path, check=True)
+
+    with GitIntegration(tmp_path) as git:
+        git._libgit2 = None  # Exercise the command line path
+        history = git.get_file_history("test.py")
+        contents = [
+            git.get_file_content_at_commit("test.py", commit_hash)
+            for commit_hash, _, _ in history
+        ]
+        assert contents == ["print(2)\n", "print(1)\n", "print(0)\n"]
+        batch = git._cat_file_batch
+        assert batch is not None
+
+        with pytest.raises(GitError):
+            git.get_file_content_at_commit("missing.py", history[0][0])
+        # A missing object does not cost the helper process
+        assert git._cat_file_batch is batch
+
+    assert git._cat_file_batch is None
+
+
+def test_files_history(tmp_path):
+    """Test getting the history of several files with one git log."""
+    subprocess.run(["git", "init"], cwd=tmp_path, check=True)
+    subprocess.run(
+        ["git", "config", "user.name", "Test User"], cwd=tmp_path, check=True
+    )
+    subprocess.run(
+        ["git", "config", "user.email", "test@example.com"], cwd=tmp_path, check=True
+    )
+
+    (tmp_path / "sub").mkdir()
+    first, second = tmp_path / "a.py", tmp_path / "sub" / "b.py"
+    first.write_text("a = 1\n")
+    second.write_text("b = 1\n")
+    subprocess.run(["git", "add", "."], cwd=tmp_path, check=True)
+    subprocess.run(["git", "commit", "-m", "Add | files"], cwd=tmp_path, check=True)
+    first.write_text("a = 2\n")
+    subprocess.run(["git", "commit", "-am", "Change a"], cwd=tmp_path, check=True)
+
+    git = GitIntegration(tmp_path)
+    history = git.get_files_history(["a.py", second, "missing.py"])
+    assert [entry[2] for entry in history[Path("a.py")]] == [
+        "Change a",
+        "Add | files",
+    ]
+    assert [entry[2] for entry in history[second]] == ["Add | files"]
+    assert history[Path("missing.py")] == []
+    assert history[Path("a.py")] == git.get_file_history("a.py")
+
+    # Paths are matched relative to the repository path, not the top level
+    sub_history = GitIntegration(tmp_path / "sub").get_files_history(["b.py"])
+    assert sub_history[Path("b.py")] == history[second]
+
+    assert git.get_files_history([]) == {}
+    with pytest.raises(GitError, match="not in repository"):
+        git.get_files_history([tmp_path.parent / "outside.py"])
+
+
+def test_libgit2_matches_git(tmp_path):
+    """Test that the pygit2 fast paths agree with the git command line."""
+    pytest.importorskip("pygit2")
+    subprocess.run(["git", "init"], cwd=tmp_path, check=True)
+    subprocess.run(
+        ["git", "config", "user.name", "Test User"], cwd=tmp_path, check=True
+    )
+    subprocess.run(
+        ["git", "config", "user.email", "test@example.com"], cwd=tmp_path, check=True
+    )
+
+    test_file = tmp_path / "test.py"
+    test_file.write_text("print('Initial')\n")
+    subprocess.run(["git", "add", "test.py"], cwd=tmp_path, check=True)
+    subprocess.run(["git", "commit", "-m", "Initial commit"], cwd=tmp_path, check=True)
+    subprocess.run(["git", "checkout", "-b", "feature"], cwd=tmp_path, check=True)
+    test_file.write_text("print('Feature')\n")
+    subprocess.run(["git", "commit", "-am", "Feature commit"], cwd=tmp_path, check=True)
+
+    fast = GitIntegration(tmp_path)
+    slow = GitIntegration(tmp_path)
+    slow._libgit2 = None
+    assert fast._libgit2 is not None
+
+    for git in (fast, slow):
+        assert git.is_detached_head() is False
+        assert git.get_current_branch() == "feature"
+        assert git.has_merge_conflicts() is False
+    assert fast.get_merge_base("main", "feature") == slow.get_merge_base(
+        "main", "feature"
+    )
+    assert fast.get_file_content_at_commit(
+        "test.py", "main"
+    ) == slow.get_file_content_at_commit("test.py", "main")
+    with pytest.raises(GitError, match="Git command failed"):
+        fast.get_file_content_at_commit("missing.py", "main")
+
+    subprocess.run(["git", "tag", "release/1.0"], cwd=tmp_path, check=True)
+    subprocess.run(
+        ["git", "remote", "add", "origin", "https://example.com/repo.git"],
+        cwd=tmp_path,
+        check=True,
+    )
+    assert fast.get_remotes() == slow.get_remotes() == ["origin"]
+    assert fast.get_branches() == slow.get_branches()
+    assert fast.get_tag_list() == slow.get_tag_list() == ["release/1.0"]
+    assert fast.get_config_value("user.name") == "Test User"
+    assert fast.get_config_value("missing.key") is None
+    assert fast.get_git_history() == slow.get_git_history()
+    assert fast.get_git_history(limit=1) == slow.get_git_history(limit=1)
+
+
+def test_open_libgit2(tmp_path):
+    """Test opening the repository in-process, with and without pygit2."""
+    subprocess.run(["git", "init"], cwd=tmp_path, check=True)
+    with patch("coderatchet.core.git_integration.pygit2", None):
+        assert _open_libgit2(tmp_path) is None
+        assert GitIntegration(tmp_path)._libgit2 is None
+
+    pygit2 = pytest.importorskip("pygit2")
+    repo = _open_libgit2(tmp_path)
+    assert isinstance(repo, pygit2.Repository)
+    assert _open_libgit2(tmp_path.parent) is None
+
+
+def test_libgit2_history_uses_author_date(tmp_path):
+    """Test that the pygit2 history reports author dates, like git log %at."""
+    pytest.importorskip("pygit2")
+    subprocess.run(["git", "init"], cwd=tmp_path, check=True)
+    subprocess.run(
+        ["git", "config", "user.name", "Test User"], cwd=tmp_path, check=True
+    )
+    subprocess.run(
+        ["git", "config", "user.email", "test@example.com"], cwd=tmp_path, check=True
+    )
+    (tmp_path / "test.py").write_text("print('Initial')\n")
+    subprocess.run(["git", "add", "test.py"], cwd=tmp_path, check=True)
+    subprocess.run(
+        ["git", "commit", "-m", "Initial commit"],
+        cwd=tmp_path,
+        check=True,
+        env={
+            **os.environ,
+            "GIT_AUTHOR_DATE": "2020-01-01T00:00:00+0000",
+            "GIT_COMMITTER_DATE": "2021-01-01T00:00:00+0000",
+        },
+    )
+
+    fast = GitIntegration(tmp_path)
+    slow = GitIntegration(tmp_path)
+    slow._libgit2 = None
+    assert fast._libgit2 is not None
+
+    history = fast.get_git_history()
+    assert history == slow.get_git_history()
+    assert history[0][1] == datetime.fromtimestamp(1577836800)
+
+
 def test_git_merge_conflict_handling(tmp_path):
     """Test handling of Git merge conflicts."""
     # Initialize repository
@@ -224,6 +416,57 @@ def test_git_config_operations(tmp_path):
     assert git.get_config_value("nonexistent.key") is None
 
 
+def test_cached_repo_state(tmp_path):
+    """Test that HEAD answers are reused until the HEAD file changes."""
+    subprocess.run(["git", "init"], cwd=tmp_path, check=True)
+    subprocess.run(
+        ["git", "config", "user.name", "Test User"], cwd=tmp_path, check=True
+    )
+    subprocess.run(
+        ["git", "config", "user.email", "test@example.com"], cwd=tmp_path, check=True
+    )
+    (tmp_path / "test.py").write_text("print('Initial')")
+    subprocess.run(["git", "add", "test.py"], cwd=tmp_path, check=True)
+    subprocess.run(["git", "commit", "-m", "Initial commit"], cwd=tmp_path, check=True)
+
+    git = GitIntegration(tmp_path)
+    git._libgit2 = None  # Exercise the command line path
+    assert git.is_detached_head() is False
+    with patch.object(git, "_run_git_command") as mock_run:
+        assert git.is_detached_head() is False
+    mock_run.assert_not_called()
+
+    # Changes made by other processes are picked up
+    subprocess.run(["git", "checkout", "HEAD~0"], cwd=tmp_path, check=True)
+    assert git.is_detached_head() is True
+    subprocess.run(["git", "config", "user.name", "Other"], cwd=tmp_path, check=True)
+    assert git.get_config_value("user.name") == "Other"
+
+
+def test_config_value_in_linked_worktree(tmp_path):
+    """Test that config changes made elsewhere are seen from a linked worktree."""
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    subprocess.run(["git", "init"], cwd=repo, check=True)
+    subprocess.run(["git", "config", "user.name", "Test User"], cwd=repo, check=True)
+    subprocess.run(
+        ["git", "config", "user.email", "test@example.com"], cwd=repo, check=True
+    )
+    (repo / "test.py").write_text("print('Initial')")
+    subprocess.run(["git", "add", "test.py"], cwd=repo, check=True)
+    subprocess.run(["git", "commit", "-m", "Initial commit"], cwd=repo, check=True)
+    linked = tmp_path / "linked"
+    subprocess.run(
+        ["git", "worktree", "add", "--detach", str(linked)], cwd=repo, check=True
+    )
+
+    git = GitIntegration(linked)
+    git._libgit2 = None  # Exercise the command line path
+    assert git.get_config_value("user.name") == "Test User"
+    subprocess.run(["git", "config", "user.name", "Other"], cwd=repo, check=True)
+    assert git.get_config_value("user.name") == "Other"
+
+
 def test_git_repo_path_operations(tmp_path):
     """Test Git repository path operations."""
     # Initialize repository
@@ -271,6 +514,35 @@ def test_git_blame_operations(tmp_path):
         assert isinstance(content, str)
         assert "print" in content
 
+    # A second commit touches only the second line
+    test_file.write_text("print('Line 1')\nprint('Line two')")
+    subprocess.run(["git", "commit", "-am", "Second commit"], cwd=tmp_path, check=True)
+    grouped = git.get_file_blame_grouped("test.py")
+    assert len(grouped.commits) == 2
+    assert all(meta.author == "Test User" for meta in grouped.commits.values())
+    assert [(number, content) for number, _, content in grouped.lines] == [
+        (1, "print('Line 1')"),
+        (2, "print('Line two')"),
+    ]
+    assert grouped.lines[0][1] != grouped.lines[1][1]
+    assert grouped.lines[-1:] == [grouped.lines[1]]
+    assert [entry[:3] for entry in git.get_file_blame("test.py")] == [
+        (commit_hash, "Test User", number) for number, commit_hash, _ in grouped.lines
+    ]
+
+    # Several files are blamed in one call
+    (tmp_path / "other.py").write_text("print('Other')\n")
+    subprocess.run(["git", "add", "other.py"], cwd=tmp_path, check=True)
+    subprocess.run(["git", "commit", "-m", "Add other"], cwd=tmp_path, check=True)
+    blames = git.get_files_blame(["test.py", tmp_path / "other.py"])
+    assert blames == {
+        Path("test.py"): git.get_file_blame("test.py"),
+        tmp_path / "other.py": git.get_file_blame("other.py"),
+    }
+    assert git.get_files_blame([]) == {}
+    with pytest.raises(GitError):
+        git.get_files_blame(["test.py", "missing.py"])
+
 
 def test_git_stash_operations(tmp_path):
     """Test Git stash operations."""
@@ -302,6 +574,16 @@ def test_git_stash_operations(tmp_path):
     assert isinstance(stash_hash, str)
     assert stash_message == "Test stash"
 
+    # Only the branch prefix is removed, newest stash first
+    test_file.write_text("print('Again')")
+    subprocess.run(
+        ["git", "stash", "push", "-m", "Fix:  keep this"], cwd=tmp_path, check=True
+    )
+    assert [message for _, message in git.get_stash_list()] == [
+        "Fix:  keep this",
+        "Test stash",
+    ]
+
 
 def test_git_tag_operations(tmp_path):
     """Test Git tag operations."""
@@ -332,6 +614,20 @@ def test_git_tag_operations(tmp_path):
     assert "v1.0" in tags
     assert "v1.1" in tags
 
+    # The summary gathers the same facts in one call
+    subprocess.run(["git", "branch", "feature"], cwd=tmp_path, check=True)
+    subprocess.run(
+        ["git", "remote", "add", "origin", "https://example.com/repo.git"],
+        cwd=tmp_path,
+        check=True,
+    )
+    summary = git.get_repo_summary(["user.name", "missing.key"])
+    assert summary.remotes == ["origin"]
+    assert summary.branches == git.get_branches()
+    assert "feature" in summary.branches
+    assert summary.tags == ["v1.0", "v1.1"]
+    assert summary.config == {"user.name": "Test User", "missing.key": None}
+
 
 def test_git_history_operations(tmp_path):
     """Test Git history operations."""
@@ -379,6 +675,18 @@ def test_git_history_operations(tmp_path):
     commit_hash, commit_date, commit_message = history[0]
     assert commit_message == "Second commit"
 
+    # The iterator stops early without reading the rest of the history
+    commits = git.iter_git_history()
+    assert next(commits)[2] == "Second commit"
+    commits.close()
+
+    # Subjects keep their whitespace
+    test_file.write_text("print('Spaced')")
+    subprocess.run(
+        ["git", "commit", "-am", "Keep  two\tspaces"], cwd=tmp_path, check=True
+    )
+    assert git.get_git_history(limit=1)[0][2] == "Keep  two\tspaces"
+
     # Test in detached HEAD state
     commit_hash = subprocess.check_output(
         ["git", "rev-parse", "HEAD^"], cwd=tmp_path, text=True
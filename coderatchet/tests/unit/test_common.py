@@ -6,8 +6,10 @@ import os
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
+import yaml
+
 from coderatchet.core.config import get_ratchet_tests
-from coderatchet.core.ratchet import RegexBasedRatchetTest
+from coderatchet.core.ratchet import RegexBasedRatchetTest, TwoPassRatchetTest
 from coderatchet.core.utils import get_ratchet_test_files, should_exclude_file
 
 
@@ -127,3 +129,54 @@ def test_get_ratchet_tests():
         assert isinstance(tests, set)
         test_names = {t.name for t in tests}
         assert test_names == {"test1", "test2"}
+
+
+def test_get_ratchet_tests_from_config_file(tmp_path):
+    """Test that each call gets its own tests, built from the cached config."""
+    config_file = tmp_path / "coderatchet.yaml"
+    config_file.write_text(
+        "ratchets:\n  no_print:\n    pattern: 'print\\('\n    enabled: true\n"
+    )
+
+    with patch("yaml.load", wraps=yaml.load) as mock_load:
+        first = get_ratchet_tests(config_file=config_file)
+        first[0].collect_failures_from_lines(["print('hi')"], "module.py")
+        second = get_ratchet_tests(config_file=config_file)
+        assert mock_load.call_count == 1
+        assert [t.name for t in second] == ["no_print"]
+        assert second[0] is not first[0]
+        assert second[0].failures == []
+        assert len(first[0].failures) == 1  # Earlier results are left alone
+
+        as_set = get_ratchet_tests(return_set=True, config_file=config_file)
+        assert {t.name for t in as_set} == {"no_print"}
+
+        # Editing the file rebuilds the tests
+        config_file.write_text(
+            "ratchets:\n  no_todo:\n    pattern: 'TODO'\n    enabled: true\n"
+        )
+        third = get_ratchet_tests(config_file=config_file)
+        assert mock_load.call_count == 2
+        assert [t.name for t in third] == ["no_todo"]
+
+
+def test_get_ratchet_tests_two_pass_set(tmp_path):
+    """Test that two-pass tests are hashable and can be returned as a set."""
+    config_file = tmp_path / "coderatchet.yaml"
+    config_file.write_text(
+        "ratchets:\n"
+        "  two_pass:\n"
+        "    pattern: 'class \\w+'\n"
+        "    second_pass_pattern: 'self\\.'\n"
+        "    is_two_pass: true\n"
+        "    enabled: true\n"
+    )
+
+    tests = get_ratchet_tests(config_file=config_file)
+    assert isinstance(tests[0], TwoPassRatchetTest)
+    assert hash(tests[0]) == hash(tests[0])
+    tests[0].collect_failures_from_lines(["class Foo:", "    self.x = 1"], "a.py")
+    assert hash(tests[0]) == hash(get_ratchet_tests(config_file=config_file)[0])
+
+    as_set = get_ratchet_tests(return_set=True, config_file=config_file)
+    assert {t.name for t in as_set} == {"two_pass"}
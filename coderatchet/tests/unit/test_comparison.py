@@ -5,11 +5,13 @@ Tests for ratchet comparison functionality.
 import os
 import subprocess
 from pathlib import Path
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 import pytest
+import yaml
 
 from coderatchet.core.comparison import (
+    GitCatFileBatch,
     RatchetComparison,
     _checkout_state,
     _get_ratchet_counts,
@@ -19,6 +21,12 @@ from coderatchet.core.comparison import (
 from coderatchet.core.ratchet import RegexBasedRatchetTest
 
 
+def _counts_by_ref(previous, current):
+    """Build a _get_ratchet_counts side effect keyed by the requested ref."""
+    counts = {"HEAD~1": previous, "HEAD": current}
+    return lambda tests, ref, reader=None: counts[ref]
+
+
 def test_ratchet_comparison():
     """Test RatchetComparison dataclass."""
     comparison = RatchetComparison(
@@ -51,32 +59,132 @@ def test_get_ratchet_counts():
         description="Test imports",
     )
 
-    with patch("coderatchet.core.comparison.load_ratchet_count") as mock_load:
-        mock_load.side_effect = [5, 3]
+    with patch("coderatchet.core.comparison.load_ratchet_counts") as mock_load:
+        mock_load.return_value = {"test1": 5, "test2": 3}
         counts = _get_ratchet_counts([test1, test2])
 
         assert counts["test1"] == 5
         assert counts["test2"] == 3
-        assert mock_load.call_count == 2
-        assert mock_load.call_args_list[0][0][0] == "test1"
-        assert mock_load.call_args_list[1][0][0] == "test2"
+        # The values file is read once for all tests
+        mock_load.assert_called_once_with(["test1", "test2"])
 
         # Test error handling
-        mock_load.side_effect = [Exception("Failed to load"), 3]
+        mock_load.side_effect = Exception("Failed to load")
         counts = _get_ratchet_counts([test1, test2])
-        assert counts["test1"] == 0  # Should default to 0 on error
-        assert counts["test2"] == 3
+        assert counts == {"test1": 0, "test2": 0}  # Should default to 0 on error
+
+
+def test_get_ratchet_counts_at_ref(tmp_path):
+    """Test getting ratchet counts from a git reference."""
+    test1 = RegexBasedRatchetTest(name="test1", pattern="print")
+    test2 = RegexBasedRatchetTest(name="test2", pattern="import")
+
+    with patch(
+        "coderatchet.core.comparison._ratchet_values_blob_path",
+        return_value="ratchet_values.json",
+    ):
+        reader = MagicMock()
+        reader.read.return_value = b'{"test1": 4}'
+        counts = _get_ratchet_counts([test1, test2], "HEAD~1", reader)
+        reader.read.assert_called_once_with("HEAD~1", "ratchet_values.json")
+        assert counts == {"test1": 4, "test2": 0}
+
+        # Missing values file defaults every count to 0
+        reader.read.return_value = None
+        counts = _get_ratchet_counts([test1, test2], "HEAD~1", reader)
+        assert counts == {"test1": 0, "test2": 0}
+
+    # No tests means no git process at all
+    with patch("coderatchet.core.comparison.GitCatFileBatch") as mock_batch:
+        assert _get_ratchet_counts([], "HEAD~1") == {}
+        mock_batch.assert_not_called()
+
+
+def test_git_cat_file_batch(tmp_path):
+    """Test reading files at different revisions with one cat-file process."""
+    subprocess.run(["git", "init"], cwd=tmp_path, check=True)
+    subprocess.run(
+        ["git", "config", "user.name", "Test User"], cwd=tmp_path, check=True
+    )
+    subprocess.run(
+        ["git", "config", "user.email", "test@example.com"], cwd=tmp_path, check=True
+    )
+    values_file = tmp_path / "ratchet_values.json"
+    values_file.write_text('{"test1": 1}')
+    subprocess.run(["git", "add", "."], cwd=tmp_path, check=True)
+    subprocess.run(["git", "commit", "-m", "First"], cwd=tmp_path, check=True)
+    values_file.write_text('{"test1": 2}')
+    subprocess.run(["git", "commit", "-am", "Second"], cwd=tmp_path, check=True)
+
+    with GitCatFileBatch(cwd=tmp_path) as reader:
+        assert reader.read("HEAD~1", "ratchet_values.json") == b'{"test1": 1}'
+        assert reader.read("HEAD", "ratchet_values.json") == b'{"test1": 2}'
+        assert reader.read("HEAD", "missing.json") is None
+        assert reader.read("HEAD~1", "ratchet_values.json") == b'{"test1": 1}'
+
+        # Pipelined requests come back in request order
+        assert reader.read_many(
+            [
+                ("HEAD", "ratchet_values.json"),
+                ("HEAD", "missing.json"),
+                ("HEAD~1", "ratchet_values.json"),
+            ]
+        ) == [b'{"test1": 2}', None, b'{"test1": 1}']
+        assert reader.read_many([]) == []
+
+    # The working tree is left untouched
+    assert values_file.read_text() == '{"test1": 2}'
+
+
+def _git_commands(mock_run):
+    """Get the git subcommands passed to a mocked subprocess.run."""
+    commands = []
+    for call in mock_run.call_args_list:
+        args = call.args[0][1:]
+        if args[:1] == ["-c"]:
+            args = args[2:]  # Drop "-c <name>=<value>" overrides
+        commands.append(args)
+    return commands
 
 
 def test_checkout_state():
     """Test git checkout state context manager."""
-    with patch("subprocess.check_call") as mock_check_call:
+    with patch("subprocess.run") as mock_run:
+        # Dirty tree: local changes are stashed and restored
+        mock_run.return_value = subprocess.CompletedProcess([], 0, b" M a.py\n", b"")
         with _checkout_state("test-branch"):
-            assert mock_check_call.call_count == 2
-            mock_check_call.assert_any_call(
-                ["git", "stash", "push", "-m", "coderatchet_temp_stash"]
-            )
-            mock_check_call.assert_any_call(["git", "checkout", "test-branch"])
+            assert _git_commands(mock_run) == [
+                ["status", "--porcelain", "--untracked-files=no"],
+                ["stash", "push", "-m", "coderatchet_temp_stash"],
+                ["checkout", "test-branch"],
+            ]
+        assert _git_commands(mock_run)[3:] == [
+            ["checkout", "-"],
+            ["rev-parse", "--verify", "--quiet", "refs/stash"],
+            ["stash", "pop"],
+        ]
+
+    with patch("subprocess.run") as mock_run:
+        # The stash is gone by the time we restore: nothing to pop
+        mock_run.side_effect = lambda args, **kwargs: subprocess.CompletedProcess(
+            args, 1 if "rev-parse" in args else 0, b" M a.py\n", b""
+        )
+        with _checkout_state("test-branch"):
+            pass
+        assert ["stash", "pop"] not in _git_commands(mock_run)
+
+
+def test_checkout_state_clean_tree():
+    """Test that a clean tree skips the stash round-trip."""
+    with patch("subprocess.run") as mock_run:
+        mock_run.return_value = subprocess.CompletedProcess([], 0, b"", b"")
+        with _checkout_state("test-branch"):
+            pass
+        assert _git_commands(mock_run) == [
+            ["status", "--porcelain", "--untracked-files=no"],
+            ["checkout", "test-branch"],
+            ["checkout", "-"],
+        ]
 
 
 def test_temp_comparison_ratchet_test():
@@ -114,6 +222,23 @@ def test_temp_comparison_ratchet_test():
         )  # Called for both base and compare_with ratchets
 
 
+def test_temp_comparison_ratchet_test_counts_files(tmp_path):
+    """Test that both ratchets scan the files and the larger count wins."""
+    source = tmp_path / "module.py"
+    source.write_text("print('a')\nprint\nvalue = 1\n")
+    base = RegexBasedRatchetTest(name="test1", pattern="print\\(")
+    compare_with = RegexBasedRatchetTest(name="test1", pattern="print")
+
+    test = _TempComparisonRatchetTest.build_from(base, compare_with)
+    assert test.get_total_count_from_files([source]) == 2
+    assert len(base.failures) == 1
+    assert len(compare_with.failures) == 2
+
+    # Comparing a ratchet with itself scans once
+    test = _TempComparisonRatchetTest.build_from(base, base)
+    assert test.get_total_count_from_files([source]) == 1
+
+
 def test_compare_ratchets_with_mocks():
     """Test comparing ratchets with mocked git operations."""
     with patch("coderatchet.core.config.get_ratchet_tests") as mock_get_tests:
@@ -134,10 +259,10 @@ def test_compare_ratchets_with_mocks():
                 )
 
                 mock_get_tests.return_value = [test1, test2]
-                mock_get_counts.side_effect = [
-                    {"test1": 3, "test2": 2},  # Previous state
-                    {"test1": 5, "test2": 1},  # Current state
-                ]
+                mock_get_counts.side_effect = _counts_by_ref(
+                    previous={"test1": 3, "test2": 2},
+                    current={"test1": 5, "test2": 1},
+                )
 
                 # Test comparison
                 comparisons = compare_ratchets("HEAD~1", "HEAD")
@@ -155,10 +280,47 @@ def test_compare_ratchets_with_mocks():
                 assert comparisons[1].difference == -1
                 assert comparisons[1].is_worse is False
 
-                # Verify git operations
-                assert (
-                    mock_check_call.call_count >= 4
-                )  # At least 4 git operations (stash, checkout, checkout -, stash pop)
+                # Counts are read from the object store, never by checking out
+                mock_check_call.assert_not_called()
+
+
+def test_compare_ratchets_sort_order():
+    """Test that comparisons are ordered by difference, then by name."""
+    tests = [
+        RegexBasedRatchetTest(name=name, pattern="print")
+        for name in ("gamma", "alpha", "beta", "delta")
+    ]
+    with patch("coderatchet.core.config.get_ratchet_tests", return_value=tests):
+        with patch(
+            "coderatchet.core.comparison._get_ratchet_counts",
+            side_effect=_counts_by_ref(
+                previous={"gamma": 1, "alpha": 1, "beta": 0, "delta": 3},
+                current={"gamma": 2, "alpha": 2, "beta": 0, "delta": 1},
+            ),
+        ):
+            comparisons = compare_ratchets("HEAD~1", "HEAD")
+
+    assert [c.test_name for c in comparisons] == ["alpha", "gamma", "beta", "delta"]
+
+
+def test_compare_ratchets_reuses_config_file(tmp_path):
+    """Test that repeated comparisons parse a config file once."""
+    config_file = tmp_path / "coderatchet.yaml"
+    config_file.write_text("ratchets:\n  no_print:\n    pattern: print\n")
+
+    with patch("yaml.load", wraps=yaml.load) as mock_load:
+        with patch(
+            "coderatchet.core.comparison._get_ratchet_counts",
+            side_effect=_counts_by_ref(
+                previous={"no_print": 1}, current={"no_print": 2}
+            ),
+        ):
+            first = compare_ratchets("HEAD~1", "HEAD", config_file=config_file)
+            second = compare_ratchets("HEAD~1", "HEAD", config_file=config_file)
+
+    assert first == second
+    assert [c.test_name for c in first] == ["no_print"]
+    assert mock_load.call_count == 1
 
 
 def test_compare_ratchets_with_zero_previous():
@@ -175,10 +337,10 @@ def test_compare_ratchets_with_zero_previous():
                 )
 
                 mock_get_tests.return_value = [test]
-                mock_get_counts.side_effect = [
-                    {"test1": 0},  # Previous state
-                    {"test1": 5},  # Current state
-                ]
+                mock_get_counts.side_effect = _counts_by_ref(
+                    previous={"test1": 0},
+                    current={"test1": 5},
+                )
 
                 comparisons = compare_ratchets("HEAD~1", "HEAD")
 
@@ -190,10 +352,8 @@ def test_compare_ratchets_with_zero_previous():
                 assert comparisons[0].percentage_change == float("inf")
                 assert comparisons[0].is_worse is True
 
-                # Verify git operations
-                assert (
-                    mock_check_call.call_count >= 4
-                )  # At least 4 git operations (stash, checkout, checkout -, stash pop)
+                # Counts are read from the object store, never by checking out
+                mock_check_call.assert_not_called()
 
 
 def test_compare_ratchets_with_commits():
@@ -210,10 +370,10 @@ def test_compare_ratchets_with_commits():
                 )
 
                 mock_get_tests.return_value = [test1]
-                mock_get_counts.side_effect = [
-                    {"test1": 3},  # Previous state
-                    {"test1": 5},  # Current state
-                ]
+                mock_get_counts.side_effect = _counts_by_ref(
+                    previous={"test1": 3},
+                    current={"test1": 5},
+                )
 
                 comparisons = compare_ratchets("HEAD~1", "HEAD", include_commits=True)
 
@@ -257,10 +417,10 @@ def test_compare_ratchets_percentage_changes():
                 )
 
                 mock_get_tests.return_value = [test1, test2, test3, test4]
-                mock_get_counts.side_effect = [
-                    {"test1": 0, "test2": 5, "test3": 10, "test4": 7},  # Previous state
-                    {"test1": 3, "test2": 10, "test3": 5, "test4": 7},  # Current state
-                ]
+                mock_get_counts.side_effect = _counts_by_ref(
+                    previous={"test1": 0, "test2": 5, "test3": 10, "test4": 7},
+                    current={"test1": 3, "test2": 10, "test3": 5, "test4": 7},
+                )
 
                 comparisons = compare_ratchets("HEAD~1", "HEAD")
 
@@ -347,10 +507,10 @@ def test_compare_ratchets(tmp_path):
                 "coderatchet.core.comparison._get_ratchet_counts"
             ) as mock_get_counts:
                 mock_get_tests.return_value = [test1, test2]
-                mock_get_counts.side_effect = [
-                    {"test1": 2, "test2": 0},  # Previous state
-                    {"test1": 4, "test2": 0},  # Current state
-                ]
+                mock_get_counts.side_effect = _counts_by_ref(
+                    previous={"test1": 2, "test2": 0},
+                    current={"test1": 4, "test2": 0},
+                )
 
                 # Test comparison
                 comparisons = compare_ratchets("HEAD~1", "HEAD")
@@ -1,19 +1,27 @@
 """Tests for improved configuration handling."""
 
+import dataclasses
 import os
+import re
+import sys
+from unittest.mock import patch
 
 import pytest
 import yaml
 
 from coderatchet.core.config import (
+    DEFAULT_CONFIG,
     ConfigError,
     EnvValue,
     RatchetConfig,
+    _substitute_env_vars,
     create_ratchet_tests,
     load_config,
+    load_ratchet_configs,
     merge_configs,
     substitute_env_vars,
 )
+from coderatchet.core.utils import _compile
 
 
 def test_env_value():
@@ -55,6 +63,16 @@ def test_ratchet_config_validation():
             non_match_examples=[],
         )
 
+    # Each invalid pattern is reported under its own name
+    with pytest.raises(ConfigError, match="Invalid second pass pattern for ratchet"):
+        RatchetConfig(
+            name="test", pattern="a", is_two_pass=True, second_pass_pattern="["
+        )
+    with pytest.raises(ConfigError, match="Invalid file pattern for ratchet"):
+        RatchetConfig(name="test", pattern="a", file_pattern="(")
+    with pytest.raises(ConfigError, match="Invalid exclude pattern for ratchet"):
+        RatchetConfig(name="test", pattern="a", exclude_pattern="*")
+
     # Test invalid severity
     with pytest.raises(ConfigError, match="Invalid severity"):
         RatchetConfig(
@@ -131,6 +149,44 @@ def test_env_var_substitution():
     assert result["ratchets"]["test1"]["severity"] == "warning"
 
 
+def test_env_var_substitution_nested(monkeypatch):
+    """Test substitution inside nested lists, leaving unknown variables as-is."""
+    monkeypatch.setenv("TEST_DIR", "src")
+    monkeypatch.delenv("TEST_UNSET", raising=False)
+
+    config = {
+        "git": {"ignore_patterns": ["${TEST_DIR}/*.pyc", ["$TEST_DIR"], 42]},
+        "ci": {"report_format": "$TEST_UNSET", "fail_on_violations": True},
+    }
+
+    result = substitute_env_vars(config)
+    assert result["git"]["ignore_patterns"] == ["src/*.pyc", ["src"], 42]
+    assert result["ci"] == {"report_format": "$TEST_UNSET", "fail_on_violations": True}
+    assert result is config  # Updated in place
+    assert substitute_env_vars("${TEST_DIR}") == "src"
+
+
+def test_load_config_skips_env_substitution(tmp_path, monkeypatch):
+    """Test that env substitution only runs for files that could use it."""
+    monkeypatch.setenv("TEST_BRANCH", "develop")
+    config_file = tmp_path / "coderatchet.yaml"
+
+    with patch(
+        "coderatchet.core.config._substitute_env_vars", wraps=_substitute_env_vars
+    ) as mock_substitute:
+        config_file.write_text("git:\n  base_branch: main\n")
+        assert load_config(config_file)["git"]["base_branch"] == "main"
+        mock_substitute.assert_not_called()
+
+        # An escaped dollar sign in a double-quoted string still counts
+        config_file.write_text('git:\n  base_branch: "\\x24TEST_BRANCH"\n')
+        assert load_config(config_file)["git"]["base_branch"] == "develop"
+
+        config_file.write_text("git:\n  base_branch: ${TEST_BRANCH}x\n")
+        assert load_config(config_file)["git"]["base_branch"] == "developx"
+        assert mock_substitute.call_count == 2
+
+
 def test_create_ratchet_tests():
     """Test creation of ratchet tests."""
     configs = [
@@ -164,6 +220,65 @@ def test_create_ratchet_tests():
     assert tests[1].name == "test2"
     assert tests[1].first_pass.pattern == r"class\s+\w+"
 
+    # The file pattern compiled during validation is reused by the test
+    assert tests[0].include_file_regex is configs[0]._compiled_file_pattern
+
+
+def test_create_ratchet_tests_use_re2(tmp_path):
+    """Test that RE2 is only used by ratchets that opt in to it."""
+    pytest.importorskip("re2")
+    config_file = tmp_path / "coderatchet.yaml"
+    config_file.write_text(
+        "ratchets:\n"
+        "  nested:\n"
+        "    pattern: '(a+)+b'\n"
+        "    use_re2: true\n"
+        "  plain:\n"
+        "    pattern: '(a+)+c'\n"
+    )
+    nested, plain = create_ratchet_tests(load_ratchet_configs(config_file))
+    assert nested.use_re2 and not isinstance(nested.regex, re.Pattern)
+    assert isinstance(plain.regex, re.Pattern)
+
+
+def test_ratchet_config_shares_compiled_patterns():
+    """Test that config validation and ratchets share one regex cache."""
+    config = RatchetConfig(name="test", pattern=r"print\(", file_pattern=r"\.py$")
+    assert config._compiled_pattern is _compile(r"print\(")
+    assert config._compiled_file_pattern is _compile(r"\.py$")
+
+
+def test_ratchet_config_use_re2_must_be_bool():
+    """Test that a non-boolean use_re2 is rejected."""
+    with pytest.raises(ConfigError, match="use_re2"):
+        RatchetConfig(name="test", pattern="x", use_re2="yes")
+
+
+def test_ratchet_config_compiled_patterns():
+    """Test that validation keeps compiled patterns and reuses them."""
+    config = RatchetConfig(
+        name="test1",
+        pattern=r"print\(",
+        file_pattern=r"\.py$",
+        exclude_pattern=r"tests/",
+    )
+    other = RatchetConfig(name="test2", pattern=r"print\(")
+
+    assert config._compiled_pattern.pattern == r"print\("
+    assert config._compiled_file_pattern.pattern == r"\.py$"
+    assert config._compiled_exclude_pattern.pattern == r"tests/"
+    assert config._compiled_second_pass_pattern is None
+    assert config._compiled_pattern is other._compiled_pattern
+
+
+def test_ratchet_config_is_frozen():
+    """Test that RatchetConfig is immutable and has no per-instance dict."""
+    config = RatchetConfig(name="test", pattern=r"print\(")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        config.pattern = "other"
+    if sys.version_info >= (3, 10):
+        assert not hasattr(config, "__dict__")
+
 
 def test_config_error_handling(tmp_path):
     """Test configuration error handling."""
@@ -189,6 +304,37 @@ def test_config_error_handling(tmp_path):
         load_config(invalid_path, fallback_to_default=False)
 
 
+def test_ratchet_field_validation(tmp_path):
+    """Test that each ratchet field is type checked in order."""
+    cases = [
+        ("not a dict", "must be a dictionary"),
+        ({"config": []}, "'config' field .* must be a dictionary"),
+        ({"allowed_count": "1"}, "'allowed_count' field .* must be an integer"),
+        ({"match_examples": "x"}, "'match_examples' field .* must be a list"),
+        (
+            {"match_examples": [1], "non_match_examples": "x"},
+            "'match_examples' field .* must be a list of strings",
+        ),
+        ({"severity": 3}, "'severity' field .* must be a string"),
+        ({"severity": "fatal"}, "must be one of: error, warning, info"),
+    ]
+    config_file = tmp_path / "coderatchet.yaml"
+    for ratchet, message in cases:
+        config_file.write_text(yaml.dump({"ratchets": {"basic": ratchet}}))
+        with pytest.raises(ConfigError, match=message):
+            load_config(config_file, fallback_to_default=False)
+
+    # With fallback, only the invalid ratchet is replaced by its default
+    config_file.write_text(
+        yaml.dump({"ratchets": {"basic": {"severity": 3}, "mine": {}}})
+    )
+    config = load_config(config_file)
+    assert config["ratchets"]["basic"] == DEFAULT_CONFIG["ratchets"]["basic"]
+    assert config["ratchets"]["basic"] is not DEFAULT_CONFIG["ratchets"]["basic"]
+    assert config["ratchets"]["mine"]["severity"] == "error"
+    assert config["ratchets"]["mine"]["match_examples"] == []
+
+
 def test_merge_configs():
     """Test configuration merging."""
     base = {
@@ -226,3 +372,16 @@ def test_merge_configs():
     assert result["ratchets"]["test1"]["config"]["max_lines"] == 100
     assert result["ratchets"]["test2"]["enabled"] is True
     assert result["git"]["ignore"] == ["*.pyc", "*.pyo"]
+
+    # Base keys keep their order, new keys from the override come after them
+    assert list(result["ratchets"]) == ["test1", "test2"]
+    assert list(result["ratchets"]["test1"]) == ["enabled", "config"]
+
+    # The merged result shares no containers with its inputs
+    result["ratchets"]["test1"]["config"]["max_lines"] = 1
+    result["ratchets"]["test2"]["enabled"] = False
+    result["git"]["ignore"].append("*.so")
+    assert base["ratchets"]["test1"]["config"]["max_lines"] == 50
+    assert override["ratchets"]["test1"]["config"]["max_lines"] == 100
+    assert override["ratchets"]["test2"]["enabled"] is True
+    assert override["git"]["ignore"] == ["*.pyc", "*.pyo"]
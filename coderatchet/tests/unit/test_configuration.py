@@ -1,8 +1,11 @@
 """Tests for configuration handling in CodeRatchet."""
 
+from unittest.mock import patch
+
 import pytest
 import yaml
 
+from coderatchet.core import config as config_module
 from coderatchet.core.config import (
     DEFAULT_CONFIG,
     ConfigError,
@@ -59,18 +62,45 @@ def test_load_missing_config(tmp_path):
     loaded_config = load_config(config_file)
     assert loaded_config == DEFAULT_CONFIG
 
+    # A parent that is a file rather than a directory counts as missing too
+    not_a_dir = tmp_path / "file.txt"
+    not_a_dir.write_text("")
+    assert load_config(not_a_dir / "coderatchet.yaml") == DEFAULT_CONFIG
+    with pytest.raises(ConfigError, match="Configuration file not found"):
+        load_config(config_file, fallback_to_default=False)
+
+
+def test_load_config_does_not_share_defaults(tmp_path):
+    """Test that changing a loaded config never changes DEFAULT_CONFIG."""
+    missing = load_config(tmp_path / "nonexistent.yaml")
+    assert missing is not DEFAULT_CONFIG
+    missing["ratchets"]["basic"]["enabled"] = False
+    missing["git"]["ignore_patterns"].append("*.log")
+
+    config_file = tmp_path / "coderatchet.yaml"
+    config_file.write_text("ratchets: {}\ngit:\n  base_branch: dev\n")
+    loaded = load_config(config_file)
+    loaded["git"]["ignore_patterns"].append("*.tmp")
+    loaded["ci"]["report_format"] = "json"
+
+    assert DEFAULT_CONFIG["ratchets"]["basic"]["enabled"] is True
+    assert DEFAULT_CONFIG["git"]["ignore_patterns"] == [
+        "*.pyc",
+        "__pycache__/*",
+        "*.egg-info/*",
+    ]
+    assert DEFAULT_CONFIG["ci"]["report_format"] == "text"
+
 
 def test_load_invalid_yaml(tmp_path):
     """Test loading an invalid YAML file."""
     config_file = tmp_path / "invalid.yaml"
-    config_file.write_text(
-        """
+    config_file.write_text("""
     ratchets:
         invalid: yaml
         - this is not valid
         - yaml syntax
-    """
-    )
+    """)
 
     with pytest.raises(ConfigError):
         load_config(config_file, fallback_to_default=False)
@@ -183,3 +213,104 @@ def test_config_inheritance(tmp_path):
     assert loaded_config["ratchets"]["basic"]["enabled"] is True
     assert loaded_config["ratchets"]["basic"]["config"]["common_setting"] == "value"
     assert loaded_config["ratchets"]["basic"]["config"]["project_specific"] == "value"
+
+
+def test_load_config_cache(tmp_path):
+    """Test that cached configurations are copied and invalidated on change."""
+    config_file = tmp_path / "coderatchet.yaml"
+    config_file.write_text("ratchets:\n  basic:\n    enabled: true\n")
+
+    first = load_config(config_file)
+    first["ratchets"]["basic"]["enabled"] = False
+    first["ratchets"]["basic"]["match_examples"].append("x = 1")
+
+    # Mutating a returned config does not leak into the cache
+    second = load_config(config_file)
+    assert second["ratchets"]["basic"]["enabled"] is True
+    assert second["ratchets"]["basic"]["match_examples"] == []
+
+    # Editing the file invalidates the cached entry
+    config_file.write_text("ratchets:\n  basic:\n    enabled: false\n")
+    assert load_config(config_file)["ratchets"]["basic"]["enabled"] is False
+
+
+def test_load_config_cache_follows_extends(tmp_path):
+    """Test that editing a base config invalidates configs extending it."""
+    base_file = tmp_path / "base.yaml"
+    project_file = tmp_path / "project.yaml"
+    base_file.write_text("ratchets:\n  basic:\n    allowed_count: 1\n")
+    project_file.write_text("extends: base.yaml\n")
+
+    assert load_config(project_file)["ratchets"]["basic"]["allowed_count"] == 1
+
+    base_file.write_text("ratchets:\n  basic:\n    allowed_count: 22\n")
+    assert load_config(project_file)["ratchets"]["basic"]["allowed_count"] == 22
+
+
+def test_load_config_cache_follows_environment(tmp_path, monkeypatch):
+    """Test that changing a substituted environment variable invalidates caches."""
+    base_file = tmp_path / "base.yaml"
+    project_file = tmp_path / "project.yaml"
+    twin_file = tmp_path / "twin.yaml"
+    base_file.write_text("ratchets:\n  basic:\n    description: ${RATCHET_DESC}\n")
+    project_file.write_text("extends: base.yaml\n")
+    twin_file.write_text(base_file.read_text())
+
+    monkeypatch.setenv("RATCHET_DESC", "first")
+    assert load_config(base_file)["ratchets"]["basic"]["description"] == "first"
+    assert load_config(project_file)["ratchets"]["basic"]["description"] == "first"
+
+    monkeypatch.setenv("RATCHET_DESC", "second")
+    assert load_config(base_file)["ratchets"]["basic"]["description"] == "second"
+    assert load_config(project_file)["ratchets"]["basic"]["description"] == "second"
+    # A file with the same bytes does not pick up the stale content entry
+    assert load_config(twin_file)["ratchets"]["basic"]["description"] == "second"
+
+    monkeypatch.delenv("RATCHET_DESC")
+    description = load_config(base_file)["ratchets"]["basic"]["description"]
+    assert description == "${RATCHET_DESC}"
+
+
+def test_load_config_content_cache(tmp_path):
+    """Test that files with identical contents are parsed only once."""
+    contents = "ratchets:\n  basic:\n    allowed_count: 3\n"
+    first_file = tmp_path / "first.yaml"
+    second_file = tmp_path / "second.yaml"
+    first_file.write_text(contents)
+    second_file.write_text(contents)
+
+    with patch.dict(config_module._CONTENT_CACHE, clear=True):
+        with patch("yaml.load", wraps=yaml.load) as mock_load:
+            first = load_config(first_file)
+            second = load_config(second_file)
+            assert mock_load.call_count == 1
+
+            # Results are still independent copies
+            assert first == second
+            first["ratchets"]["basic"]["allowed_count"] = 0
+            assert second["ratchets"]["basic"]["allowed_count"] == 3
+
+            # A config that extends another is not shared by content
+            (tmp_path / "child.yaml").write_text("extends: first.yaml\n")
+            (tmp_path / "other.yaml").write_text("extends: first.yaml\n")
+            load_config(tmp_path / "child.yaml")
+            load_config(tmp_path / "other.yaml")
+            assert mock_load.call_count == 3
+
+
+def test_load_config_cache_is_bounded(tmp_path):
+    """Test that the config cache drops its oldest entries when full."""
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"config{i}.yaml"
+        path.write_text(f"ratchets:\n  basic:\n    allowed_count: {i}\n")
+        paths.append(str(path.resolve()))
+
+    with patch.object(config_module, "_MAX_CACHE_ENTRIES", 2):
+        with patch.dict(config_module._CONFIG_CACHE, clear=True):
+            for path in paths:
+                load_config(path)
+            assert list(config_module._CONFIG_CACHE) == [
+                (paths[1], True),
+                (paths[2], True),
+            ]
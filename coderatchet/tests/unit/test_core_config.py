@@ -14,6 +14,7 @@ from coderatchet.core.config import (
     create_ratchet_tests,
     load_config,
     load_ratchet_configs,
+    save_config,
 )
 from coderatchet.core.ratchet import RegexBasedRatchetTest, TwoPassRatchetTest
 
@@ -91,6 +92,31 @@ def test_load_config():
         assert "test2" in configs["ratchets"]
 
 
+def test_save_config_round_trip(tmp_path):
+    """Test that a saved configuration loads back unchanged."""
+    config_file = tmp_path / "coderatchet.yaml"
+    config_data = {
+        "ratchets": {
+            "no_print": {
+                "pattern": "print\\(",
+                "match_examples": ["print('héllo')"],
+                "description": "Ünïcode survives the round trip",
+            },
+        },
+    }
+    save_config(config_data, config_file)
+
+    # Block style, as written by hand
+    assert "{" not in config_file.read_text()
+    loaded = load_config(config_file)
+    assert loaded["ratchets"]["no_print"]["pattern"] == "print\\("
+    assert loaded["ratchets"]["no_print"]["match_examples"] == ["print('héllo')"]
+    assert (
+        loaded["ratchets"]["no_print"]["description"]
+        == "Ünïcode survives the round trip"
+    )
+
+
 def test_load_config_errors():
     """Test error handling in configuration loading."""
     with tempfile.NamedTemporaryFile(suffix=".yaml", mode="w") as f:
@@ -148,6 +174,23 @@ def test_load_ratchet_configs():
         assert any(c.name == "test2" for c in configs)
 
 
+def test_load_ratchet_configs_skips_entries(tmp_path):
+    """Test that group sections, disabled and pattern-less ratchets are skipped."""
+    config_file = tmp_path / "coderatchet.yaml"
+    config_data = {
+        "ratchets": {
+            "basic": {"enabled": True, "pattern": "print\\("},
+            "disabled": {"enabled": False, "pattern": "print\\("},
+            "no_pattern": {"enabled": True},
+            "test1": {"pattern": "print\\("},
+        }
+    }
+    yaml.dump(config_data, config_file.open("w"))
+
+    configs = load_ratchet_configs(str(config_file))
+    assert [c.name for c in configs] == ["test1"]
+
+
 def test_create_ratchet_tests():
     """Test creating ratchet tests from configurations."""
     configs = [
@@ -1,12 +1,23 @@
 """Unit tests for git integration."""
 
+import subprocess
+import sys
 from datetime import datetime
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-from coderatchet.core.git_integration import GitError, GitIntegration
+from coderatchet.core.git_integration import (
+    CommitMeta,
+    GitCatFileBatch,
+    GitCatFileCheck,
+    GitError,
+    GitIntegration,
+    _commit_subject,
+    _git_env,
+    _StatusSnapshot,
+)
 
 
 @patch("subprocess.run")
@@ -52,7 +63,8 @@ def test_is_git_repo(mock_run):
         assert git.is_git_repo() is True
         mock_run.assert_called_once_with(
             ["git", "rev-parse", "--is-inside-work-tree"],
-            cwd=Path("/test/repo"),
+            cwd="/test/repo",
+            env=_git_env(),
             capture_output=True,
             text=True,
             check=False,
@@ -66,7 +78,8 @@ def test_is_git_repo(mock_run):
         assert git.is_git_repo() is False
         mock_run.assert_called_once_with(
             ["git", "rev-parse", "--is-inside-work-tree"],
-            cwd=Path("/test/repo"),
+            cwd="/test/repo",
+            env=_git_env(),
             capture_output=True,
             text=True,
             check=False,
@@ -92,6 +105,86 @@ def test_is_detached_head(mock_run):
         assert git.is_detached_head() is True
 
 
+@patch("subprocess.run")
+def test_batch_shares_one_status(mock_run):
+    """Test that a batch answers HEAD and conflict queries from one status."""
+    mock_run.return_value = MagicMock(returncode=0, stdout="true\n")
+    with patch("pathlib.Path.exists", return_value=True):
+        git = GitIntegration("/test/repo")
+
+        mock_run.reset_mock()
+        mock_run.return_value = MagicMock(
+            returncode=0, stdout="# branch.oid abc123\0# branch.head main\0"
+        )
+        with git.batch():
+            with git.batch():
+                assert git.is_detached_head() is False
+            assert git.is_detached_head() is False
+            assert git.get_current_branch() == "main"
+            assert git.has_merge_conflicts() is False
+            assert git.get_merge_conflicts() == []
+        # All answered from a single git status
+        assert mock_run.call_count == 1
+        assert mock_run.call_args[0][0][:2] == ["git", "status"]
+
+        # Outside a batch every check asks git again
+        mock_run.return_value = MagicMock(returncode=1, stdout="")
+        assert git.is_detached_head() is True
+        assert mock_run.call_count == 2
+
+
+@patch("subprocess.run")
+def test_foreach_submodule_output(mock_run):
+    """Test splitting foreach output into per-submodule sections."""
+    mock_run.return_value = MagicMock(returncode=0, stdout="true\n")
+    with patch("pathlib.Path.exists", return_value=True):
+        git = GitIntegration("/test/repo")
+        git.is_detached_head = MagicMock(return_value=False)
+
+        mock_run.return_value = MagicMock(
+            returncode=0,
+            stdout=(
+                "Entering 'lib'\nclean\n\nEntering 'empty'\n"
+                "Entering 'vendor/tool'\nsays Entering 'x'\ndone\n"
+            ),
+        )
+        results = git.foreach_submodule("git status")
+        assert results == {
+            "lib": "clean\n",
+            "empty": "",
+            "vendor/tool": "says Entering 'x'\ndone",
+        }
+
+
+@patch("subprocess.run")
+def test_update_submodule_syncs_once(mock_run):
+    """Test that several submodule settings are written before one sync."""
+    mock_run.return_value = MagicMock(returncode=0, stdout="true\n")
+    with patch("pathlib.Path.exists", return_value=True):
+        git = GitIntegration("/test/repo")
+        git.is_detached_head = MagicMock(return_value=False)
+
+        mock_run.reset_mock()
+        git.update_submodule("lib", branch="main", shallow=True, ignore=None)
+        commands = [call[0][0] for call in mock_run.call_args_list]
+        assert commands == [
+            ["git", "config", "-f", ".gitmodules", "submodule.lib.branch", "main"],
+            ["git", "config", "-f", ".gitmodules", "submodule.lib.shallow", "true"],
+            ["git", "submodule", "sync", "lib"],
+        ]
+
+        # Nothing to change means nothing to run
+        mock_run.reset_mock()
+        git.update_submodule("lib")
+        mock_run.assert_not_called()
+
+        mock_run.side_effect = subprocess.CalledProcessError(
+            1, "git", stderr="error: could not lock config file"
+        )
+        with pytest.raises(GitError, match="Failed to set submodule branch: error"):
+            git.set_submodule_branch("lib", "dev")
+
+
 @patch("subprocess.run")
 def test_get_changed_files(mock_run):
     """Test getting changed files."""
@@ -99,8 +192,9 @@ def test_get_changed_files(mock_run):
     mock_run.return_value = MagicMock(returncode=0, stdout="true\n")
     with patch("pathlib.Path.exists", return_value=True):
         git = GitIntegration("/test/repo")
-        git.is_detached_head = MagicMock(return_value=False)
-        git.has_merge_conflicts = MagicMock(return_value=False)
+        git._status = MagicMock(
+            return_value=_StatusSnapshot("main", (), ("file1.py", "file2.py"))
+        )
 
         # Test getting changed files
         mock_run.return_value = MagicMock(returncode=0, stdout="file1.py\nfile2.py\n")
@@ -124,17 +218,115 @@ def test_get_changed_files(mock_run):
         assert set(files) == expected_files
 
         # Test with detached HEAD
-        git.is_detached_head.return_value = True
+        git._status.return_value = _StatusSnapshot(None, (), ())
         with pytest.raises(GitError, match="Repository is in detached HEAD state"):
             git.get_changed_files()
 
         # Test with merge conflicts
-        git.is_detached_head.return_value = False
-        git.has_merge_conflicts.return_value = True
+        git._status.return_value = _StatusSnapshot("main", ("test.py",), ())
         with pytest.raises(GitError, match="Repository has merge conflicts"):
             git.get_changed_files()
 
 
+@patch("subprocess.run")
+def test_status_v2(mock_run):
+    """Test parsing branch, conflicts and changes from one git status."""
+    mock_run.return_value = MagicMock(returncode=0, stdout="true\n")
+    with patch("pathlib.Path.exists", return_value=True):
+        git = GitIntegration("/test/repo")
+
+        mock_run.return_value = MagicMock(
+            returncode=0,
+            stdout="# branch.oid abc123\0# branch.head main\0"
+            "# branch.upstream origin/main\0"
+            "1 .M N... 100644 100644 100644 a b src/a file.py\0"
+            "2 R. N... 100644 100644 100644 a b R100 new.py\0old.py\0",
+        )
+        status = git._status_v2()
+        assert status == _StatusSnapshot("main", (), ("src/a file.py", "new.py"))
+        assert mock_run.call_args[0][0][:2] == ["git", "status"]
+
+        mock_run.return_value = MagicMock(
+            returncode=0,
+            stdout="# branch.head (detached)\0"
+            "u UU N... 100644 100644 100644 100644 a b c test.py\0",
+        )
+        status = git._status_v2()
+        assert status.detached
+        assert status.conflicts == ("test.py",)
+
+
+@patch("subprocess.run")
+def test_get_merge_base_cached(mock_run):
+    """Test that merge bases are cached on the resolved commits."""
+    mock_run.return_value = MagicMock(returncode=0, stdout="true\n")
+    with patch("pathlib.Path.exists", return_value=True):
+        git = GitIntegration("/test/repo")
+
+        head, base = "a" * 40, "b" * 40
+        commands = []
+
+        def mock_run_side_effect(cmd, *args, **kwargs):
+            commands.append(cmd[1])
+            if cmd[1] == "rev-parse":
+                return MagicMock(returncode=0, stdout=f"{head}\n")
+            return MagicMock(returncode=0, stdout="c" * 40 + "\n")
+
+        mock_run.side_effect = mock_run_side_effect
+        with patch.object(
+            GitCatFileCheck, "resolve", return_value=[head]
+        ) as mock_resolve:
+            assert git.get_merge_base("main", base) == "c" * 40
+            assert git.get_merge_base(base, head) == "c" * 40
+            assert git.get_merge_base("main", base) == "c" * 40
+        # Branch names are resolved every time over the cat-file pipe,
+        # merge-base runs only once
+        assert mock_resolve.call_count == 2
+        mock_resolve.assert_called_with(["main"])
+        assert commands == ["merge-base"]
+
+        # Names cat-file does not know are left to rev-parse
+        with patch.object(GitCatFileCheck, "resolve", return_value=[None]):
+            assert git.get_merge_base("main", base) == "c" * 40
+        assert commands == ["merge-base", "rev-parse"]
+
+
+@patch("subprocess.run")
+def test_get_commit_files_cached(mock_run):
+    """Test that the files of a commit are read once per full hash."""
+    mock_run.return_value = MagicMock(returncode=0, stdout="true\n")
+    with patch("pathlib.Path.exists", return_value=True):
+        git = GitIntegration("/test/repo")
+
+        mock_run.reset_mock()
+        mock_run.return_value = MagicMock(returncode=0, stdout="a.py\nb.py\n")
+        expected = [Path("/test/repo/a.py"), Path("/test/repo/b.py")]
+        commit = "a" * 40
+        assert git.get_commit_files(commit) == expected
+        files = git.get_commit_files(commit)
+        assert files == expected
+        assert mock_run.call_count == 1
+
+        # Callers get their own list
+        files.append(Path("/test/repo/c.py"))
+        assert git.get_commit_files(commit) == expected
+
+        # Branch names move, so they always ask git
+        git.get_commit_files("main")
+        git.get_commit_files("main")
+        assert mock_run.call_count == 3
+
+
+def _popen_with_stderr(proc, stderr):
+    """Fake Popen returning proc after writing stderr to the error file."""
+
+    def popen(cmd, **kwargs):
+        kwargs["stderr"].write(stderr)
+        return proc
+
+    return popen
+
+
 @patch("subprocess.run")
 def test_get_file_history(mock_run):
     """Test getting file history."""
@@ -143,13 +335,17 @@ def test_get_file_history(mock_run):
     with patch("pathlib.Path.exists", return_value=True):
         git = GitIntegration("/test/repo")
 
-        # Test getting file history
-        mock_run.return_value = MagicMock(
-            returncode=0,
-            stdout="abc123|2024-01-01T12:00:00+00:00|Initial commit\n"
-            "def456|2024-01-02T12:00:00+00:00|Update file\n",
+        # Test getting file history; the log is streamed from a Popen pipe
+        proc = MagicMock(returncode=0)
+        proc.stdout = iter(
+            [
+                "abc123|2024-01-01T12:00:00+00:00|Initial commit\n",
+                "def456|2024-01-02T12:00:00+00:00|Update file\n",
+            ]
         )
-        history = git.get_file_history("test.py")
+        with patch("subprocess.Popen", return_value=proc) as mock_popen:
+            history = git.get_file_history("test.py")
+        assert mock_popen.call_args[0][0][:2] == ["git", "log"]
         assert len(history) == 2
         assert history[0][0] == "abc123"
         assert history[0][1] == datetime.fromisoformat("2024-01-01T12:00:00+00:00")
@@ -158,6 +354,121 @@ def test_get_file_history(mock_run):
         assert history[1][1] == datetime.fromisoformat("2024-01-02T12:00:00+00:00")
         assert history[1][2] == "Update file"
 
+        # Test a failing git log
+        proc = MagicMock(returncode=128)
+        proc.stdout = iter([])
+        failing = _popen_with_stderr(proc, b"fatal: bad revision 'HEAD'")
+        with patch("subprocess.Popen", side_effect=failing):
+            with pytest.raises(GitError, match="Invalid git revision"):
+                git.get_file_history("test.py")
+
+
+@patch("subprocess.run")
+def test_get_file_blame(mock_run):
+    """Test parsing streamed blame output."""
+    mock_run.return_value = MagicMock(returncode=0, stdout="true\n")
+    with patch("pathlib.Path.exists", return_value=True):
+        git = GitIntegration("/test/repo")
+
+        sha1, sha2 = "a" * 40, "b" * 40
+        output = [
+            f"{sha1} 1 1 1\n".encode(),
+            b"author Alice\n",
+            b"author-mail <alice@example.com>\n",
+            b"summary Initial commit\n",
+            b"filename test.py\n",
+            b"\tprint('hello')\r\n",
+            f"{sha2} 2 2 1\n".encode(),
+            b"author Bob\n",
+            b"summary author line\n",
+            b"filename test.py\n",
+            b"\t\tindented \xff\n",
+            f"{sha1} 2 3\n".encode(),
+            b"author Alice\n",
+            b"summary Initial commit\n",
+            b"filename test.py\n",
+            b"\tprint('bye')\n",
+        ]
+        proc = MagicMock(returncode=0)
+        proc.stdout = iter(output)
+        with patch("subprocess.Popen", return_value=proc) as mock_popen:
+            blame = git.get_file_blame("test.py")
+        assert mock_popen.call_args[0][0] == [
+            "git",
+            "blame",
+            "--line-porcelain",
+            "test.py",
+        ]
+        assert blame == [
+            (sha1, "Alice", 1, "print('hello')"),
+            (sha2, "Bob", 2, "\tindented \ufffd"),
+            (sha1, "Alice", 3, "print('bye')"),
+        ]
+        # Metadata is decoded once per commit
+        assert blame[2][0] is blame[0][0]
+        assert blame[2][1] is blame[0][1]
+
+        # The grouped form keeps one author per commit and decodes lazily
+        proc.stdout = iter(output)
+        with patch("subprocess.Popen", return_value=proc):
+            grouped = git.get_file_blame_grouped("test.py")
+        assert grouped.commits == {sha1: CommitMeta("Alice"), sha2: CommitMeta("Bob")}
+        assert len(grouped.lines) == 3
+        assert grouped.lines[1] == (2, sha2, "\tindented \ufffd")
+        assert grouped.lines[-1] == (3, sha1, "print('bye')")
+        assert grouped.lines[:2] == [
+            (1, sha1, "print('hello')"),
+            (2, sha2, "\tindented \ufffd"),
+        ]
+        assert list(grouped.lines) == [
+            (number, commit_hash, content) for commit_hash, _, number, content in blame
+        ]
+
+        # Errors are decoded for the usual message matching
+        proc = MagicMock(returncode=128)
+        proc.stdout = iter([])
+        failing = _popen_with_stderr(proc, b"fatal: no such path 'gone.py' in HEAD")
+        with patch("subprocess.Popen", side_effect=failing):
+            with pytest.raises(GitError, match="no such path"):
+                git.get_file_blame("gone.py")
+
+
+@patch("subprocess.run")
+def test_stream_git_heavy_stderr(mock_run):
+    """Test that a command filling the error pipe cannot stall streaming."""
+    mock_run.return_value = MagicMock(returncode=0, stdout="true\n")
+    with patch("pathlib.Path.exists", return_value=True):
+        git = GitIntegration("/test/repo")
+
+    # Far more error output than a pipe buffer holds, before any lines
+    script = (
+        "import sys\n"
+        "sys.stderr.write('warning: noise\\n' * 100000)\n"
+        "sys.stderr.flush()\n"
+        "print('line 1')\n"
+        "print('line 2')\n"
+        "sys.exit(1)\n"
+    )
+    real_popen = subprocess.Popen
+
+    def popen(cmd, **kwargs):
+        kwargs["cwd"] = None
+        return real_popen([sys.executable, "-c", script], **kwargs)
+
+    lines = []
+    with patch("subprocess.Popen", side_effect=popen):
+        with pytest.raises(GitError, match="warning: noise"):
+            for line in git._stream_git(["log"]):
+                lines.append(line)
+    assert lines == ["line 1", "line 2"]
+
+
+def test_commit_subject():
+    """Test deriving git's %s subject from a full commit message."""
+    assert _commit_subject("Fix parser\n\nLonger body\n") == "Fix parser"
+    assert _commit_subject("Wrapped\nsubject  \n \nbody") == "Wrapped subject"
+    assert _commit_subject("\n\nLeading blank lines\n") == "Leading blank lines"
+
 
 @patch("subprocess.run")
 def test_get_file_content_at_commit(mock_run):
@@ -167,17 +478,42 @@ def test_get_file_content_at_commit(mock_run):
     with patch("pathlib.Path.exists", return_value=True):
         git = GitIntegration("/test/repo")
 
-        # Test getting file content
-        mock_run.return_value = MagicMock(returncode=0, stdout="print('hello')\n")
-        content = git.get_file_content_at_commit("test.py", "abc123")
-        assert content == "print('hello')\n"
-
-        # Test with binary file
-        mock_run.return_value = MagicMock(
-            returncode=0, stdout=b"binary content", stderr=""
-        )
-        content = git.get_file_content_at_commit("test.bin", "abc123")
-        assert content == b"binary content"  # Compare with bytes
+        with patch.object(GitCatFileCheck, "read") as mock_check, patch.object(
+            GitCatFileBatch, "read_object"
+        ) as mock_read:
+            # Test getting file content
+            mock_check.return_value = "1" * 40
+            mock_read.return_value = b"print('hello')\r\n"
+            content = git.get_file_content_at_commit("test.py", "abc123")
+            assert content == "print('hello')\n"
+            mock_check.assert_called_once_with("abc123", "test.py")
+            mock_read.assert_called_once_with("1" * 40)
+
+            # The same blob at another commit comes from the cache
+            content = git.get_file_content_at_commit("test.py", "def456")
+            assert content == "print('hello')\n"
+            assert mock_read.call_count == 1
+
+            # Test with binary file
+            mock_check.return_value = "2" * 40
+            mock_read.return_value = b"binary\x00content"
+            content = git.get_file_content_at_commit("test.bin", "abc123")
+            assert content == b"binary\x00content"  # Compare with bytes
+
+            # Missing objects are reported through git show
+            mock_check.return_value = None
+            mock_run.side_effect = subprocess.CalledProcessError(
+                128, "git", stderr="fatal: path 'gone.py' does not exist"
+            )
+            with pytest.raises(GitError, match="does not exist"):
+                git.get_file_content_at_commit("gone.py", "abc123")
+            mock_run.side_effect = None
+
+            # Newlines would break the batch protocol
+            with pytest.raises(GitError, match="Invalid characters"):
+                git.get_file_content_at_commit("bad\nname.py", "abc123")
+
+        git.close()
 
 
 @patch("subprocess.run")
@@ -332,6 +668,21 @@ def test_get_config_value(mock_run):
         assert value is None
 
 
+@patch("subprocess.run")
+def test_git_env_read_per_call(mock_run, monkeypatch):
+    """Test that git sees environment changes made after construction."""
+    mock_run.return_value = MagicMock(returncode=0, stdout="true\n")
+    with patch("pathlib.Path.exists", return_value=True):
+        git = GitIntegration("/test/repo")
+
+    monkeypatch.setenv("GIT_AUTHOR_NAME", "Later User")
+    git.is_git_repo()
+    env = mock_run.call_args.kwargs["env"]
+    assert env["GIT_AUTHOR_NAME"] == "Later User"
+    assert env["LC_ALL"] == "C"
+    assert env["GIT_OPTIONAL_LOCKS"] == "0"
+
+
 @patch("subprocess.run")
 def test_set_config_value(mock_run):
     """Test setting git config values."""
@@ -345,7 +696,8 @@ def test_set_config_value(mock_run):
         git.set_config_value("user.name", "value")
         mock_run.assert_called_with(
             ["git", "config", "user.name", "value"],
-            cwd=Path("/test/repo"),
+            cwd="/test/repo",
+            env=_git_env(),
             capture_output=True,
             text=True,
             check=True,
@@ -380,3 +732,18 @@ def test_get_repo_root(mock_run):
         mock_run.return_value = MagicMock(returncode=0, stdout="/test/repo\n")
         root = git.get_repo_root()
         assert root == Path("/test/repo")
+
+    # The constructor's rev-parse reports the layout; the top level is looked
+    # up once, on first use
+    mock_run.return_value = MagicMock(
+        returncode=0, stdout="true\n/test/repo/.git\nsub/\n"
+    )
+    with patch("pathlib.Path.exists", return_value=True):
+        git = GitIntegration("/test/repo/sub")
+        assert git._git_dir == Path("/test/repo/.git")
+        assert git._prefix == "sub/"
+        mock_run.reset_mock()
+        mock_run.return_value = MagicMock(returncode=0, stdout="/test/repo\n")
+        assert git.get_repo_root() == Path("/test/repo")
+        assert git.get_repo_root() == Path("/test/repo")
+        assert mock_run.call_count == 1
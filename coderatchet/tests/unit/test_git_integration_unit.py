@@ -11,7 +11,9 @@ from coderatchet.core.git_integration import (
     GitError,
     GitIntegration,
     add_and_commit,
+    add_worktree,
     is_git_repo,
+    remove_worktree,
 )
 
 
@@ -458,12 +460,67 @@ def test_submodule_operations(git_repo):
         assert git.get_submodule_recursive("submodule") is True
         assert git.get_submodule_fetchRecurseSubmodules("submodule") is True
 
+        # Test getting all .gitmodules settings at once
+        config = git.get_all_submodule_config("submodule")
+        assert config["path"] == "submodule"
+        assert config["branch"] == "main"
+        assert config["ignore"] == "all"
+        assert config["update"] == "rebase"
+        assert config["shallow"] == "true"
+        with pytest.raises(GitError, match="Submodule not found"):
+            git.get_all_submodule_config("missing")
+
         # Test detached HEAD state
         subprocess.run(["git", "checkout", "HEAD~0"], cwd=git_repo, check=True)
         with pytest.raises(GitError, match="Git repository is in detached HEAD state"):
             git.get_submodule_status("submodule")
 
 
+def test_submodule_mutation_errors(git_repo):
+    """Test that failing submodule mutations report git's error output."""
+    git = GitIntegration(git_repo)
+    (git_repo / "init.txt").write_text("content")
+    add_and_commit(git_repo, "Initial commit")
+
+    missing = git_repo.parent / "missing-repo.git"
+    with pytest.raises(GitError, match="Failed to add submodule: .*missing-repo"):
+        git.add_submodule(str(missing), "lib")
+
+
+def test_gitmodules_parsing(git_repo):
+    """Test reading submodule settings straight from .gitmodules."""
+    git = GitIntegration(git_repo)
+    (git_repo / "init.txt").write_text("content")
+    add_and_commit(git_repo, "Initial commit")
+
+    (git_repo / ".gitmodules").write_text(
+        '[submodule "lib"]\n'
+        "\tpath = vendor/lib\n"
+        "\turl = https://example.com/lib.git\n"
+        "\tbranch = main ; tracked branch\n"
+        '\tignore = "dirty"\n'
+        "\tshallow\n"
+    )
+    assert git.get_submodule_remote_url("lib") == "https://example.com/lib.git"
+    assert git.get_submodule_path("lib") == str(git_repo / "vendor/lib")
+    # Comments, quoting and bare booleans follow git's own rules
+    assert git.get_submodule_branch("lib") == "main"
+    assert git.get_submodule_ignore("lib") == "dirty"
+    assert git.get_submodule_shallow("lib") is True
+    assert git.get_all_submodule_config("lib")["url"] == "https://example.com/lib.git"
+
+    with pytest.raises(GitError, match="Failed to get submodule update setting"):
+        git.get_submodule_update("lib")
+
+    # Changes made through git are picked up
+    subprocess.run(
+        ["git", "config", "-f", ".gitmodules", "submodule.lib.branch", "dev"],
+        cwd=git_repo,
+        check=True,
+    )
+    assert git.get_submodule_branch("lib") == "dev"
+
+
 def test_config_operations(git_repo):
     """Test git config operations."""
     git = GitIntegration(git_repo)
@@ -542,3 +599,71 @@ def test_utility_functions():
             check=True,
         )
         assert "Test commit" in result.stdout
+
+
+def test_add_and_commit_default_identity(tmp_path, monkeypatch):
+    """Test that add_and_commit fills in only the identity that is missing."""
+    # Hide the user's global and system git config
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / ".config"))
+    monkeypatch.setenv("GIT_CONFIG_NOSYSTEM", "1")
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    subprocess.run(["git", "init"], cwd=repo, check=True)
+
+    def last_author():
+        return subprocess.run(
+            ["git", "log", "-1", "--format=%an <%ae>"],
+            cwd=repo,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+
+    (repo / "test.txt").write_text("one")
+    add_and_commit(repo, "First commit")
+    assert last_author() == "Test User <test@example.com>"
+    # The default identity is not written to the repository config
+    result = subprocess.run(["git", "config", "user.name"], cwd=repo, check=False)
+    assert result.returncode == 1
+
+    subprocess.run(["git", "config", "user.name", "Alice"], cwd=repo, check=True)
+    (repo / "test.txt").write_text("two")
+    add_and_commit(repo, "Second commit")
+    assert last_author() == "Alice <test@example.com>"
+
+
+def test_worktrees(tmp_path):
+    """Test committing in a separate worktree of a repository."""
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    subprocess.run(["git", "init"], cwd=repo, check=True)
+    subprocess.run(["git", "config", "user.name", "Test User"], cwd=repo, check=True)
+    subprocess.run(
+        ["git", "config", "user.email", "test@example.com"], cwd=repo, check=True
+    )
+    (repo / "test.txt").write_text("one")
+    add_and_commit(repo, "Initial commit")
+
+    worktree = add_worktree(repo, "a")
+    assert worktree == tmp_path.resolve() / "wt-a"
+    assert (worktree / "test.txt").read_text() == "one"
+
+    (worktree / "test.txt").write_text("two")
+    add_and_commit(worktree, "Worktree commit")
+    result = subprocess.run(
+        ["git", "log", "-1", "--format=%s"],
+        cwd=worktree,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "Worktree commit"
+    assert GitIntegration(repo).get_git_history()[0][2] == "Initial commit"
+    assert (repo / "test.txt").read_text() == "one"
+
+    with pytest.raises(GitError, match="Failed to add worktree"):
+        add_worktree(repo, "a")
+
+    remove_worktree(repo, worktree)
+    assert not worktree.exists()
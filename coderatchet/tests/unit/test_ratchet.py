@@ -2,23 +2,33 @@
 Tests for ratchet functionality.
 """
 
+import ast
 import os
 import re
 import tempfile
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
 from coderatchet.core.comparison import compare_ratchet_sets
 from coderatchet.core.ratchet import (
+    CompositeRegexRatchet,
+    FileContext,
     FullFileRatchetTest,
     RatchetError,
     RatchetTest,
     RegexBasedRatchetTest,
     TwoLineRatchetTest,
     TwoPassRatchetTest,
+    _include_file,
+    _line_starts,
+    _matching_line_indices,
+    collect_failures_from_file,
+    collect_failures_from_lines,
     run_ratchets_on_file,
 )
+from coderatchet.core.ratchets import FunctionLengthRatchet
 from coderatchet.core.recent_failures import BrokenRatchet, get_recently_broken_ratchets
 from coderatchet.core.test_failure import TestFailure
 from coderatchet.core.utils import PatternManager, pattern_manager
@@ -43,6 +53,10 @@ def test_ratchet_test_basic():
     assert test.description == "Test print statements"
     assert test.failures == []
 
+    # The test file filter is built once and shared by every test
+    other = RatchetTest(name="test2", allowed_count=0, exclude_test_files=True)
+    assert other.include_file_regex is test.include_file_regex
+
     # Test file inclusion
     assert (
         test.should_include_file(Path("test.py")) is True
@@ -163,6 +177,49 @@ def test_two_line_ratchet_test():
     assert len(test.failures) == 0
 
 
+def test_two_line_ratchet_matches_consecutive_pairs():
+    """Test that a pair fails only when both lines match in order."""
+    test = TwoLineRatchetTest(
+        name="bare_except",
+        pattern=r"except\s*:$",
+        last_line_pattern=r"^\s*pass",
+        allowed_count=0,
+    )
+    lines = [
+        "try:\n",
+        "    x()\n",
+        "except:   \n",
+        "    pass\n",
+        "except:\n",
+        "    log()\n",
+        "except:",
+    ]
+    test.collect_failures_from_lines(lines, "test.py")
+    assert [(f.line_number, f.line_contents) for f in test.failures] == [
+        (3, "except:\n    pass")
+    ]
+
+    # Each call replaces the failures of the previous one
+    test.collect_failures_from_lines(["except:", "pass", "except:", "pass"], "b.py")
+    assert [f.line_number for f in test.failures] == [1, 3]
+    test.collect_failures_from_lines([], "c.py")
+    assert test.failures == []
+
+
+def test_two_pass_ratchet_reports_each_later_hit_once():
+    """Test that later second pass hits are reported once per file."""
+    first_pass = RegexBasedRatchetTest(name="def", pattern=r"^def ", allowed_count=0)
+    test = TwoPassRatchetTest(
+        name="bare_return", first_pass=first_pass, second_pass_pattern=r"return$"
+    )
+    lines = ["    return\n", "def a():\n", "    return\n", "def b():\n", "    return"]
+    test.collect_failures_from_lines(lines, "test.py")
+    assert [(f.line_number, f.line_contents) for f in test.failures] == [
+        (3, "    return\n"),
+        (5, "    return"),
+    ]
+
+
 def test_full_file_ratchet():
     """Test FullFileRatchetTest functionality."""
     # Create test with basic pattern
@@ -362,10 +419,11 @@ def test_pattern_manager():
     assert joined.search("other")
     assert not joined.search("neither")
 
-    # Test cache clearing
+    # Test cache clearing; compiled patterns are shared process-wide
     manager.clear_cache()
     pattern3 = manager.get_pattern("test")
-    assert pattern3 is not pattern  # Should be a new pattern after cache clear
+    assert pattern3 is pattern2
+    assert pattern3.flags == pattern2.flags
 
     # Test empty pattern list
     empty = manager.join_patterns([])
@@ -390,6 +448,11 @@ def test_pattern_manager():
     assert pattern.search("test")
     assert not pattern.search("TEST")  # Case sensitive by default
 
+    insensitive = manager.get_pattern("test", flags=re.IGNORECASE)
+    assert insensitive.search("TEST")
+    assert insensitive is not manager.get_pattern("test")
+    assert insensitive is manager.get_pattern("test", flags=re.IGNORECASE)
+
 
 def test_regex_join_with_or():
     """Test joining regex patterns with OR."""
@@ -534,6 +597,19 @@ def test_compare_ratchets():
     assert added[0].name == "test2"
     assert removed[0].name == "test3"
 
+    # A ratchet present in both sets with a different definition is modified
+    test1_changed = RegexBasedRatchetTest(
+        name="test1",
+        pattern="print\\(",
+        description="Changed description",
+    )
+    added, removed, modified = compare_ratchet_sets(
+        [test1_changed, test2_current], [test1_previous, test2_current]
+    )
+    assert added == []
+    assert removed == []
+    assert modified == [(test1_changed, test1_previous)]
+
 
 def test_ratchet_test_base():
     """Test base RatchetTest class."""
@@ -686,6 +762,234 @@ def test_file_operations():
             os.unlink(tmp.name)
 
 
+def test_composite_regex_ratchet():
+    """Test that the combined scan matches running each test on its own."""
+    tests = [
+        RegexBasedRatchetTest(name="print", pattern=r"print\(", allowed_count=0),
+        RegexBasedRatchetTest(name="todo", pattern=r"TODO", allowed_count=0),
+        RegexBasedRatchetTest(name="double", pattern=r"(\w)\1", allowed_count=0),
+        TwoLineRatchetTest(name="two_line", pattern=r"eval", allowed_count=0),
+    ]
+    lines = ["x = 1", "print(x)  # TODO", "eval(x)", "# TODO: ll", "done"]
+
+    composite = CompositeRegexRatchet(tests)
+    failures = composite.collect_failures_from_lines(lines, "module.py")
+
+    expected = []
+    for test in tests:
+        expected.extend(collect_failures_from_lines("module.py", lines, test))
+    assert failures == expected
+    assert [(f.test_name, f.line_number) for f in failures] == [
+        ("print", 2),
+        ("todo", 2),
+        ("todo", 4),
+        ("double", 4),
+        ("two_line", 3),
+    ]
+
+
+def test_composite_regex_ratchet_group_conditionals(tmp_path):
+    """Test that patterns whose groups would be renumbered are not combined."""
+    source = tmp_path / "module.py"
+    source.write_text("x\n<x>\nqz\n")
+    tests = [
+        RegexBasedRatchetTest(name="q", pattern=r"q(z)", allowed_count=0),
+        RegexBasedRatchetTest(name="angle", pattern=r"(<)?x(?(1)>|$)", allowed_count=0),
+    ]
+
+    failures = collect_failures_from_file(source, tests)
+
+    lines = source.read_text().splitlines()
+    expected = []
+    for test in tests:
+        expected.extend(collect_failures_from_lines(str(source), lines, test))
+    assert failures == expected
+    assert [(f.test_name, f.line_number) for f in failures] == [
+        ("q", 3),
+        ("angle", 1),
+        ("angle", 2),
+    ]
+
+
+def test_collect_failures_from_file_batches_tests(tmp_path):
+    """Test that collecting from a file keeps per-test order and exclusions."""
+    source = tmp_path / "module.py"
+    source.write_text("print('a')  # TODO\nvalue = 1\nprint('b')\n")
+    tests = [
+        RegexBasedRatchetTest(name="todo", pattern=r"TODO", allowed_count=0),
+        RegexBasedRatchetTest(name="print", pattern=r"print\(", allowed_count=0),
+        RegexBasedRatchetTest(
+            name="value",
+            pattern=r"value",
+            allowed_count=0,
+            include_file_regex=re.compile(r"\.txt$"),
+        ),
+    ]
+
+    failures = collect_failures_from_file(source, tests)
+
+    assert [(f.test_name, f.line_number) for f in failures] == [
+        ("todo", 1),
+        ("print", 1),
+        ("print", 3),
+    ]
+
+
+def test_collect_failures_from_large_file(tmp_path):
+    """Test that memory-mapped scans of large files match the line scan."""
+    filler = "value = compute(a, b)  # ordinary line\n" * 3000
+    source = tmp_path / "module.py"
+    source.write_text(filler + "print(value)  # TODO\n" + filler + "\n   \n")
+    tests = [
+        RegexBasedRatchetTest(name="print", pattern=r"print\(", allowed_count=0),
+        RegexBasedRatchetTest(name="blank", pattern=r"^\s*$", allowed_count=0),
+        RegexBasedRatchetTest(name="todo", pattern=r"(?i)todo$", allowed_count=0),
+    ]
+    lines = source.read_text().splitlines()
+    expected = CompositeRegexRatchet(tests).collect_failures_from_lines(
+        lines, str(source)
+    )
+
+    with patch(
+        "coderatchet.core.ratchet.CompositeRegexRatchet.collect_failures_from_lines"
+    ) as line_scan:
+        failures = collect_failures_from_file(source, tests)
+    line_scan.assert_not_called()
+    assert failures == expected
+    assert [(f.test_name, f.line_number) for f in failures] == [
+        ("print", 3001),
+        ("blank", 6002),
+        ("blank", 6003),
+        ("todo", 3001),
+    ]
+
+    # Non-ASCII content falls back to the line scan
+    source.write_text(filler * 2 + "print('café')\n")
+    failures = collect_failures_from_file(source, tests)
+    assert [(f.test_name, f.line_number) for f in failures] == [("print", 6001)]
+
+
+def test_function_length_ratchet():
+    """Test that long functions, nested and async ones included, are found."""
+    lines = [
+        "def outer():",
+        "    def inner():",
+        "        x = 1",
+        "        return x",
+        "    return inner",
+        "",
+        "async def fetch():",
+        "    await thing()",
+        "    return value",
+        "",
+        "handler = lambda: [1, 2, 3]",
+        "def short(): pass",
+    ]
+    ratchet = FunctionLengthRatchet(
+        max_lines=2, name="function_length", allowed_count=0
+    )
+
+    failures = ratchet.collect_failures_from_lines(lines, "module.py")
+
+    assert [(f.line_number, f.line_contents.split("'")[1]) for f in failures] == [
+        (1, "outer"),
+        (7, "fetch"),
+        (2, "inner"),
+    ]
+    assert failures[0].line_contents == (
+        "Function 'outer' is 5 lines long, exceeding the maximum of 2 lines"
+    )
+    assert ratchet.collect_failures_from_lines(["def broken(:"], "bad.py") == []
+
+
+def test_file_context_shared_by_ast_ratchets(tmp_path):
+    """Test that one parse of a file serves every AST-based ratchet."""
+    source = tmp_path / "module.py"
+    source.write_text("def long():\n    x = 1\n    return x\n\nprint(long())\n")
+    tests = [
+        FunctionLengthRatchet(max_lines=2, name="strict", allowed_count=0),
+        RegexBasedRatchetTest(name="print", pattern=r"print\(", allowed_count=0),
+        FunctionLengthRatchet(max_lines=1, name="stricter", allowed_count=0),
+    ]
+
+    with patch("ast.parse", wraps=ast.parse) as parse:
+        failures = collect_failures_from_file(source, tests)
+    assert parse.call_count == 1
+    assert [(f.test_name, f.line_number) for f in failures] == [
+        ("strict", 1),
+        ("print", 5),
+        ("stricter", 1),
+    ]
+
+    ctx = FileContext(["def broken(:"])
+    assert ctx.content == "def broken(:"
+    assert ctx.ast is None
+    assert tests[0].collect_failures_from_context(ctx, "bad.py") == []
+
+
+def test_file_context_line_offsets_shared_by_ratchets():
+    """Test that every ratchet maps hits to lines through one offset table."""
+    lines = ["import os\n", "print(os)\n", "\n", "x = 1  # TODO\n", "print(x)"]
+    ctx = FileContext(lines)
+    assert ctx.joined_lines == "\n".join(lines)
+    assert ctx.line_starts == [0, 11, 22, 24, 39, 48]
+
+    tests = [
+        RegexBasedRatchetTest(name="print", pattern=r"print\(", allowed_count=0),
+        RegexBasedRatchetTest(name="todo", pattern=r"TODO", allowed_count=0),
+        RegexBasedRatchetTest(name="blank", pattern=r"^\s*$", allowed_count=0),
+    ]
+    with patch(
+        "coderatchet.core.ratchet._line_starts", wraps=_line_starts
+    ) as line_starts:
+        failures = CompositeRegexRatchet(tests).collect_failures_from_context(
+            FileContext(lines), "test.py"
+        )
+    assert line_starts.call_count == 1
+    assert [(f.test_name, f.line_number) for f in failures] == [
+        ("print", 2),
+        ("print", 5),
+        ("todo", 4),
+        ("blank", 3),
+    ]
+
+
+def test_add_failure_appends_in_place():
+    """Test that failures accumulate in place and are handed out as copies."""
+    test = RegexBasedRatchetTest(name="print", pattern=r"print\(", allowed_count=0)
+    failure = TestFailure(
+        test_name="print", filepath="a.py", line_number=1, line_contents="print()"
+    )
+    for _ in range(1000):
+        test.add_failure(failure)
+    assert len(test.failures) == 1000
+
+    copy = test.failures
+    copy.clear()
+    assert len(test.failures) == 1000
+
+    test.clear_failures()
+    assert test.failures == []
+
+
+def test_include_decision_shared_between_tests():
+    """Test that tests with the same file filter share one include decision."""
+    include = re.compile(r"src/.*\.py$")
+    first = RegexBasedRatchetTest(
+        name="first", pattern="a", allowed_count=0, include_file_regex=include
+    )
+    second = RegexBasedRatchetTest(
+        name="second", pattern="b", allowed_count=0, include_file_regex=include
+    )
+
+    _include_file.cache_clear()
+    assert first.should_include_file(Path("src/module.py"))
+    assert second.should_include_file("src/module.py")
+    assert not second.should_include_file("docs/conf.py")
+    info = _include_file.cache_info()
+    assert (info.hits, info.misses) == (1, 2)
+
+
 def test_test_failure():
     """Test TestFailure class."""
     failure = TestFailure(
@@ -718,3 +1022,17 @@ def test_test_failure():
         line_contents="print('test')",
     )
     assert failure != failure3
+
+
+def test_matching_line_indices_matches_per_line_search():
+    """Test that the joined-buffer search agrees with searching line by line."""
+    lines = ["print(x)\n", "   \n", "a  b\n", "ab\n", "x  \n", "print(y)"]
+    patterns = [r"print\(", r"^\s*$", r"a\s+b", r"x$", r"x(?=\s)", r"\Aprint"]
+    for pattern in patterns:
+        regex = re.compile(pattern)
+        expected = [i for i, line in enumerate(lines) if regex.search(line)]
+        assert _matching_line_indices(regex, lines) == expected
+        expected = [i for i, line in enumerate(lines) if regex.search(line.rstrip())]
+        assert _matching_line_indices(regex, lines, strip=True) == expected
+
+    assert _matching_line_indices(re.compile("x"), []) == []
@@ -355,7 +355,7 @@ def test_pattern_manager_integration():
     pattern2 = pattern_manager.get_pattern(r"print\(", escape=False)
     assert pattern1 is pattern2  # Should be the same object due to caching
 
-    # Test cache clearing
+    # Clearing the manager's cache still reuses the process-wide compiled regex
     pattern_manager.clear_cache()
     pattern3 = pattern_manager.get_pattern(r"print\(", escape=False)
-    assert pattern1 is not pattern3  # Should be different objects after cache clear
+    assert pattern1 is pattern3
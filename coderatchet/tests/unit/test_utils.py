@@ -9,15 +9,22 @@ import tempfile
 from pathlib import Path
 from unittest.mock import patch
 
+import pytest
+
 from coderatchet.core.utils import (
     FileTestFailure,
+    RatchetError,
+    _compile,
     _read_exclude_patterns,
+    compile_ratchet_regex,
     file_path_to_module_path,
     get_python_files,
     get_ratchet_test_files,
     get_ratchet_values,
     join_regex_patterns,
     load_ratchet_count,
+    load_ratchet_counts,
+    load_ratchet_counts_from_blob,
     ratchet_values_path,
     should_exclude_file,
     write_ratchet_counts,
@@ -103,16 +110,14 @@ def test_read_exclude_patterns():
     """Test reading exclusion patterns from a file."""
     with tempfile.NamedTemporaryFile(mode="w") as f:
         # Write patterns to file
-        f.write(
-            """
+        f.write("""
         # Comment line
         *.pyc
         __pycache__/
         "venv/"
         'build/'
         test_*.py
-        """
-        )
+        """)
         f.flush()
 
         # Test reading patterns
@@ -166,16 +171,14 @@ def test_get_ratchet_test_files(tmp_path):
 
     # Create exclusion file with patterns
     exclude_file = tmp_path / "ratchet_excluded.txt"
-    exclude_file.write_text(
-        """
+    exclude_file.write_text("""
     # Exclude patterns
     *.pyc
     __pycache__
     venv/
     !important.py
     test2.py
-    """
-    )
+    """)
 
     # Change to temporary directory
     original_dir = Path.cwd()
@@ -231,6 +234,30 @@ def test_load_ratchet_count(tmp_path):
         assert load_ratchet_count("nonexistent") == 0
 
 
+def test_load_ratchet_counts(tmp_path):
+    """Test loading several ratchet counts at once."""
+    mock_path = str(tmp_path / "ratchet_values.json")
+
+    with patch("coderatchet.core.utils.ratchet_values_path", return_value=mock_path):
+        with open(mock_path, "w") as f:
+            json.dump({"test1": 5, "test2": 3}, f)
+
+        with patch(
+            "coderatchet.core.utils.get_ratchet_values", wraps=get_ratchet_values
+        ) as mock_values:
+            counts = load_ratchet_counts(["test1", "nonexistent"])
+            assert mock_values.call_count == 1
+        assert counts == {"test1": 5, "nonexistent": 0}
+
+    blob = json.dumps({"test1": 5}).encode()
+    assert load_ratchet_counts_from_blob(["test1", "test2"], blob) == {
+        "test1": 5,
+        "test2": 0,
+    }
+    assert load_ratchet_counts_from_blob(["test1"], None) == {"test1": 0}
+    assert load_ratchet_counts_from_blob(["test1"], b"invalid json") == {"test1": 0}
+
+
 def test_write_ratchet_counts(tmp_path):
     """Test writing ratchet counts."""
     mock_path = str(tmp_path / "ratchet_values.json")
@@ -295,3 +322,52 @@ def test_join_regex_patterns():
     assert pattern.match("c.d")
     assert not pattern.match("ab")
     assert not pattern.match("cd")
+
+
+def test_compile_is_shared():
+    """Test that compiled patterns are cached by pattern and flags."""
+    assert _compile(r"print\(") is _compile(r"print\(")
+    assert _compile("todo", re.IGNORECASE) is not _compile("todo")
+    assert _compile("todo", re.IGNORECASE).search("TODO")
+    assert compile_ratchet_regex(r"eval\(") is compile_ratchet_regex(r"eval\(")
+
+
+def test_compile_ratchet_regex():
+    """Test that ordinary patterns stay on the re module."""
+    regex = compile_ratchet_regex(r"print\(")
+    assert isinstance(regex, re.Pattern)
+    assert regex.search("print('x')")
+
+    regex = compile_ratchet_regex(r"todo", re.IGNORECASE)
+    assert isinstance(regex, re.Pattern)
+    assert regex.search("# TODO")
+
+    # Backtracking-prone patterns are not moved to RE2 unless asked for
+    assert isinstance(compile_ratchet_regex(r"(a+)+b"), re.Pattern)
+
+    with pytest.raises(re.error):
+        compile_ratchet_regex(r"(unclosed")
+
+
+def test_compile_ratchet_regex_re2_not_installed():
+    """Test that asking for RE2 without the extra fails loudly."""
+    with patch("coderatchet.core.utils.re2", None):
+        with pytest.raises(RatchetError, match="re2"):
+            compile_ratchet_regex.__wrapped__(r"(a+)+b", use_re2=True)
+
+
+def test_compile_ratchet_regex_re2():
+    """Test that ratchets opting in to RE2 get an RE2 pattern."""
+    pytest.importorskip("re2")
+
+    regex = compile_ratchet_regex(r"(a+)+b", use_re2=True)
+    assert not isinstance(regex, re.Pattern)
+    assert regex.search("a" * 64) is None
+    assert regex.search("aaab")
+
+    regex = compile_ratchet_regex(r"(A+)+b", re.IGNORECASE, use_re2=True)
+    assert regex.search("aaB")
+
+    # Lookaround is not supported by RE2
+    with pytest.raises(re.error):
+        compile_ratchet_regex(r"(?=(a+)+)a", use_re2=True)